@@ -0,0 +1,43 @@
+"""Add cascade deletes
+
+Revision ID: 7b2c5e9f1d38
+Revises: 4e9d1b7c6a20
+Create Date: 2026-10-18 15:30:27.915342
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7b2c5e9f1d38"
+down_revision: Union[str, None] = "4e9d1b7c6a20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (constraint name, table, referred table, local column)
+foreign_keys = [
+    ("nodes_workflow_id_fkey", "nodes", "workflows", "workflow_id"),
+    ("permissions_user_id_fkey", "permissions", "users", "user_id"),
+    ("permissions_workflow_id_fkey", "permissions", "workflows", "workflow_id"),
+    ("node_configurations_node_id_fkey", "node_configurations", "nodes", "node_id"),
+    ("edges_source_node_id_fkey", "edges", "nodes", "source_node_id"),
+    ("edges_target_node_id_fkey", "edges", "nodes", "target_node_id"),
+    ("start_node_fkey", "start_node_configurations", "node_configurations", "id"),
+    ("message_node_fkey", "message_node_configurations", "node_configurations", "id"),
+    ("condition_node_fkey", "condition_node_configurations", "node_configurations", "id"),
+    ("end_node_fkey", "end_node_configurations", "node_configurations", "id"),
+]
+
+
+def upgrade() -> None:
+    for name, table, referred_table, column in foreign_keys:
+        op.drop_constraint(name, table, type_="foreignkey")
+        op.create_foreign_key(name, table, referred_table, [column], ["id"], ondelete="CASCADE")
+
+
+def downgrade() -> None:
+    for name, table, referred_table, column in foreign_keys:
+        op.drop_constraint(name, table, type_="foreignkey")
+        op.create_foreign_key(name, table, referred_table, [column], ["id"])
@@ -0,0 +1,54 @@
+"""Add lookup indexes
+
+Revision ID: 9f3a6d2e8c51
+Revises: 7b2c5e9f1d38
+Create Date: 2026-10-18 16:30:08.271946
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9f3a6d2e8c51"
+down_revision: Union[str, None] = "7b2c5e9f1d38"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# `edges.source_node_id` and `permissions.user_id` lead existing unique constraints, which already index them
+indexes = [
+    ("ix_nodes_workflow_id", "nodes", ["workflow_id"]),
+    ("ix_edges_target_node_id", "edges", ["target_node_id"]),
+    ("ix_node_configurations_node_id", "node_configurations", ["node_id"]),
+    ("ix_permissions_workflow_id", "permissions", ["workflow_id"]),
+    ("ix_workflows_created_by", "workflows", ["created_by"]),
+]
+
+# unique indexes on `id` duplicating primary keys
+redundant_indexes = [
+    ("ix_users_id", "users"),
+    ("ix_workflows_id", "workflows"),
+    ("ix_permissions_id", "permissions"),
+    ("ix_nodes_id", "nodes"),
+    ("ix_node_configurations_id", "node_configurations"),
+    ("ix_edges_id", "edges"),
+    ("ix_workflow_runs_id", "workflow_runs"),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY can't run inside a transaction, tables stay writable while indexes are built
+    with op.get_context().autocommit_block():
+        for name, table, columns in indexes:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+        for name, table in redundant_indexes:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table in redundant_indexes:
+            op.create_index(name, table, ["id"], unique=True, postgresql_concurrently=True, if_not_exists=True)
+        for name, table, _ in indexes:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
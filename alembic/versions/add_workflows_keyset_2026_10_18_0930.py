@@ -0,0 +1,25 @@
+"""Add workflows keyset index
+
+Revision ID: 5d2e8c1a7f43
+Revises: b9f4bc129a39
+Create Date: 2026-10-18 09:30:12.418305
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5d2e8c1a7f43"
+down_revision: Union[str, None] = "b9f4bc129a39"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_workflows_created_at_id", "workflows", ["created_at", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_workflows_created_at_id", table_name="workflows")
@@ -0,0 +1,38 @@
+"""Add workflows search vector
+
+Revision ID: 8a41c6e0d2b7
+Revises: 5d2e8c1a7f43
+Create Date: 2026-10-18 10:45:37.902114
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8a41c6e0d2b7"
+down_revision: Union[str, None] = "5d2e8c1a7f43"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "workflows",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('simple', name || ' ' || coalesce(description, ''))", persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index("ix_workflows_search_vector", "workflows", ["search_vector"], unique=False, postgresql_using="gin")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_workflows_search_vector", table_name="workflows", postgresql_using="gin")
+    op.drop_column("workflows", "search_vector")
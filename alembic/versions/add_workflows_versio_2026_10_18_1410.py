@@ -0,0 +1,27 @@
+"""Add workflows version
+
+Revision ID: 4e9d1b7c6a20
+Revises: c3f7a9b25e18
+Create Date: 2026-10-18 14:10:12.380514
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4e9d1b7c6a20"
+down_revision: Union[str, None] = "c3f7a9b25e18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("workflows", sa.Column("version", sa.Integer(), server_default="0", nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column("workflows", "version")
@@ -0,0 +1,48 @@
+"""Create workflow runs
+
+Revision ID: c3f7a9b25e18
+Revises: 8a41c6e0d2b7
+Create Date: 2026-10-18 13:20:44.617230
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c3f7a9b25e18"
+down_revision: Union[str, None] = "8a41c6e0d2b7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "workflow_runs",
+        sa.Column("workflow_id", sa.Uuid(), nullable=False),
+        sa.Column("status", sa.Enum("running", "finished", "failed", name="runstatus"), nullable=False),
+        sa.Column("current_node_id", sa.Uuid(), nullable=True),
+        sa.Column("context", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("history", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("created_by", sa.Uuid(), nullable=True),
+        sa.ForeignKeyConstraint(["current_node_id"], ["nodes.id"], ondelete="SET NULL"),
+        sa.ForeignKeyConstraint(["workflow_id"], ["workflows.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_workflow_runs_id"), "workflow_runs", ["id"], unique=True)
+    op.create_index(op.f("ix_workflow_runs_workflow_id"), "workflow_runs", ["workflow_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_workflow_runs_workflow_id"), table_name="workflow_runs")
+    op.drop_index(op.f("ix_workflow_runs_id"), table_name="workflow_runs")
+    op.drop_table("workflow_runs")
+    op.execute("DROP TYPE IF EXISTS runstatus;")
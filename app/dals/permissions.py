@@ -0,0 +1,83 @@
+from typing import FrozenSet, List, Optional, Union
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.users import Permission, PermissionType, User
+from app.models.workflows import Workflow
+
+FOREIGN_KEY_VIOLATION = "23503"
+
+
+class PermissionDAL:
+    def __init__(self, db: Session, current_user: Optional[User] = None) -> None:
+        self.db = db
+        self.user = current_user
+
+    async def get_workflow_permissions(self, workflow_id: Union[UUID, str]) -> FrozenSet[PermissionType]:
+        """Returns permissions the user has on workflow, creator has all of them."""
+        query = (
+            select(Workflow.created_by, Permission.permission)
+            .outerjoin(Permission, (Permission.workflow_id == Workflow.id) & (Permission.user_id == self.user.id))
+            .filter(Workflow.id == workflow_id)
+        )
+        rows = (await self.db.execute(query)).all()
+
+        if any(row.created_by == self.user.id for row in rows):
+            return frozenset(PermissionType)
+        return frozenset(row.permission for row in rows if row.permission is not None)
+
+    async def is_workflow_creator(self, workflow_id: Union[UUID, str]) -> bool:
+        query = select(Workflow.id).filter(Workflow.id == workflow_id, Workflow.created_by == self.user.id)
+        return (await self.db.execute(query)).scalar() is not None
+
+    async def list_permissions(self, workflow_id: Union[UUID, str]) -> List[Permission]:
+        query = select(Permission).filter(Permission.workflow_id == workflow_id).order_by(Permission.created_at)
+        return (await self.db.execute(query)).scalars().all()
+
+    async def get_permission(self, permission_id: Union[UUID, str], workflow_id: Union[UUID, str]) -> Permission:
+        query = select(Permission).filter(Permission.id == permission_id, Permission.workflow_id == workflow_id)
+        permission = (await self.db.execute(query)).scalar()
+        if not permission:
+            raise HTTPException(status_code=404, detail="Permission not found")
+        return permission
+
+    async def _commit(self) -> None:
+        """Commits a granted permission, duplicates and unknown users are client errors."""
+        try:
+            await self.db.commit()
+        except IntegrityError as error:
+            await self.db.rollback()
+            if getattr(error.orig, "pgcode", None) == FOREIGN_KEY_VIOLATION:
+                raise HTTPException(status_code=404, detail="User not found")
+            raise HTTPException(status_code=400, detail="Permission already exists")
+
+    async def create_permission(
+        self, user_id: Union[UUID, str], workflow_id: Union[UUID, str], permission: PermissionType
+    ) -> Permission:
+        permission = Permission(
+            user_id=user_id,
+            workflow_id=workflow_id,
+            permission=permission,
+            created_by=self.user.id if self.user else None,
+        )
+        self.db.add(permission)
+        await self._commit()
+        return permission
+
+    async def update_permission(
+        self, permission_id: Union[UUID, str], workflow_id: Union[UUID, str], permission_type: PermissionType
+    ) -> Permission:
+        permission = await self.get_permission(permission_id, workflow_id)
+        permission.permission = permission_type
+        await self._commit()
+        return permission
+
+    async def delete_permission(self, permission_id: Union[UUID, str], workflow_id: Union[UUID, str]) -> Permission:
+        permission = await self.get_permission(permission_id, workflow_id)
+        await self.db.delete(permission)
+        await self.db.commit()
+        return permission
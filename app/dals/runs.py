@@ -0,0 +1,47 @@
+from typing import Optional, Union
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.users import User
+from app.models.workflows import WorkflowRun
+
+
+class RunDAL:
+    def __init__(self, db: Session, current_user: Optional[User] = None) -> None:
+        self.db = db
+        self.user = current_user
+
+    async def get_run(self, workflow_id: Union[UUID, str], run_id: Union[UUID, str], for_update: bool = False):
+        """With `for_update` the row stays locked until commit, so concurrent steps of one run are serialized."""
+        query = select(WorkflowRun).filter(WorkflowRun.id == run_id, WorkflowRun.workflow_id == workflow_id)
+        if for_update:
+            query = query.with_for_update()
+        run = (await self.db.execute(query)).scalar()
+        if not run:
+            raise HTTPException(status_code=404, detail="Run not found")
+        return run
+
+    async def create_run(self, workflow_id: Union[UUID, str], run_data: dict):
+        query = (
+            insert(WorkflowRun)
+            .values(**run_data, workflow_id=workflow_id, created_by=self.user.id)
+            .returning(WorkflowRun)
+        )
+        run = (await self.db.execute(query)).scalar()
+        await self.db.commit()
+        return run
+
+    async def update_run(self, run: WorkflowRun, update_data: dict):
+        query = (
+            update(WorkflowRun)
+            .where(WorkflowRun.id == run.id)
+            .values(**update_data)
+            .returning(WorkflowRun)
+            .execution_options(populate_existing=True)
+        )
+        run = (await self.db.execute(query)).scalar()
+        await self.db.commit()
+        return run
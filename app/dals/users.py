@@ -40,3 +40,15 @@ class UserDAL:
         self.db.add(user)
         await self.db.commit()
         return user
+
+    async def update_user(self, user_id, update_data: Dict[str, Any]) -> User:
+        user = await self.get_user(user_id)
+        for key, value in update_data.items():
+            setattr(user, key, value)
+        await self.db.commit()
+        return user
+
+    async def delete_user(self, user_id) -> None:
+        user = await self.get_user(user_id)
+        await self.db.delete(user)
+        await self.db.commit()
@@ -1,14 +1,18 @@
 from collections import defaultdict
-from typing import Optional, Union
-from uuid import UUID
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from uuid import UUID, uuid4
 
 from fastapi import HTTPException
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, func, insert, literal, literal_column, or_, select, true, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased, joinedload, with_polymorphic
 
 from app.models.users import Permission, PermissionType, User
 from app.models.workflows import (
+    BaseNodeConfiguration,
     ConditionNodeConfiguration,
+    Edge,
     EndNodeConfiguration,
     MessageNodeConfiguration,
     Node,
@@ -16,143 +20,437 @@ from app.models.workflows import (
     StartNodeConfiguration,
     Workflow,
 )
+from app.utils.pagination import get_ordering
 
 
-class WorkflowDAL:
-    def __init__(self, db: Session, current_user: Optional[User] = None) -> None:
-        self.db = db
-        self.user = current_user
+def get_bump_version_query(workflow_id: Union[UUID, str], versions: Optional[Set[int]] = None):
+    """
+    Increments workflow version, which keys compiled graph caches and ETags, so it's run with every graph mutation.
+    With `versions` only a workflow still at one of them is bumped, the new version is returned.
+    """
+    query = update(Workflow).filter(Workflow.id == workflow_id)
+    if versions is not None:
+        query = query.filter(Workflow.version.in_(versions))
+    return query.values(version=Workflow.version + 1).returning(Workflow.version)
 
-    async def get_workflows_by_permissions(self):
-        query = select(Permission.id, Permission.workflow_id).filter(Permission.user_id == self.user.id)
-        permissions = await self.db.execute(query)
 
-        workflows_by_permissions = defaultdict(set)
-        for permission in permissions:
-            workflows_by_permissions[permission.permission].add(permission.workflow_id)
+async def bump_version(db: Session, workflow_id: Union[UUID, str], versions: Optional[Set[int]] = None) -> None:
+    """Bumps version, raises 412 if workflow has moved past expected `versions` in the meantime."""
+    if not await db.scalar(get_bump_version_query(workflow_id, versions)) and versions is not None:
+        raise HTTPException(status_code=412, detail="Workflow was modified")
 
-        return workflows_by_permissions
 
-    async def get_base_query(self, on_update=False, on_delete=False, select_fields=None):
-        is_creator = Workflow.created_by == self.user.id
-        user_workflows = await self.get_workflows_by_permissions()
+async def insert_many(db: Session, table, rows: List[Dict[str, Any]]) -> None:
+    if rows:
+        await db.execute(insert(table), rows)
+
 
-        can_edit = Workflow.id.in_(user_workflows.get(PermissionType.edit.value, []))
-        can_view = Workflow.id.in_(user_workflows.get(PermissionType.view.value, []))
-        can_delete = Workflow.id.in_(user_workflows.get(PermissionType.delete.value, []))
+class WorkflowDAL:
+    default_order_by = "created_at"
+    order_by_fields = {
+        "name": Workflow.name,
+        "created_at": Workflow.created_at,
+        "updated_at": Workflow.updated_at,
+    }
 
+    def __init__(self, db: Session, current_user: Optional[User] = None) -> None:
+        self.db = db
+        self.user = current_user
+
+    def get_permission_filter(self, *permissions: PermissionType):
+        """
+        Builds a predicate matching workflows the user created or was granted any of given permissions to.
+        Listing and writes filter in SQL, single workflow reads check the cached `PermissionService` instead.
+        """
+        is_creator = Workflow.created_by == self.user.id
+        has_permission = (
+            select(Permission.id)
+            .filter(
+                Permission.workflow_id == Workflow.id,
+                Permission.user_id == self.user.id,
+                Permission.permission.in_(permissions),
+            )
+            .exists()
+        )
+        return is_creator | has_permission
+
+    def get_base_query(self, on_update=False, on_delete=False, select_fields=None):
         fields = select_fields or [Workflow]
 
         if on_delete:
-            return select(*fields).filter(is_creator | can_delete)
+            return select(*fields).filter(self.get_permission_filter(PermissionType.delete))
 
         if on_update:
-            return select(*fields).filter(is_creator | can_edit)
+            return select(*fields).filter(self.get_permission_filter(PermissionType.edit))
 
-        return select(*fields).filter(is_creator | can_edit | can_view | can_delete)
+        return select(*fields).filter(self.get_permission_filter(*PermissionType))
 
-    async def get_workflow(self, workflow_id: Union[UUID, str], *args, **kwargs):
-        query = await self.get_base_query(*args, **kwargs)
-        workflow = await self.db.execute(query.filter(Workflow.id == workflow_id))
-        workflow = workflow.scalar()
+    async def get_workflow(self, workflow_id: Union[UUID, str]):
+        """Loads workflow without the permission filter, callers check access with cached `PermissionService`."""
+        workflow = await self.db.get(Workflow, workflow_id)
         if not workflow:
             raise HTTPException(status_code=404, detail="Workflow not found")
         return workflow
 
-    async def list_workflows(self):
-        query = await self.get_base_query()
-        workflows = await self.db.execute(query)
+    def get_list_query(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[Any, UUID]] = None,
+        search: Optional[str] = None,
+        order_by: Optional[str] = None,
+    ):
+        """Orders workflows by `(order_by, id)` and continues strictly after the `after` keyset position."""
+        column, descending = get_ordering(order_by or self.default_order_by, self.order_by_fields)
+        query = self.get_base_query()
+
+        if search:
+            query = query.filter(Workflow.search_vector.op("@@")(func.websearch_to_tsquery("simple", search)))
+
+        if after:
+            keyset, position = tuple_(column, Workflow.id), tuple_(*after)
+            query = query.filter(keyset < position if descending else keyset > position)
+
+        if descending:
+            query = query.order_by(column.desc(), Workflow.id.desc())
+        else:
+            query = query.order_by(column, Workflow.id)
+
+        if limit:
+            query = query.limit(limit)
+        return query
+
+    async def list_workflows(self, *args, **kwargs):
+        workflows = await self.db.execute(self.get_list_query(*args, **kwargs))
         return workflows.scalars().all()
 
+    async def stream_workflows(self, *args, **kwargs):
+        return await self.db.stream_scalars(self.get_list_query(*args, **kwargs))
+
     async def create_workflow(self, create_data: dict):
-        workflow = Workflow(**create_data, created_by=self.user.id)
-        self.db.add(workflow)
+        workflow = await self.db.scalar(
+            insert(Workflow).values(**create_data, created_by=self.user.id).returning(Workflow)
+        )
         await self.db.commit()
-        await self.db.refresh(workflow)
         return workflow
 
-    async def update_workflow(self, workflow_id: str, update_data: dict):
-        workflow = await self.get_workflow(workflow_id, on_update=True)
-        for key, value in update_data.items():
-            if value is None:
-                continue
-            setattr(workflow, key, value)
-
+    async def raise_write_error(self, workflow_id: str, versions: Optional[Set[int]], **permission) -> None:
+        """
+        Explains why a guarded write matched nothing: 412 if the user may write the workflow but it has moved
+        past expected `versions`, 404 otherwise. Runs only after a write failed.
+        """
+        if versions is not None:
+            query = self.get_base_query(select_fields=[Workflow.id], **permission).filter(Workflow.id == workflow_id)
+            if await self.db.scalar(query):
+                raise HTTPException(status_code=412, detail="Workflow was modified")
+        raise HTTPException(status_code=404, detail="Workflow not found")
+
+    async def update_workflow(self, workflow_id: str, update_data: dict, versions: Optional[Set[int]] = None):
+        """
+        Updates workflow with a single statement, the permission check and expected `versions` from
+        `If-Match` are a part of its WHERE clause.
+        """
+        values = {key: value for key, value in update_data.items() if value is not None}
+        query = update(Workflow).where(Workflow.id == workflow_id, self.get_permission_filter(PermissionType.edit))
+        if versions is not None:
+            query = query.where(Workflow.version.in_(versions))
+        query = (
+            query.values(**values, version=Workflow.version + 1)
+            .returning(Workflow)
+            .execution_options(synchronize_session=False)
+        )
+        workflow = await self.db.scalar(query)
+        if not workflow:
+            await self.raise_write_error(workflow_id, versions, on_update=True)
         await self.db.commit()
-        await self.db.refresh(workflow)
         return workflow
 
-    async def delete_workflow(self, workflow_id: str):
-        workflow = await self.get_workflow(workflow_id, on_delete=True)
-        await self.db.delete(workflow)
+    async def delete_workflow(self, workflow_id: str, versions: Optional[Set[int]] = None):
+        """
+        Deletes workflow with a single statement guarded by the delete permission and expected `versions`,
+        nodes, configurations, edges, permissions and runs are removed by ON DELETE CASCADE foreign keys.
+        """
+        query = delete(Workflow).where(Workflow.id == workflow_id, self.get_permission_filter(PermissionType.delete))
+        if versions is not None:
+            query = query.where(Workflow.version.in_(versions))
+        if not await self.db.scalar(query.returning(Workflow.id)):
+            await self.raise_write_error(workflow_id, versions, on_delete=True)
+        await self.db.commit()
+
+    async def clone_workflow(
+        self, workflow_id: Union[UUID, str], name: Optional[str] = None, description: Optional[str] = None
+    ) -> Workflow:
+        """
+        Copies workflow with its nodes, configurations of every type and edges in a single statement of
+        INSERT ... SELECT CTEs, no rows leave Postgres. New ids come from `gen_random_uuid()` and are mapped
+        once in the `ids` CTE, foreign keys are checked at the end of the statement, so parents and children
+        can be inserted side by side. Any permission on source allows cloning, the clone belongs to the user.
+        Nodes and edges get consecutive creation times in the order of source, so they list the same way.
+        """
+        workflows, nodes, edges = Workflow.__table__, Node.__table__, Edge.__table__
+        configurations = BaseNodeConfiguration.__table__
+        now = datetime.utcnow()
+        microsecond = literal_column("interval '1 microsecond'")
+
+        source = (
+            select(workflows.c.id, workflows.c.name, workflows.c.description)
+            .filter(workflows.c.id == workflow_id, self.get_permission_filter(*PermissionType))
+            .cte("source")
+        )
+        cloned_workflow = (
+            insert(workflows)
+            .from_select(
+                ["id", "name", "description", "created_at", "updated_at", "created_by"],
+                select(
+                    func.gen_random_uuid(),
+                    func.coalesce(name, source.c.name + " (copy)"),
+                    func.coalesce(description, source.c.description),
+                    literal(now),
+                    literal(now),
+                    literal(self.user.id),
+                ),
+                include_defaults=False,
+            )
+            .returning(*workflows.c)
+            .cte("cloned_workflow")
+        )
+        ids = (
+            select(
+                nodes.c.id.label("node_id"),
+                configurations.c.id.label("configuration_id"),
+                func.gen_random_uuid().label("new_node_id"),
+                func.gen_random_uuid().label("new_configuration_id"),
+                (literal(now) + func.row_number().over(order_by=(nodes.c.created_at, nodes.c.id)) * microsecond).label(
+                    "created_at"
+                ),
+            )
+            .join(source, source.c.id == nodes.c.workflow_id)
+            .outerjoin(configurations, configurations.c.node_id == nodes.c.id)
+            .cte("ids")
+        )
+
+        node_columns = ["id", "node_type", "workflow_id", "created_at", "updated_at", "created_by"]
+        inserts = [
+            insert(nodes).from_select(
+                node_columns,
+                select(
+                    ids.c.new_node_id,
+                    nodes.c.node_type,
+                    cloned_workflow.c.id,
+                    ids.c.created_at,
+                    ids.c.created_at,
+                    literal(self.user.id),
+                )
+                .join(nodes, nodes.c.id == ids.c.node_id)
+                .join(cloned_workflow, true()),
+                include_defaults=False,
+            ),
+            insert(configurations).from_select(
+                ["id", "node_id", "node_type", "created_at", "updated_at", "created_by"],
+                select(
+                    ids.c.new_configuration_id,
+                    ids.c.new_node_id,
+                    configurations.c.node_type,
+                    ids.c.created_at,
+                    ids.c.created_at,
+                    literal(self.user.id),
+                ).join(configurations, configurations.c.id == ids.c.configuration_id),
+                include_defaults=False,
+            ),
+        ]
+        for model in NodeDAL.all_configs:
+            table = model.__table__
+            fields = [column.name for column in table.c if column.name != "id"]
+            inserts.append(
+                insert(table).from_select(
+                    ["id", *fields],
+                    select(ids.c.new_configuration_id, *(table.c[field] for field in fields)).join(
+                        table, table.c.id == ids.c.configuration_id
+                    ),
+                    include_defaults=False,
+                )
+            )
+
+        source_ids, target_ids = ids.alias("source_ids"), ids.alias("target_ids")
+        inserts.append(
+            insert(edges).from_select(
+                ["id", "status", "source_node_id", "target_node_id", "created_at", "updated_at", "created_by"],
+                select(
+                    func.gen_random_uuid(),
+                    edges.c.status,
+                    source_ids.c.new_node_id,
+                    target_ids.c.new_node_id,
+                    literal(now) + func.row_number().over(order_by=(edges.c.created_at, edges.c.id)) * microsecond,
+                    literal(now),
+                    literal(self.user.id),
+                )
+                .join(source_ids, source_ids.c.node_id == edges.c.source_node_id)
+                .join(target_ids, target_ids.c.node_id == edges.c.target_node_id),
+                include_defaults=False,
+            )
+        )
+
+        query = select(aliased(Workflow, cloned_workflow)).add_cte(
+            *(statement.cte(f"cloned_{statement.table.name}") for statement in inserts)
+        )
+        workflow = await self.db.scalar(query)
+        if not workflow:
+            raise HTTPException(status_code=404, detail="Workflow not found")
         await self.db.commit()
+        return workflow
 
 
 class NodeDAL:
     ConfigurationModel = None
     node_type = None
+    default_order_by = "created_at"
+    order_by_fields = {
+        "node_type": Node.node_type,
+        "created_at": Node.created_at,
+        "updated_at": Node.updated_at,
+    }
     all_configs = [
         StartNodeConfiguration,
         MessageNodeConfiguration,
         ConditionNodeConfiguration,
         EndNodeConfiguration,
     ]
+    configuration_models = {model.__mapper__.polymorphic_identity: model for model in all_configs}
 
     def __init__(self, db: Session, current_user: Optional[User] = None) -> None:
         self.db = db
         self.user = current_user
 
-    def _create_node(self, node_data: dict):
-        node_data["node_type"] = self.node_type
-        node = Node(**node_data, created_by=self.user.id)
-        self.db.add(node)
-        return node
-
-    def _create_node_configuration(self, node_id: str, configuration_data: dict):
-        configuration_data["node_id"] = node_id
-        configuration_data["created_by"] = self.user.id
-        node_configuration = self.ConfigurationModel(**configuration_data)
-        self.db.add(node_configuration)
-        return node_configuration
+    async def insert_nodes(self, workflow_id: Union[UUID, str], nodes: List[dict]) -> None:
+        """
+        Inserts nodes with their configurations with one batched INSERT per table. Nodes come with
+        pre-generated ids and `configuration` fields, so nothing has to be read back.
+        """
+        node_rows, configuration_rows, typed_configuration_rows = [], [], defaultdict(list)
+        for node in nodes:
+            configuration_id = uuid4()
+            node_rows.append(
+                {
+                    "id": node["id"],
+                    "node_type": node["node_type"],
+                    "workflow_id": workflow_id,
+                    "created_by": self.user.id,
+                }
+            )
+            configuration_rows.append(
+                {
+                    "id": configuration_id,
+                    "node_id": node["id"],
+                    "node_type": node["node_type"],
+                    "created_by": self.user.id,
+                }
+            )
+            typed_configuration_rows[node["node_type"]].append({"id": configuration_id, **node["configuration"]})
+
+        await insert_many(self.db, Node.__table__, node_rows)
+        await insert_many(self.db, BaseNodeConfiguration.__table__, configuration_rows)
+        for node_type, rows in typed_configuration_rows.items():
+            await insert_many(self.db, self.configuration_models[node_type].__table__, rows)
 
     async def create_node(self, node_data: dict, configuration_data: dict):
-        node = self._create_node(node_data)
-        await self.db.flush()
-
-        config = self._create_node_configuration(node.id, configuration_data)
-
+        """Writes node without reading it back, returns node columns with configuration fields."""
+        node = {"id": uuid4(), "node_type": self.node_type, **node_data}
+        await self.insert_nodes(node["workflow_id"], [{**node, "configuration": configuration_data}])
+        await bump_version(self.db, node["workflow_id"])
         await self.db.commit()
-        await self.db.refresh(node)
-
-        return node, config
+        return {**node, **configuration_data}
 
-    async def get_node(self, node_id: Union[UUID, str], workflow_id: Union[UUID, str]):
-        query = select(Node).filter(Node.id == node_id, Node.workflow_id == workflow_id)
-
-        node = await self.db.execute(query)
-        node = node.scalar()
+    async def get_node_row(self, node_id: Union[UUID, str], workflow_id: Union[UUID, str]):
+        node = (await self.db.execute(self.get_columns_query(workflow_id).filter(Node.id == node_id))).first()
         if not node:
             raise HTTPException(status_code=404, detail="Node not found")
         return node
 
-    async def list_nodes(self, workflow_id: Union[UUID, str]):
-        query = select(Node).filter(Node.workflow_id == workflow_id)
+    @staticmethod
+    def get_search_filter(search: str):
+        """
+        Matches nodes by message text or condition. Filters the configuration tables `get_columns_query` joins,
+        so only configurations of nodes in the listed workflow are scanned.
+        """
+        return or_(
+            MessageNodeConfiguration.__table__.c.text.icontains(search, autoescape=True),
+            ConditionNodeConfiguration.__table__.c.condition.icontains(search, autoescape=True),
+        )
+
+    @staticmethod
+    def get_columns_query(workflow_id: Union[UUID, str]):
+        """Selects nodes with their typed configuration fields as plain columns, without loading ORM objects."""
+        configurations = BaseNodeConfiguration.__table__
+        messages = MessageNodeConfiguration.__table__
+        conditions = ConditionNodeConfiguration.__table__
+        return (
+            select(
+                Node.id, Node.node_type, Node.workflow_id, messages.c.text, messages.c.status, conditions.c.condition
+            )
+            .select_from(Node)
+            .outerjoin(configurations, configurations.c.node_id == Node.id)
+            .outerjoin(messages, messages.c.id == configurations.c.id)
+            .outerjoin(conditions, conditions.c.id == configurations.c.id)
+            .filter(Node.workflow_id == workflow_id)
+        )
+
+    async def list_nodes(
+        self, workflow_id: Union[UUID, str], search: Optional[str] = None, order_by: Optional[str] = None
+    ):
+        """Returns rows of node and configuration columns, listing doesn't build ORM objects."""
+        column, descending = get_ordering(order_by or self.default_order_by, self.order_by_fields)
+        query = self.get_columns_query(workflow_id)
+        if search:
+            query = query.filter(self.get_search_filter(search))
+        query = query.order_by(column.desc() if descending else column, Node.id)
         nodes = await self.db.execute(query)
-        return nodes.scalars().all()
-
-    async def update_node(self, node_id: Union[UUID, str], workflow_id: Union[UUID, str], update_data: dict):
-        node = await self.get_node(node_id, workflow_id)
-        config = node.config
-        for key, value in update_data.items():
-            setattr(config, key, value)
-
+        return nodes.all()
+
+    async def update_node(
+        self,
+        node_id: Union[UUID, str],
+        workflow_id: Union[UUID, str],
+        update_data: dict,
+        versions: Optional[Set[int]] = None,
+    ):
+        """
+        Updates node with a single UPDATE ... FROM of the typed configuration table of its `node_type`, which
+        returns the updated row. The node is matched within workflow, by its type and by the edit permission
+        in the same statement, types and bodies without configuration fields only match the row.
+        The version bump is guarded by expected `versions`, a concurrent change rolls the update back.
+        """
+        node_type = NodeType(update_data["node_type"])
+        table = self.configuration_models[node_type].__table__
+        values = {key: value for key, value in update_data.items() if key in table.c and key != "id"}
+        configurations, nodes = BaseNodeConfiguration.__table__, Node.__table__
+        query = (
+            update(table)
+            .where(
+                table.c.id == configurations.c.id,
+                configurations.c.node_id == nodes.c.id,
+                nodes.c.id == node_id,
+                nodes.c.workflow_id == workflow_id,
+                nodes.c.node_type == node_type,
+                Workflow.id == nodes.c.workflow_id,
+                WorkflowDAL(self.db, self.user).get_permission_filter(PermissionType.edit),
+            )
+            .values(**(values or {"id": table.c.id}))
+            .returning(nodes.c.id, nodes.c.node_type, nodes.c.workflow_id, *table.c[1:])
+        )
+        node = (await self.db.execute(query)).first()
+        if not node:
+            raise HTTPException(status_code=404, detail="Node not found")
+        await bump_version(self.db, workflow_id, versions)
         await self.db.commit()
-        await self.db.refresh(config)
-        return config
+        return node
 
-    async def delete_node(self, node_id: Union[UUID, str], workflow_id: Union[UUID, str]):
-        node = await self.get_node(node_id, workflow_id)
-        await self.db.delete(node)
+    async def delete_node(
+        self, node_id: Union[UUID, str], workflow_id: Union[UUID, str], versions: Optional[Set[int]] = None
+    ):
+        """Deletes node with a single statement, its configuration and edges go with ON DELETE CASCADE."""
+        query = delete(Node).where(Node.id == node_id, Node.workflow_id == workflow_id).returning(Node.id)
+        if not await self.db.scalar(query):
+            raise HTTPException(status_code=404, detail="Node not found")
+        await bump_version(self.db, workflow_id, versions)
         await self.db.commit()
 
 
@@ -174,3 +472,94 @@ class ConditionNodeDAL(NodeDAL):
 class EndNodeDAL(NodeDAL):
     ConfigurationModel = EndNodeConfiguration
     node_type = NodeType.end
+
+
+class EdgeDAL:
+    def __init__(self, db: Session, current_user: Optional[User] = None) -> None:
+        self.db = db
+        self.user = current_user
+
+    @staticmethod
+    def get_workflow_nodes_query(workflow_id: Union[UUID, str]):
+        return select(Node.id).filter(Node.workflow_id == workflow_id)
+
+    async def check_nodes(self, workflow_id: Union[UUID, str], node_ids: Set[UUID]) -> None:
+        """Checks that all nodes belong to workflow with a single query."""
+        query = self.get_workflow_nodes_query(workflow_id).filter(Node.id.in_(node_ids))
+        found_node_ids = set((await self.db.scalars(query)).all())
+        if found_node_ids != node_ids:
+            raise HTTPException(status_code=404, detail="Node not found")
+
+    async def list_edges(self, workflow_id: Union[UUID, str]):
+        query = select(Edge).filter(Edge.source_node_id.in_(self.get_workflow_nodes_query(workflow_id)))
+        edges = await self.db.scalars(query.order_by(Edge.created_at, Edge.id))
+        return edges.all()
+
+    async def create_edges(self, workflow_id: Union[UUID, str], edges_data: List[dict]):
+        await self.check_nodes(
+            workflow_id,
+            {node_id for edge in edges_data for node_id in (edge["source_node_id"], edge["target_node_id"])},
+        )
+        rows = [{**edge, "created_by": self.user.id} for edge in edges_data]
+        try:
+            edges = await self.db.scalars(insert(Edge).returning(Edge), rows)
+            edges = edges.all()
+            await bump_version(self.db, workflow_id)
+            await self.db.commit()
+        except IntegrityError:
+            await self.db.rollback()
+            raise HTTPException(status_code=400, detail="Edge already exists")
+        return edges
+
+    async def delete_edges(self, workflow_id: Union[UUID, str], edge_ids: List[Union[UUID, str]]) -> List[UUID]:
+        query = (
+            delete(Edge)
+            .where(Edge.id.in_(edge_ids), Edge.source_node_id.in_(self.get_workflow_nodes_query(workflow_id)))
+            .returning(Edge.id)
+        )
+        deleted_ids = (await self.db.scalars(query)).all()
+        if deleted_ids:
+            await bump_version(self.db, workflow_id)
+        await self.db.commit()
+        return deleted_ids
+
+
+class GraphDAL:
+    def __init__(self, db: Session, current_user: Optional[User] = None) -> None:
+        self.db = db
+        self.user = current_user
+
+    async def import_graph(self, workflow_id: Union[UUID, str], nodes: List[dict], edges: List[dict]) -> None:
+        """
+        Inserts nodes with their configurations and edges in a single transaction, every table gets
+        one batched INSERT whatever the graph size.
+        """
+        await NodeDAL(db=self.db, current_user=self.user).insert_nodes(workflow_id=workflow_id, nodes=nodes)
+        await insert_many(self.db, Edge.__table__, [{**edge, "created_by": self.user.id} for edge in edges])
+        await bump_version(self.db, workflow_id)
+        await self.db.commit()
+
+    async def list_nodes_with_configs(self, workflow_id: Union[UUID, str]):
+        """Loads nodes with configurations of all types in one query, instead of selectin per configuration table."""
+        configuration = with_polymorphic(BaseNodeConfiguration, "*", flat=True)
+        query = (
+            select(Node)
+            .filter(Node.workflow_id == workflow_id)
+            .options(joinedload(Node.config.of_type(configuration)))
+            .order_by(Node.created_at, Node.id)
+        )
+        nodes = await self.db.scalars(query)
+        return nodes.all()
+
+    async def get_version(self, workflow_id: Union[UUID, str]) -> Optional[int]:
+        return await self.db.scalar(select(Workflow.version).filter(Workflow.id == workflow_id))
+
+    async def load_graph(self, workflow_id: Union[UUID, str]):
+        """Loads whole graph with two queries: nodes with configurations and edges."""
+        nodes = await self.db.execute(NodeDAL.get_columns_query(workflow_id))
+        edges = await self.db.execute(
+            select(Edge.source_node_id, Edge.target_node_id, Edge.status)
+            .join(Node, Node.id == Edge.source_node_id)
+            .filter(Node.workflow_id == workflow_id)
+        )
+        return nodes.all(), edges.all()
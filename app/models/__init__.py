@@ -8,6 +8,8 @@ from app.models.workflows import (
     Node,
     NodeStatus,
     NodeType,
+    RunStatus,
     StartNodeConfiguration,
     Workflow,
+    WorkflowRun,
 )
@@ -6,7 +6,7 @@ from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
 class BaseModel(AsyncAttrs, DeclarativeBase):
-    id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4, index=True, nullable=False, unique=True)
+    id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4, nullable=False)
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
     created_by: Mapped[UUID] = mapped_column(nullable=True)
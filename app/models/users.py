@@ -23,8 +23,10 @@ class PermissionType(enum.Enum):
 
 class Permission(BaseModel):
     __tablename__ = "permissions"
-    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id"), nullable=False)
-    workflow_id: Mapped[UUID] = mapped_column(ForeignKey("workflows.id"), nullable=False)
+    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    workflow_id: Mapped[UUID] = mapped_column(
+        ForeignKey("workflows.id", ondelete="CASCADE"), nullable=False, index=True
+    )
     permission: Mapped[PermissionType] = mapped_column(nullable=False)
 
     __table_args__ = (UniqueConstraint("user_id", "workflow_id", permission),)
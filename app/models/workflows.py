@@ -1,6 +1,8 @@
 import enum
+from typing import Any, Dict, List, Optional
 
-from sqlalchemy import UUID, Column, ForeignKey, UniqueConstraint
+from sqlalchemy import UUID, Column, Computed, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlalchemy.orm import Mapped, declared_attr, mapped_column, relationship
 
 from app.models.base import BaseModel
@@ -11,6 +13,20 @@ class Workflow(BaseModel):
 
     name: Mapped[str] = mapped_column(nullable=False)
     description: Mapped[str] = mapped_column(nullable=True)
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed("to_tsvector('simple', name || ' ' || coalesce(description, ''))", persisted=True),
+        nullable=True,
+        deferred=True,
+    )
+    # incremented by every change of workflow or its graph, keys compiled graph caches
+    version: Mapped[int] = mapped_column(nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        Index("ix_workflows_created_at_id", "created_at", "id"),
+        Index("ix_workflows_created_by", "created_by"),
+        Index("ix_workflows_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
 
 class NodeType(enum.Enum):
@@ -25,7 +41,9 @@ class Node(BaseModel):
 
     node_type: Mapped[NodeType] = mapped_column(nullable=False)
 
-    workflow_id: Mapped[UUID] = mapped_column(ForeignKey("workflows.id"), nullable=False)
+    workflow_id: Mapped[UUID] = mapped_column(
+        ForeignKey("workflows.id", ondelete="CASCADE"), nullable=False, index=True
+    )
 
     @declared_attr
     def workflow(self) -> Mapped["Workflow"]:
@@ -33,17 +51,18 @@ class Node(BaseModel):
 
     @declared_attr
     def config(self) -> Mapped["BaseNodeConfiguration"]:
-        return relationship("BaseNodeConfiguration", uselist=False, back_populates="node", lazy="selectin")
+        return relationship(
+            "BaseNodeConfiguration", uselist=False, back_populates="node", lazy="selectin", passive_deletes=True
+        )
 
 
 class BaseNodeConfiguration(BaseModel):
     __tablename__ = "node_configurations"
 
     node_id: Mapped[UUID] = mapped_column(
-        ForeignKey(
-            "nodes.id",
-        ),
+        ForeignKey("nodes.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
     node_type: Mapped[NodeType] = mapped_column(nullable=False)
 
@@ -61,7 +80,7 @@ class BaseNodeConfiguration(BaseModel):
 class StartNodeConfiguration(BaseNodeConfiguration):
     __tablename__ = "start_node_configurations"
 
-    id = Column(UUID(as_uuid=True), ForeignKey("node_configurations.id"), primary_key=True)
+    id = Column(UUID(as_uuid=True), ForeignKey("node_configurations.id", ondelete="CASCADE"), primary_key=True)
 
     __mapper_args__ = {"polymorphic_identity": NodeType.start}
 
@@ -75,7 +94,7 @@ class NodeStatus(enum.Enum):
 class MessageNodeConfiguration(BaseNodeConfiguration):
     __tablename__ = "message_node_configurations"
 
-    id = Column(UUID(as_uuid=True), ForeignKey("node_configurations.id"), primary_key=True)
+    id = Column(UUID(as_uuid=True), ForeignKey("node_configurations.id", ondelete="CASCADE"), primary_key=True)
 
     status: Mapped[NodeStatus] = mapped_column(nullable=True)
     text: Mapped[str] = mapped_column(nullable=False)
@@ -86,7 +105,7 @@ class MessageNodeConfiguration(BaseNodeConfiguration):
 class ConditionNodeConfiguration(BaseNodeConfiguration):
     __tablename__ = "condition_node_configurations"
 
-    id = Column(UUID(as_uuid=True), ForeignKey("node_configurations.id"), primary_key=True)
+    id = Column(UUID(as_uuid=True), ForeignKey("node_configurations.id", ondelete="CASCADE"), primary_key=True)
 
     condition: Mapped[str] = mapped_column(nullable=False)
 
@@ -96,7 +115,7 @@ class ConditionNodeConfiguration(BaseNodeConfiguration):
 class EndNodeConfiguration(BaseNodeConfiguration):
     __tablename__ = "end_node_configurations"
 
-    id = Column(UUID(as_uuid=True), ForeignKey("node_configurations.id"), primary_key=True)
+    id = Column(UUID(as_uuid=True), ForeignKey("node_configurations.id", ondelete="CASCADE"), primary_key=True)
 
     __mapper_args__ = {"polymorphic_identity": NodeType.end}
 
@@ -112,8 +131,8 @@ class Edge(BaseModel):
 
     status: Mapped[EdgeWeight] = mapped_column(nullable=False)
 
-    source_node_id: Mapped[UUID] = mapped_column(ForeignKey("nodes.id"), nullable=False)
-    target_node_id: Mapped[UUID] = mapped_column(ForeignKey("nodes.id"), nullable=False)
+    source_node_id: Mapped[UUID] = mapped_column(ForeignKey("nodes.id", ondelete="CASCADE"), nullable=False)
+    target_node_id: Mapped[UUID] = mapped_column(ForeignKey("nodes.id", ondelete="CASCADE"), nullable=False, index=True)
 
     __table_args__ = (UniqueConstraint("source_node_id", "target_node_id"),)
 
@@ -124,3 +143,22 @@ class Edge(BaseModel):
     @declared_attr
     def target_node(self) -> Mapped["Node"]:
         return relationship("Node", foreign_keys=[self.target_node_id])
+
+
+class RunStatus(enum.Enum):
+    running = "running"
+    finished = "finished"
+    failed = "failed"
+
+
+class WorkflowRun(BaseModel):
+    __tablename__ = "workflow_runs"
+
+    workflow_id: Mapped[UUID] = mapped_column(
+        ForeignKey("workflows.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    status: Mapped[RunStatus] = mapped_column(nullable=False, default=RunStatus.running)
+    current_node_id: Mapped[Optional[UUID]] = mapped_column(ForeignKey("nodes.id", ondelete="SET NULL"), nullable=True)
+    context: Mapped[Dict[str, Any]] = mapped_column(JSONB, nullable=False, default=dict)
+    history: Mapped[List[str]] = mapped_column(JSONB, nullable=False, default=list)
+    error: Mapped[Optional[str]] = mapped_column(nullable=True)
@@ -0,0 +1,26 @@
+from fastapi import APIRouter
+
+from app.services.permissions import permission_cache
+from app.services.users import UserService
+from app.services.workflows import GraphService
+from core.db import async_engine, get_pool_stats, primary_pins, replica_engines
+from core.metrics import request_metrics
+
+metrics_router = APIRouter(tags=["metrics"], prefix="/metrics")
+
+
+class MetricsViewSet:
+    @staticmethod
+    @metrics_router.get("/")
+    async def get_metrics() -> dict:
+        """Returns per-route request histograms and cache, executor and pool stats of this worker."""
+        return {
+            "routes": request_metrics.get_stats(),
+            "pool": get_pool_stats(async_engine),
+            "replica_pools": [get_pool_stats(engine) for engine in replica_engines],
+            "primary_pins": primary_pins.get_stats(),
+            "permission_cache": permission_cache.get_stats(),
+            "principal_cache": UserService.principal_cache.get_stats(),
+            "graph_cache": GraphService.cache.get_stats(),
+            "password_hash_executor": UserService.password_executor.get_stats(),
+        }
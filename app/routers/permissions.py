@@ -0,0 +1,68 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends
+
+from app.serializers.permissions import (
+    PermissionCreateSerializer,
+    PermissionListSerializer,
+    PermissionSerializer,
+    PermissionUpdateSerializer,
+)
+from app.services.permissions import PermissionService
+from app.services.users import Principal
+from app.utils.auth import get_current_reader, get_current_user, get_read_session
+from core.db import get_session
+
+permissions_router = APIRouter(tags=["permissions"], prefix="/workflows/{workflow_id}/permissions")
+
+
+class PermissionViewSet:
+    @staticmethod
+    @permissions_router.get("/", response_model=PermissionListSerializer)
+    async def list_permissions(
+        workflow_id: UUID,
+        user: Principal = Depends(get_current_reader),
+        db=Depends(get_read_session),
+    ):
+        permissions = await PermissionService.list(db=db, workflow_id=workflow_id, user=user)
+        return {"permissions": permissions}
+
+    @staticmethod
+    @permissions_router.post("/", response_model=PermissionSerializer, status_code=201)
+    async def create_permission(
+        workflow_id: UUID,
+        permission_data: PermissionCreateSerializer,
+        user: Principal = Depends(get_current_user),
+        db=Depends(get_session),
+    ):
+        """Only workflow creator grants permissions, the grantee gets access on the next request."""
+        return await PermissionService.create(
+            db=db,
+            user_id=permission_data.user_id,
+            workflow_id=workflow_id,
+            permission=permission_data.permission,
+            user=user,
+        )
+
+    @staticmethod
+    @permissions_router.patch("/{permission_id}/", response_model=PermissionSerializer)
+    async def update_permission(
+        workflow_id: UUID,
+        permission_id: UUID,
+        permission_data: PermissionUpdateSerializer,
+        user: Principal = Depends(get_current_user),
+        db=Depends(get_session),
+    ):
+        return await PermissionService.update(
+            db=db, _id=permission_id, workflow_id=workflow_id, permission=permission_data.permission, user=user
+        )
+
+    @staticmethod
+    @permissions_router.delete("/{permission_id}/", response_model=None, status_code=204)
+    async def delete_permission(
+        workflow_id: UUID,
+        permission_id: UUID,
+        user: Principal = Depends(get_current_user),
+        db=Depends(get_session),
+    ):
+        return await PermissionService.delete(db=db, _id=permission_id, workflow_id=workflow_id, user=user)
@@ -1,34 +1,58 @@
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.models.users import User
+from app.serializers.base import BaseRequestSerializer
 from app.serializers.workflows import (
     ConditionNodeCreateSerializer,
+    EdgeBatchCreateSerializer,
+    EdgeBatchDeleteResultSerializer,
+    EdgeBatchDeleteSerializer,
+    EdgeCreateSerializer,
+    EdgeListSerializer,
+    EdgeSerializer,
     EndNodeCreateSerializer,
+    GraphImportResultSerializer,
+    GraphImportSerializer,
+    GraphValidationSerializer,
     MessageNodeCreateSerializer,
     NodeBaseSerializer,
     NodeListSerializer,
+    NodeSerializer,
+    RunCreateSerializer,
+    RunSerializer,
+    RunStepSerializer,
     StartNodeCreateSerializer,
+    WorkflowCloneSerializer,
     WorkflowCreateSerializer,
+    WorkflowFullSerializer,
     WorkflowListSerializer,
     WorkflowSerializer,
     WorkflowUpdateSerializer,
 )
+from app.services.runs import RunService, WorkflowExecutionError
+from app.services.users import Principal
 from app.services.workflows import (
     ConditionNodeService,
+    EdgeService,
     EndNodeService,
+    GraphService,
     MessageNodeService,
     NodeService,
     StartNodeService,
     WorkflowService,
 )
-from app.utils.auth import get_current_user
+from app.utils.auth import get_current_reader, get_current_user, get_read_session
+from app.utils.etags import get_etag, get_expected_versions
 from core.db import get_session
 
 workflows_router = APIRouter(tags=["workflows"], prefix="/workflows")
 nodes_router = APIRouter(tags=["nodes"], prefix="/workflows/{workflow_id}/nodes")
+edges_router = APIRouter(tags=["edges"], prefix="/workflows/{workflow_id}/edges")
+runs_router = APIRouter(tags=["runs"], prefix="/workflows/{workflow_id}/runs")
 
 
 class WorkflowViewSet:
@@ -36,23 +60,66 @@ class WorkflowViewSet:
     @workflows_router.get("/{workflow_id}/", response_model=WorkflowSerializer)
     async def retrieve_workflow(
         workflow_id: UUID,
-        user: User = Depends(get_current_user),
-        db: Session = Depends(get_session),
-    ) -> WorkflowSerializer:
+        response: Response,
+        if_none_match: Optional[str] = Header(None),
+        user: Principal = Depends(get_current_reader),
+        db: Session = Depends(get_read_session),
+    ):
+        """Returns 304 when `If-None-Match` has the ETag of current workflow revision."""
+        if if_none_match:
+            await WorkflowService.get_etag(db=db, workflow_id=workflow_id, user=user, if_none_match=if_none_match)
         workflow = await WorkflowService.retrieve(db=db, _id=workflow_id, user=user)
-        return WorkflowSerializer(**workflow)
+        response.headers["ETag"] = get_etag(workflow.id, workflow.version)
+        return workflow
+
+    @staticmethod
+    @workflows_router.get(
+        "/{workflow_id}/full/", response_model=WorkflowFullSerializer, response_model_exclude_none=True
+    )
+    async def retrieve_full_workflow(
+        workflow_id: UUID,
+        response: Response,
+        if_none_match: Optional[str] = Header(None),
+        user: Principal = Depends(get_current_reader),
+        db=Depends(get_read_session),
+    ):
+        """
+        Returns workflow with all nodes, their configurations and edges.
+        Returns 304 when `If-None-Match` has the ETag of current workflow revision, nothing else is loaded then.
+        """
+        if if_none_match:
+            await WorkflowService.get_etag(db=db, workflow_id=workflow_id, user=user, if_none_match=if_none_match)
+        full_workflow = await GraphService.retrieve_full(db=db, workflow_id=workflow_id, user=user)
+        workflow = full_workflow["workflow"]
+        response.headers["ETag"] = get_etag(workflow.id, workflow.version)
+        return full_workflow
 
     @staticmethod
     @workflows_router.get("/", response_model=WorkflowListSerializer)
-    async def list_workflows(user: User = Depends(get_current_user), db=Depends(get_session)) -> WorkflowListSerializer:
-        workflows = await WorkflowService.list(db=db, user=user)
-        return WorkflowListSerializer(workflows=workflows)
+    async def list_workflows(
+        limit: int = Query(100, ge=1, le=1000),
+        cursor: Optional[str] = Query(None),
+        stream: bool = Query(False),
+        params: BaseRequestSerializer = Depends(),
+        user: Principal = Depends(get_current_reader),
+        db=Depends(get_read_session),
+    ):
+        """
+        Returns a page of workflows, pass `next_cursor` back as `cursor` for the next one.
+        `search` matches words of name and description, `order_by` is one of `name`, `created_at`, `updated_at`,
+        prefixed with `-` for descending order.
+        With `stream=true` all workflows after cursor are streamed as NDJSON, `limit` is ignored.
+        """
+        filters = {"cursor": cursor, "search": params.search, "order_by": params.order_by}
+        if stream:
+            return StreamingResponse(WorkflowService.stream(user=user, **filters), media_type="application/x-ndjson")
+        return await WorkflowService.list(db=db, user=user, limit=limit, **filters)
 
     @staticmethod
     @workflows_router.post("/", response_model=WorkflowSerializer, status_code=201)
     async def create_workflow(
         workflow_data: WorkflowCreateSerializer,
-        user: User = Depends(get_current_user),
+        user: Principal = Depends(get_current_user),
         db=Depends(get_session),
     ):
         return await WorkflowService.create(db=db, data=workflow_data.__dict__, user=user)
@@ -62,93 +129,174 @@ class WorkflowViewSet:
     async def update_workflow(
         workflow_id: UUID,
         workflow_data: WorkflowUpdateSerializer,
-        user: User = Depends(get_current_user),
+        response: Response,
+        if_match: Optional[str] = Header(None),
+        user: Principal = Depends(get_current_user),
         db=Depends(get_session),
     ):
-        return await WorkflowService.update(db=db, _id=workflow_id, data=workflow_data.__dict__, user=user)
+        """Returns 412 when `If-Match` is given and none of its ETags is of current workflow revision."""
+        workflow = await WorkflowService.update(
+            db=db,
+            _id=workflow_id,
+            data=workflow_data.__dict__,
+            user=user,
+            versions=get_expected_versions(if_match, workflow_id),
+        )
+        response.headers["ETag"] = get_etag(workflow.id, workflow.version)
+        return workflow
 
     @staticmethod
     @workflows_router.delete("/{workflow_id}/", response_model=None, status_code=204)
     async def delete_workflow(
         workflow_id: UUID,
-        user: User = Depends(get_current_user),
+        if_match: Optional[str] = Header(None),
+        user: Principal = Depends(get_current_user),
+        db=Depends(get_session),
+    ):
+        """Returns 412 when `If-Match` is given and none of its ETags is of current workflow revision."""
+        return await WorkflowService.delete(
+            db=db, _id=workflow_id, user=user, versions=get_expected_versions(if_match, workflow_id)
+        )
+
+    @staticmethod
+    @workflows_router.post("/{workflow_id}/clone/", response_model=WorkflowSerializer, status_code=201)
+    async def clone_workflow(
+        workflow_id: UUID,
+        response: Response,
+        clone_data: Optional[WorkflowCloneSerializer] = None,
+        user: Principal = Depends(get_current_user),
         db=Depends(get_session),
     ):
-        return await WorkflowService.delete(db=db, _id=workflow_id, user=user)
+        """Copies workflow with its nodes, their configurations and edges inside the database in one statement."""
+        data = clone_data.model_dump() if clone_data else {}
+        workflow = await WorkflowService.clone(db=db, _id=workflow_id, data=data, user=user)
+        response.headers["ETag"] = get_etag(workflow.id, workflow.version)
+        return workflow
+
+    @staticmethod
+    @workflows_router.post("/{workflow_id}/graph/", response_model=GraphImportResultSerializer, status_code=201)
+    async def import_graph(
+        workflow_id: UUID,
+        graph_data: GraphImportSerializer,
+        user: Principal = Depends(get_current_user),
+        db=Depends(get_session),
+    ):
+        """Creates nodes with configurations and edges in one transaction, returns ids by node `ref`."""
+        return await GraphService.import_graph(db=db, workflow_id=workflow_id, data=graph_data.model_dump(), user=user)
+
+    @staticmethod
+    @workflows_router.get("/{workflow_id}/validate/", response_model=GraphValidationSerializer)
+    async def validate_workflow(
+        workflow_id: UUID,
+        node_id: Optional[List[UUID]] = Query(None),
+        user: Principal = Depends(get_current_reader),
+        db=Depends(get_read_session),
+    ):
+        """
+        Checks workflow graph structure. Pass `node_id` (repeatable) of nodes touched by a change, e.g. both
+        ends of created or deleted edges, to re-check only their edges and the nodes reachable through them.
+        """
+        return await GraphService.validate(db=db, workflow_id=workflow_id, node_ids=node_id, user=user)
 
 
 class NodeViewSet:
     @staticmethod
-    @nodes_router.post("/start/", response_model=NodeBaseSerializer, response_model_exclude_none=True)
+    @nodes_router.post("/start/", response_model=NodeSerializer, response_model_exclude_none=True)
     async def create_start_node(
         workflow_id: UUID,
         node_data: StartNodeCreateSerializer,
-        user: User = Depends(get_current_user),
+        user: Principal = Depends(get_current_user),
         db=Depends(get_session),
     ):
         return await StartNodeService.create(db=db, workflow_id=workflow_id, data=node_data.__dict__, user=user)
 
     @staticmethod
-    @nodes_router.post("/message/", response_model=NodeBaseSerializer, response_model_exclude_none=True)
+    @nodes_router.post("/message/", response_model=NodeSerializer, response_model_exclude_none=True)
     async def create_message_node(
         workflow_id: UUID,
         node_data: MessageNodeCreateSerializer,
-        user: User = Depends(get_current_user),
+        user: Principal = Depends(get_current_user),
         db=Depends(get_session),
     ):
         return await MessageNodeService.create(db=db, workflow_id=workflow_id, data=node_data.__dict__, user=user)
 
     @staticmethod
-    @nodes_router.post("/condition/", response_model=NodeBaseSerializer, response_model_exclude_none=True)
+    @nodes_router.post("/condition/", response_model=NodeSerializer, response_model_exclude_none=True)
     async def create_condition_node(
         workflow_id: UUID,
         node_data: ConditionNodeCreateSerializer,
-        user: User = Depends(get_current_user),
+        user: Principal = Depends(get_current_user),
         db=Depends(get_session),
     ):
         return await ConditionNodeService.create(db=db, workflow_id=workflow_id, data=node_data.__dict__, user=user)
 
     @staticmethod
-    @nodes_router.post("/end/", response_model=NodeBaseSerializer, response_model_exclude_none=True)
+    @nodes_router.post("/end/", response_model=NodeSerializer, response_model_exclude_none=True)
     async def create_end_node(
         workflow_id: UUID,
         node_data: EndNodeCreateSerializer,
-        user: User = Depends(get_current_user),
+        user: Principal = Depends(get_current_user),
         db=Depends(get_session),
     ):
         return await EndNodeService.create(db=db, workflow_id=workflow_id, data=node_data.__dict__, user=user)
 
     @staticmethod
-    @nodes_router.get("/{node_id}/", response_model=NodeBaseSerializer, response_model_exclude_none=True)
+    @nodes_router.get("/{node_id}/", response_model=NodeSerializer, response_model_exclude_none=True)
     async def retrieve_node(
         workflow_id: UUID,
         node_id: UUID,
-        user: User = Depends(get_current_user),
-        db=Depends(get_session),
+        response: Response,
+        if_none_match: Optional[str] = Header(None),
+        user: Principal = Depends(get_current_reader),
+        db=Depends(get_read_session),
     ):
+        """Node ETag is the workflow revision, returns 304 without loading node when `If-None-Match` has it."""
+        response.headers["ETag"] = await WorkflowService.get_etag(
+            db=db, workflow_id=workflow_id, user=user, if_none_match=if_none_match
+        )
         return await NodeService.retrieve(db=db, workflow_id=workflow_id, node_id=node_id, user=user)
 
     @staticmethod
     @nodes_router.get("/", response_model=NodeListSerializer, response_model_exclude_none=True)
     async def list_nodes(
         workflow_id: UUID,
-        user: User = Depends(get_current_user),
-        db=Depends(get_session),
+        response: Response,
+        params: BaseRequestSerializer = Depends(),
+        if_none_match: Optional[str] = Header(None),
+        user: Principal = Depends(get_current_reader),
+        db=Depends(get_read_session),
     ):
-        nodes = await NodeService.list(db=db, workflow_id=workflow_id, user=user)
-        return NodeListSerializer(nodes=nodes)
+        """
+        `search` matches message text and conditions, `order_by` is one of `node_type`, `created_at`, `updated_at`,
+        prefixed with `-` for descending order.
+        Returns 304 without loading nodes when `If-None-Match` has the ETag of current workflow revision.
+        """
+        response.headers["ETag"] = await WorkflowService.get_etag(
+            db=db, workflow_id=workflow_id, user=user, if_none_match=if_none_match
+        )
+        nodes = await NodeService.list(
+            db=db, workflow_id=workflow_id, user=user, search=params.search, order_by=params.order_by
+        )
+        return {"nodes": nodes}
 
     @staticmethod
-    @nodes_router.patch("/{node_id}/", response_model=NodeBaseSerializer, response_model_exclude_none=True)
+    @nodes_router.patch("/{node_id}/", response_model=NodeSerializer, response_model_exclude_none=True)
     async def update_node(
         workflow_id: UUID,
         node_id: UUID,
         node_data: NodeBaseSerializer,
-        user: User = Depends(get_current_user),
+        if_match: Optional[str] = Header(None),
+        user: Principal = Depends(get_current_user),
         db=Depends(get_session),
     ):
+        """Returns 412 when `If-Match` is given and none of its ETags is of current workflow revision."""
         return await NodeService.update(
-            db=db, workflow_id=workflow_id, node_id=node_id, data=node_data.__dict__, user=user
+            db=db,
+            workflow_id=workflow_id,
+            node_id=node_id,
+            data=node_data.model_dump(exclude_unset=True),
+            user=user,
+            versions=get_expected_versions(if_match, workflow_id),
         )
 
     @staticmethod
@@ -156,7 +304,113 @@ class NodeViewSet:
     async def delete_node(
         workflow_id: UUID,
         node_id: UUID,
-        user: User = Depends(get_current_user),
+        if_match: Optional[str] = Header(None),
+        user: Principal = Depends(get_current_user),
+        db=Depends(get_session),
+    ):
+        """Returns 412 when `If-Match` is given and none of its ETags is of current workflow revision."""
+        return await NodeService.delete(
+            db=db,
+            workflow_id=workflow_id,
+            node_id=node_id,
+            user=user,
+            versions=get_expected_versions(if_match, workflow_id),
+        )
+
+
+class EdgeViewSet:
+    @staticmethod
+    @edges_router.get("/", response_model=EdgeListSerializer)
+    async def list_edges(
+        workflow_id: UUID,
+        user: Principal = Depends(get_current_reader),
+        db=Depends(get_read_session),
+    ):
+        edges = await EdgeService.list(db=db, workflow_id=workflow_id, user=user)
+        return {"edges": edges}
+
+    @staticmethod
+    @edges_router.post("/", response_model=EdgeSerializer, status_code=201)
+    async def create_edge(
+        workflow_id: UUID,
+        edge_data: EdgeCreateSerializer,
+        user: Principal = Depends(get_current_user),
+        db=Depends(get_session),
+    ):
+        return await EdgeService.create(db=db, workflow_id=workflow_id, data=edge_data.__dict__, user=user)
+
+    @staticmethod
+    @edges_router.post("/batch/", response_model=EdgeListSerializer, status_code=201)
+    async def create_edges(
+        workflow_id: UUID,
+        edges_data: EdgeBatchCreateSerializer,
+        user: Principal = Depends(get_current_user),
+        db=Depends(get_session),
+    ):
+        """Creates all edges or none of them, node ownership is checked with a single query."""
+        edges = await EdgeService.create_batch(
+            db=db, workflow_id=workflow_id, data=[edge.__dict__ for edge in edges_data.edges], user=user
+        )
+        return {"edges": edges}
+
+    @staticmethod
+    @edges_router.post("/batch/delete/", response_model=EdgeBatchDeleteResultSerializer)
+    async def delete_edges(
+        workflow_id: UUID,
+        edges_data: EdgeBatchDeleteSerializer,
+        user: Principal = Depends(get_current_user),
         db=Depends(get_session),
     ):
-        return await NodeService.delete(db=db, workflow_id=workflow_id, node_id=node_id, user=user)
+        """Deletes edges of workflow with a single statement, ids of other workflows are ignored."""
+        deleted = await EdgeService.delete_batch(db=db, workflow_id=workflow_id, edge_ids=edges_data.ids, user=user)
+        return {"deleted": deleted}
+
+    @staticmethod
+    @edges_router.delete("/{edge_id}/", response_model=None, status_code=204)
+    async def delete_edge(
+        workflow_id: UUID,
+        edge_id: UUID,
+        user: Principal = Depends(get_current_user),
+        db=Depends(get_session),
+    ):
+        return await EdgeService.delete(db=db, workflow_id=workflow_id, edge_id=edge_id, user=user)
+
+
+class RunViewSet:
+    @staticmethod
+    @runs_router.post("/", response_model=RunSerializer, status_code=201)
+    async def create_run(
+        workflow_id: UUID,
+        run_data: RunCreateSerializer,
+        user: Principal = Depends(get_current_user),
+        db=Depends(get_session),
+    ):
+        """Starts a run on the start node and executes it until it ends or `steps` are made."""
+        try:
+            return await RunService.create(db=db, workflow_id=workflow_id, data=run_data.model_dump(), user=user)
+        except WorkflowExecutionError as error:
+            raise HTTPException(status_code=400, detail=str(error))
+
+    @staticmethod
+    @runs_router.get("/{run_id}/", response_model=RunSerializer)
+    async def retrieve_run(
+        workflow_id: UUID,
+        run_id: UUID,
+        user: Principal = Depends(get_current_reader),
+        db=Depends(get_read_session),
+    ):
+        return await RunService.retrieve(db=db, workflow_id=workflow_id, run_id=run_id, user=user)
+
+    @staticmethod
+    @runs_router.post("/{run_id}/step/", response_model=RunSerializer)
+    async def step_run(
+        workflow_id: UUID,
+        run_id: UUID,
+        step_data: RunStepSerializer,
+        user: Principal = Depends(get_current_user),
+        db=Depends(get_session),
+    ):
+        """Makes `steps` steps of a running run, conditions see run context updated with `context`."""
+        return await RunService.step(
+            db=db, workflow_id=workflow_id, run_id=run_id, data=step_data.model_dump(), user=user
+        )
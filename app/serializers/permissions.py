@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import List
+
+from pydantic import UUID4, BaseModel
+
+from app.models.users import PermissionType
+from app.serializers.base import BaseResponseSerializer
+
+
+class PermissionCreateSerializer(BaseModel):
+    user_id: UUID4
+    permission: PermissionType
+
+
+class PermissionUpdateSerializer(BaseModel):
+    permission: PermissionType
+
+
+class PermissionSerializer(BaseResponseSerializer):
+    id: UUID4
+    user_id: UUID4
+    workflow_id: UUID4
+    permission: PermissionType
+    created_at: datetime
+
+
+class PermissionListSerializer(BaseModel):
+    permissions: List[PermissionSerializer]
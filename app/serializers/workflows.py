@@ -1,10 +1,13 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Annotated, Any, Dict, List, Literal, Optional, Union
 
-from pydantic import UUID4, BaseModel, Field
+from pydantic import UUID4, AfterValidator, BaseModel, BeforeValidator, Field, PlainSerializer
 from pydantic.dataclasses import dataclass
 
-from app.models import NodeStatus
+from app.models import EdgeWeight, NodeStatus, NodeType, RunStatus
+from app.serializers.base import BaseResponseSerializer
+from app.utils.conditions import validate_condition
+from settings import WORKFLOW_RUN_MAX_STEPS
 
 
 @dataclass
@@ -25,8 +28,14 @@ class WorkflowUpdateSerializer(WorkflowBaseSerializer):
     pass
 
 
-@dataclass
-class WorkflowSerializer:
+class WorkflowCloneSerializer(BaseModel):
+    """Clone is named `<name> (copy)` and keeps description of source unless they are given."""
+
+    name: Optional[str] = None
+    description: Optional[str] = None
+
+
+class WorkflowSerializer(BaseResponseSerializer):
     id: UUID4
     created_at: datetime
     updated_at: datetime
@@ -34,18 +43,15 @@ class WorkflowSerializer:
     name: str
     description: Optional[str] = None
 
-    class Config:
-        orm_mode = True
-        read_with_orm_mode = True
-
 
 class WorkflowListSerializer(BaseModel):
     workflows: List[WorkflowSerializer]
+    next_cursor: Optional[str] = None
 
 
 class NodeBaseSerializer(BaseModel):
     id: UUID4
-    node_type: str
+    node_type: NodeType
     workflow_id: UUID4
     status: Optional[NodeStatus] = Field(None)
     text: Optional[str] = Field(None)
@@ -68,13 +74,154 @@ class MessageNodeCreateSerializer(NodeBaseCreateSerializer):
     status: Optional[NodeStatus]
 
 
+# conditions are compiled on input, so broken expressions are rejected before they reach a run
+ConditionField = Annotated[str, AfterValidator(validate_condition)]
+
+
 class ConditionNodeCreateSerializer(NodeBaseCreateSerializer):
-    pass
+    condition: ConditionField
 
 
 class EndNodeCreateSerializer(NodeBaseCreateSerializer):
     pass
 
 
+class NodeSerializer(BaseResponseSerializer):
+    """Validated straight from node list rows or node dicts."""
+
+    id: UUID4
+    node_type: NodeType
+    workflow_id: UUID4
+    text: Optional[str] = None
+    status: Optional[NodeStatus] = None
+    condition: Optional[str] = None
+
+
 class NodeListSerializer(BaseModel):
-    nodes: List[NodeBaseSerializer]
+    nodes: List[NodeSerializer]
+
+
+# edge weights are exposed by name (`yes`, `no`, `zero`), the same way they are stored
+EdgeWeightField = Annotated[
+    EdgeWeight,
+    BeforeValidator(lambda value: EdgeWeight.__members__.get(value, value) if isinstance(value, str) else value),
+    PlainSerializer(lambda weight: weight.name, return_type=str),
+]
+
+
+class StartGraphNodeSerializer(StartNodeCreateSerializer):
+    ref: str
+    node_type: Literal["start"]
+
+
+class MessageGraphNodeSerializer(MessageNodeCreateSerializer):
+    ref: str
+    node_type: Literal["message"]
+
+
+class ConditionGraphNodeSerializer(ConditionNodeCreateSerializer):
+    ref: str
+    node_type: Literal["condition"]
+
+
+class EndGraphNodeSerializer(EndNodeCreateSerializer):
+    ref: str
+    node_type: Literal["end"]
+
+
+GraphNodeSerializer = Annotated[
+    Union[StartGraphNodeSerializer, MessageGraphNodeSerializer, ConditionGraphNodeSerializer, EndGraphNodeSerializer],
+    Field(discriminator="node_type"),
+]
+
+
+class GraphEdgeSerializer(BaseModel):
+    source: str
+    target: str
+    status: EdgeWeightField = EdgeWeight.zero
+
+
+class GraphImportSerializer(BaseModel):
+    """Nodes are referenced by `ref`, which only has to be unique within the document."""
+
+    nodes: List[GraphNodeSerializer]
+    edges: List[GraphEdgeSerializer] = []
+
+
+class GraphImportResultSerializer(BaseModel):
+    nodes: Dict[str, UUID4]
+    edges: List[UUID4]
+
+
+class GraphIssueSerializer(BaseModel):
+    code: str
+    message: str
+    node_ids: List[UUID4]
+
+
+class GraphValidationSerializer(BaseModel):
+    valid: bool
+    version: int
+    issues: List[GraphIssueSerializer]
+
+
+class EdgeCreateSerializer(BaseModel):
+    source_node_id: UUID4
+    target_node_id: UUID4
+    status: EdgeWeightField = EdgeWeight.zero
+
+
+class EdgeBatchCreateSerializer(BaseModel):
+    edges: List[EdgeCreateSerializer] = Field(min_length=1)
+
+
+class EdgeBatchDeleteSerializer(BaseModel):
+    ids: List[UUID4] = Field(min_length=1)
+
+
+class EdgeSerializer(BaseResponseSerializer):
+    id: UUID4
+    source_node_id: UUID4
+    target_node_id: UUID4
+    status: EdgeWeightField
+    created_at: datetime
+
+
+class EdgeListSerializer(BaseModel):
+    edges: List[EdgeSerializer]
+
+
+class EdgeBatchDeleteResultSerializer(BaseModel):
+    deleted: List[UUID4]
+
+
+class RunCreateSerializer(BaseModel):
+    """Run goes on until it ends unless `steps` limits it, `steps=0` only places it on the start node."""
+
+    context: Dict[str, Any] = {}
+    steps: Optional[int] = Field(None, ge=0, le=WORKFLOW_RUN_MAX_STEPS)
+
+
+class RunStepSerializer(BaseModel):
+    """`context` is merged into run context before stepping."""
+
+    context: Dict[str, Any] = {}
+    steps: int = Field(1, ge=1, le=WORKFLOW_RUN_MAX_STEPS)
+
+
+class RunSerializer(BaseResponseSerializer):
+    id: UUID4
+    workflow_id: UUID4
+    status: RunStatus
+    current_node_id: Optional[UUID4] = None
+    context: Dict[str, Any]
+    history: List[UUID4]
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+
+class WorkflowFullSerializer(BaseModel):
+    workflow: WorkflowSerializer
+    nodes: List[NodeSerializer]
+    edges: List[EdgeSerializer]
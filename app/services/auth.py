@@ -61,7 +61,9 @@ class AuthService:
         user = await UserDAL(db=db).get_user_by_email(
             email=credentials["email"], error={"status_code": 401, "detail": "Incorrect email or password"}
         )
-        if user and UserService.verify_password(plain_password=credentials["password"], hashed_password=user.password):
+        if user and await UserService.verify_password(
+            plain_password=credentials["password"], hashed_password=user.password
+        ):
             access_token, refresh_token = JWTService.create_tokens(data={"user_id": user.id})
             return dict(access=access_token, refresh=refresh_token)
         raise HTTPException(
@@ -0,0 +1,205 @@
+from typing import FrozenSet, List, Optional, Union
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.dals.permissions import PermissionDAL
+from app.models.users import Permission, PermissionType, User
+from app.utils.cache import TTLCache
+from settings import (
+    PERMISSION_CACHE_MAX_USERS,
+    PERMISSION_CACHE_MAX_WORKFLOWS,
+    PERMISSION_CACHE_TTL,
+    PERMISSION_CACHE_URL,
+)
+
+
+class InMemoryPermissionCacheBackend:
+    """
+    Keeps `{workflow_id: permissions}` per user inside the worker process.
+    Both levels are LRU, so at most `max_users * max_workflows` entries are held.
+    """
+
+    def __init__(self, max_users: int, max_workflows: int, ttl: float) -> None:
+        self.cache = TTLCache(max_size=max_users, ttl=ttl)
+        self.max_workflows = max_workflows
+
+    async def get(self, user_id: UUID, workflow_id: UUID) -> Optional[FrozenSet[PermissionType]]:
+        user_permissions = self.cache.get(user_id, count=False)
+        return user_permissions.get(workflow_id, count=False) if user_permissions is not None else None
+
+    async def set(self, user_id: UUID, workflow_id: UUID, permissions: FrozenSet[PermissionType]) -> None:
+        user_permissions = self.cache.get(user_id, count=False)
+        if user_permissions is None:
+            user_permissions = TTLCache(max_size=self.max_workflows)
+            self.cache.set(user_id, user_permissions)
+        user_permissions.set(workflow_id, permissions)
+
+    async def invalidate_user(self, user_id: UUID) -> None:
+        self.cache.pop(user_id)
+
+    async def invalidate_workflow(self, workflow_id: UUID) -> None:
+        for user_id in self.cache.keys():
+            user_permissions = self.cache.get(user_id, count=False)
+            if user_permissions is not None:
+                user_permissions.pop(workflow_id)
+
+
+class RedisPermissionCacheBackend:
+    """
+    Keeps permissions in a redis hash per user so all workers share them, and a set of cached user ids per
+    workflow so invalidating a workflow only touches its users. Size is bounded by redis `maxmemory` with
+    an LRU eviction policy.
+    """
+
+    prefix = "workflow_api:permissions"
+
+    def __init__(self, url: str, ttl: float) -> None:
+        try:
+            from redis import asyncio as redis
+        except ImportError as error:
+            raise ImportError("Install `redis` to use PERMISSION_CACHE_URL") from error
+
+        self.redis = redis.from_url(url)
+        self.ttl = int(ttl)
+
+    def _get_key(self, user_id: UUID) -> str:
+        return f"{self.prefix}:{user_id}"
+
+    def _get_workflow_key(self, workflow_id: UUID) -> str:
+        return f"{self.prefix}:workflow:{workflow_id}"
+
+    async def get(self, user_id: UUID, workflow_id: UUID) -> Optional[FrozenSet[PermissionType]]:
+        value = await self.redis.hget(self._get_key(user_id), str(workflow_id))
+        if value is None:
+            return None
+        return frozenset(PermissionType(permission) for permission in value.decode().split(",") if permission)
+
+    async def set(self, user_id: UUID, workflow_id: UUID, permissions: FrozenSet[PermissionType]) -> None:
+        key, workflow_key = self._get_key(user_id), self._get_workflow_key(workflow_id)
+        value = ",".join(sorted(permission.value for permission in permissions))
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hset(key, str(workflow_id), value).expire(key, self.ttl, nx=True)
+            # the index outlives every hash entry it points to, stale user ids only cost a no-op `HDEL`
+            pipe.sadd(workflow_key, str(user_id)).expire(workflow_key, self.ttl)
+            await pipe.execute()
+
+    async def invalidate_user(self, user_id: UUID) -> None:
+        await self.redis.delete(self._get_key(user_id))
+
+    async def invalidate_workflow(self, workflow_id: UUID) -> None:
+        workflow_key = self._get_workflow_key(workflow_id)
+        user_ids = await self.redis.smembers(workflow_key)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for user_id in user_ids:
+                pipe.hdel(self._get_key(user_id.decode()), str(workflow_id))
+            await pipe.delete(workflow_key).execute()
+
+
+class PermissionCache:
+    """Counts hits and misses on top of a backend, ids are normalized to `UUID` so keys match."""
+
+    def __init__(self, backend) -> None:
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, user_id: UUID, workflow_id: UUID) -> Optional[FrozenSet[PermissionType]]:
+        permissions = await self.backend.get(UUID(str(user_id)), UUID(str(workflow_id)))
+        if permissions is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return permissions
+
+    async def set(self, user_id: UUID, workflow_id: UUID, permissions: FrozenSet[PermissionType]) -> None:
+        await self.backend.set(UUID(str(user_id)), UUID(str(workflow_id)), permissions)
+
+    async def invalidate_user(self, user_id: UUID) -> None:
+        await self.backend.invalidate_user(UUID(str(user_id)))
+
+    async def invalidate_workflow(self, workflow_id: UUID) -> None:
+        await self.backend.invalidate_workflow(UUID(str(workflow_id)))
+
+    def get_stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def get_permission_cache_backend():
+    if PERMISSION_CACHE_URL:
+        return RedisPermissionCacheBackend(url=PERMISSION_CACHE_URL, ttl=PERMISSION_CACHE_TTL)
+    return InMemoryPermissionCacheBackend(
+        max_users=PERMISSION_CACHE_MAX_USERS, max_workflows=PERMISSION_CACHE_MAX_WORKFLOWS, ttl=PERMISSION_CACHE_TTL
+    )
+
+
+permission_cache = PermissionCache(get_permission_cache_backend())
+
+
+class PermissionService:
+    DAL = PermissionDAL
+    cache = permission_cache
+
+    @classmethod
+    async def get_workflow_permissions(cls, db: Session, workflow_id: UUID, user: User) -> FrozenSet[PermissionType]:
+        permissions = await cls.cache.get(user.id, workflow_id)
+        if permissions is None:
+            permissions = await cls.DAL(db=db, current_user=user).get_workflow_permissions(workflow_id=workflow_id)
+            await cls.cache.set(user.id, workflow_id, permissions)
+        return permissions
+
+    @classmethod
+    async def check_permission(
+        cls, db: Session, workflow_id: UUID, user: User, permission: Optional[PermissionType] = None
+    ) -> None:
+        """Raises 404 if user can't access workflow, any permission is enough when `permission` is not given."""
+        permissions = await cls.get_workflow_permissions(db=db, workflow_id=workflow_id, user=user)
+        if not permissions or (permission and permission not in permissions):
+            raise HTTPException(status_code=404, detail="Workflow not found")
+
+    @classmethod
+    async def check_creator(cls, db: Session, workflow_id: UUID, user: User) -> None:
+        """Raises 404 unless user created the workflow, only creators manage who else can access it."""
+        if not await cls.DAL(db=db, current_user=user).is_workflow_creator(workflow_id=workflow_id):
+            raise HTTPException(status_code=404, detail="Workflow not found")
+
+    @classmethod
+    async def list(cls, db: Session, workflow_id: UUID, user: User) -> List[Permission]:
+        await cls.check_creator(db=db, workflow_id=workflow_id, user=user)
+        return await cls.DAL(db=db, current_user=user).list_permissions(workflow_id=workflow_id)
+
+    @classmethod
+    async def create(
+        cls,
+        db: Session,
+        user_id: Union[str, UUID],
+        workflow_id: Union[str, UUID],
+        permission: PermissionType,
+        user: User,
+    ) -> Permission:
+        await cls.check_creator(db=db, workflow_id=workflow_id, user=user)
+        permission = await cls.DAL(db=db, current_user=user).create_permission(
+            user_id=user_id, workflow_id=workflow_id, permission=permission
+        )
+        await cls.cache.invalidate_user(permission.user_id)
+        return permission
+
+    @classmethod
+    async def update(
+        cls, db: Session, _id: Union[str, UUID], workflow_id: Union[str, UUID], permission: PermissionType, user: User
+    ) -> Permission:
+        await cls.check_creator(db=db, workflow_id=workflow_id, user=user)
+        permission = await cls.DAL(db=db, current_user=user).update_permission(
+            permission_id=_id, workflow_id=workflow_id, permission_type=permission
+        )
+        await cls.cache.invalidate_user(permission.user_id)
+        return permission
+
+    @classmethod
+    async def delete(cls, db: Session, _id: Union[str, UUID], workflow_id: Union[str, UUID], user: User) -> None:
+        await cls.check_creator(db=db, workflow_id=workflow_id, user=user)
+        permission = await cls.DAL(db=db, current_user=user).delete_permission(
+            permission_id=_id, workflow_id=workflow_id
+        )
+        await cls.cache.invalidate_user(permission.user_id)
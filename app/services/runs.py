@@ -0,0 +1,123 @@
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.dals.runs import RunDAL
+from app.models.users import PermissionType, User
+from app.models.workflows import EdgeWeight, NodeType, RunStatus
+from app.services.permissions import PermissionService
+from app.services.workflows import GraphService
+from app.utils.conditions import ConditionError, evaluate_condition
+from app.utils.graph import CompiledGraph
+from settings import WORKFLOW_RUN_MAX_STEPS
+
+
+class WorkflowExecutionError(Exception):
+    """Workflow can't be executed as it is, routers answer it with 400."""
+
+
+class WorkflowEngine:
+    """Walks a compiled graph, every step moves a run from its current node along exactly one outgoing edge."""
+
+    def __init__(self, graph: CompiledGraph) -> None:
+        self.graph = graph
+
+    def get_start_node_id(self) -> UUID:
+        if len(self.graph.start_nodes) != 1:
+            raise WorkflowExecutionError("Workflow must have exactly one start node")
+        return self.graph.node_ids[self.graph.start_nodes[0]]
+
+    def get_next_node(self, i: int, context: Dict[str, Any]) -> int:
+        status = None
+        if self.graph.node_types[i] == NodeType.condition:
+            try:
+                holds = evaluate_condition(self.graph.configs[i].condition, context)
+            except ConditionError as error:
+                raise WorkflowExecutionError(f"Node {self.graph.node_ids[i]}: {error}") from error
+            status = EdgeWeight.yes if holds else EdgeWeight.no
+
+        successors = self.graph.get_successors(i, status)
+        edge_name = f"{status.name} edge" if status else "outgoing edge"
+        if not successors:
+            raise WorkflowExecutionError(f"Node {self.graph.node_ids[i]} has no {edge_name}")
+        if len(successors) > 1:
+            raise WorkflowExecutionError(f"Node {self.graph.node_ids[i]} has more than one {edge_name}")
+        return successors[0]
+
+    def run(self, state: Dict[str, Any], steps: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Advances run state by `steps` or until the run reaches an end node, returns the new state.
+        Runs without a step limit fail after `WORKFLOW_RUN_MAX_STEPS`, so cycles can't loop forever.
+        """
+        context, history = state["context"], [*state["history"]]
+        result = {**state, "history": history}
+
+        i = self.graph.index.get(state["current_node_id"])
+        if i is None:
+            return {**result, "status": RunStatus.failed, "error": "Current node doesn't exist"}
+
+        for _ in range(WORKFLOW_RUN_MAX_STEPS if steps is None else steps):
+            try:
+                i = self.get_next_node(i, context)
+            except WorkflowExecutionError as error:
+                return {**result, "status": RunStatus.failed, "error": str(error)}
+
+            node_id = self.graph.node_ids[i]
+            history.append(str(node_id))
+            result["current_node_id"] = node_id
+            if self.graph.node_types[i] == NodeType.end:
+                return {**result, "status": RunStatus.finished}
+
+        if steps is None:
+            return {**result, "status": RunStatus.failed, "error": "Step limit exceeded"}
+        return result
+
+
+class RunService:
+    DAL = RunDAL
+
+    @classmethod
+    async def get_engine(cls, db: Session, workflow_id: UUID, user: User = None) -> WorkflowEngine:
+        graph = await GraphService.get_compiled_graph(db=db, workflow_id=workflow_id, user=user)
+        return WorkflowEngine(graph)
+
+    @classmethod
+    async def retrieve(cls, db: Session, workflow_id: UUID, run_id: UUID, user: User = None):
+        await PermissionService.check_permission(db, workflow_id, user)
+        return await cls.DAL(db=db, current_user=user).get_run(workflow_id=workflow_id, run_id=run_id)
+
+    @classmethod
+    async def create(cls, db: Session, workflow_id: UUID, data: Dict[str, Any], user: User = None):
+        await PermissionService.check_permission(db, workflow_id, user, PermissionType.edit)
+
+        engine = await cls.get_engine(db=db, workflow_id=workflow_id, user=user)
+        start_node_id = engine.get_start_node_id()
+        state = {
+            "status": RunStatus.running,
+            "current_node_id": start_node_id,
+            "context": data["context"],
+            "history": [str(start_node_id)],
+        }
+        state = engine.run(state, steps=data["steps"])
+        return await cls.DAL(db=db, current_user=user).create_run(workflow_id=workflow_id, run_data=state)
+
+    @classmethod
+    async def step(cls, db: Session, workflow_id: UUID, run_id: UUID, data: Dict[str, Any], user: User = None):
+        await PermissionService.check_permission(db, workflow_id, user, PermissionType.edit)
+
+        dal = cls.DAL(db=db, current_user=user)
+        run = await dal.get_run(workflow_id=workflow_id, run_id=run_id, for_update=True)
+        if run.status != RunStatus.running:
+            raise HTTPException(status_code=400, detail=f"Run is {run.status.value}")
+
+        engine = await cls.get_engine(db=db, workflow_id=workflow_id, user=user)
+        state = {
+            "status": run.status,
+            "current_node_id": run.current_node_id,
+            "context": {**run.context, **data["context"]},
+            "history": run.history,
+        }
+        state = engine.run(state, steps=data["steps"])
+        return await dal.update_run(run=run, update_data=state)
@@ -1,28 +1,82 @@
-from typing import Any, Dict
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Union
+from uuid import UUID
 
 from fastapi import HTTPException
 from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 
 from app.dals.users import UserDAL
+from app.utils.cache import TTLCache
+from app.utils.executors import BoundedExecutor
+from settings import AUTH_CACHE_MAX_SIZE, AUTH_CACHE_TTL, PASSWORD_HASH_QUEUE_SIZE, PASSWORD_HASH_WORKERS
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Authenticated user without ORM state, safe to keep between requests."""
+
+    id: UUID
+    email: str
 
 
 class UserService:
     pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    principal_cache = TTLCache(max_size=AUTH_CACHE_MAX_SIZE)
+    password_executor = BoundedExecutor(
+        max_workers=PASSWORD_HASH_WORKERS, max_queue_size=PASSWORD_HASH_QUEUE_SIZE, name="password-hash"
+    )
 
     @classmethod
-    def hash_password(cls, plain_password: str) -> str:
-        return cls.pwd_context.hash(plain_password)
+    async def hash_password(cls, plain_password: str) -> str:
+        return await cls.password_executor.run(cls.pwd_context.hash, plain_password)
 
     @classmethod
-    def verify_password(cls, plain_password: str, hashed_password: str) -> bool:
-        return cls.pwd_context.verify(plain_password, hashed_password)
+    async def verify_password(cls, plain_password: str, hashed_password: str) -> bool:
+        return await cls.password_executor.run(cls.pwd_context.verify, plain_password, hashed_password)
 
     @classmethod
     async def create_user(cls, db: Session, data: Dict[str, Any]):
         existing_user = await UserDAL(db).get_user_by_email(data["email"], raise_exception=False)
         if existing_user:
             raise HTTPException(detail="User with this email already exists", status_code=400)
-        data["password"] = cls.hash_password(data["password"])
+        data["password"] = await cls.hash_password(data["password"])
         user = await UserDAL(db).create_user(data)
         return user.__dict__
+
+    @classmethod
+    async def get_principal(cls, db: Session, user_id: Union[str, UUID], jti: str, expires_at: int) -> Principal:
+        """
+        Returns user of a verified token, cached by token `jti` for `AUTH_CACHE_TTL` at most and never past
+        the token expiry. The cache is per worker, so the TTL bounds how long other workers accept tokens
+        of a deleted user.
+        """
+        principal = cls.principal_cache.get(jti)
+        if principal is None:
+            user = await UserDAL(db).get_user(user_id)
+            principal = Principal(id=user.id, email=user.email)
+            ttl = min(expires_at - time.time(), AUTH_CACHE_TTL)
+            if ttl > 0:
+                cls.principal_cache.set(jti, principal, ttl=ttl)
+        return principal
+
+    @classmethod
+    def evict_principal(cls, user_id: Union[str, UUID]) -> None:
+        """Drops cached tokens of user in this worker, so its next request re-reads user from db."""
+        user_id = UUID(str(user_id))
+        for jti in cls.principal_cache.keys():
+            principal = cls.principal_cache.get(jti, count=False)
+            if principal and principal.id == user_id:
+                cls.principal_cache.pop(jti)
+
+    @classmethod
+    async def change_password(cls, db: Session, user_id: Union[str, UUID], password: str):
+        user = await UserDAL(db).update_user(user_id, {"password": await cls.hash_password(password)})
+        cls.evict_principal(user_id)
+        return user.__dict__
+
+    @classmethod
+    async def delete_user(cls, db: Session, user_id: Union[str, UUID]) -> None:
+        await UserDAL(db).delete_user(user_id)
+        cls.evict_principal(user_id)
@@ -1,13 +1,29 @@
-from typing import Any, Dict, Optional, Type, Union
-from uuid import UUID
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Union
+from uuid import UUID, uuid4
 
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
-from app.dals.workflows import ConditionNodeDAL, EndNodeDAL, MessageNodeDAL, NodeDAL, StartNodeDAL, WorkflowDAL
-from app.models import Workflow
-from app.models.users import User
-from app.models.workflows import BaseNodeConfiguration, Node
+from app.dals.workflows import (
+    ConditionNodeDAL,
+    EdgeDAL,
+    EndNodeDAL,
+    GraphDAL,
+    MessageNodeDAL,
+    NodeDAL,
+    StartNodeDAL,
+    WorkflowDAL,
+)
+from app.models.users import PermissionType, User
+from app.models.workflows import EdgeWeight, Node, NodeType
+from app.serializers.workflows import WorkflowSerializer
+from app.services.permissions import PermissionService
+from app.utils.cache import TTLCache
+from app.utils.etags import get_etag, is_not_modified
+from app.utils.graph import CompiledGraph, validate_graph
+from app.utils.pagination import decode_cursor, get_next_cursor, get_ordering
+from core.db import get_read_sessionmaker
+from settings import GRAPH_CACHE_MAX_SIZE
 
 
 class WorkflowService:
@@ -15,38 +31,117 @@ class WorkflowService:
 
     @classmethod
     async def retrieve(cls, db: Session, _id: Union[str, UUID], user: User = None):
-        workflow = await cls.DAL(db=db, current_user=user).get_workflow(workflow_id=_id)
-        return workflow.__dict__
+        await PermissionService.check_permission(db, _id, user)
+        return await cls.DAL(db=db, current_user=user).get_workflow(workflow_id=_id)
 
     @classmethod
-    async def list(cls, db: Session, user: User):
+    async def get_etag(
+        cls, db: Session, workflow_id: Union[str, UUID], user: User = None, if_none_match: Optional[str] = None
+    ) -> str:
+        """
+        Returns ETag of current workflow revision, raises 304 if it matches `If-None-Match`.
+        With cached permissions it costs a single primary key lookup and nothing else is loaded.
+        """
+        await PermissionService.check_permission(db, workflow_id, user)
+        version = await GraphDAL(db=db, current_user=user).get_version(workflow_id)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Workflow not found")
+        etag = get_etag(workflow_id, version)
+        if is_not_modified(if_none_match, etag):
+            raise HTTPException(status_code=304, headers={"ETag": etag})
+        return etag
+
+    @classmethod
+    def _get_keyset(cls, cursor: Optional[str], order_by: Optional[str]):
+        order_by = order_by or cls.DAL.default_order_by
+        column, _ = get_ordering(order_by, cls.DAL.order_by_fields)
+        after = decode_cursor(cursor, order_by, column) if cursor else None
+        return order_by, column, after
+
+    @classmethod
+    async def list(
+        cls,
+        db: Session,
+        user: User,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        search: Optional[str] = None,
+        order_by: Optional[str] = None,
+    ):
         if not user:
             raise HTTPException(status_code=401, detail="User not found")
-        workflows = await cls.DAL(db=db, current_user=user).list_workflows()
-        return [workflow.__dict__ for workflow in workflows]
+        order_by, column, after = cls._get_keyset(cursor, order_by)
+        workflows = await cls.DAL(db=db, current_user=user).list_workflows(
+            limit=limit + 1, after=after, search=search, order_by=order_by
+        )
+        return {
+            "workflows": workflows[:limit],
+            "next_cursor": get_next_cursor(workflows, limit, order_by, column),
+        }
+
+    @classmethod
+    def stream(
+        cls, user: User, cursor: Optional[str] = None, search: Optional[str] = None, order_by: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Returns NDJSON lines of all workflows after cursor. Rows are read with a server-side cursor
+        in a read session owned by the iterator, since request session is closed before the body is sent.
+        """
+        if not user:
+            raise HTTPException(status_code=401, detail="User not found")
+        order_by, _, after = cls._get_keyset(cursor, order_by)
+
+        async def iterate_workflows():
+            async with get_read_sessionmaker(user.id)() as db:
+                workflows = await cls.DAL(db=db, current_user=user).stream_workflows(
+                    after=after, search=search, order_by=order_by
+                )
+                async for workflow in workflows:
+                    yield WorkflowSerializer.model_validate(workflow).model_dump_json() + "\n"
+
+        return iterate_workflows()
 
     @classmethod
     async def create(cls, db: Session, data: Dict[str, Any], user: User = None):
-        workflow = await cls.DAL(db=db, current_user=user).create_workflow(create_data=data)
-        return workflow.__dict__
+        return await cls.DAL(db=db, current_user=user).create_workflow(create_data=data)
+
+    @classmethod
+    async def update(
+        cls,
+        db: Session,
+        _id: Union[str, UUID],
+        data: Dict[str, Any],
+        user: User = None,
+        versions: Optional[Set[int]] = None,
+    ):
+        return await cls.DAL(db=db, current_user=user).update_workflow(
+            workflow_id=_id, update_data=data, versions=versions
+        )
 
     @classmethod
-    async def update(cls, db: Session, _id: Union[str, UUID], data: Dict[str, Any], user: User = None):
-        workflow = await cls.DAL(db=db, current_user=user).update_workflow(workflow_id=_id, update_data=data)
-        return workflow.__dict__
+    async def clone(cls, db: Session, _id: Union[str, UUID], data: Dict[str, Any], user: User = None):
+        return await cls.DAL(db=db, current_user=user).clone_workflow(workflow_id=_id, **data)
 
     @classmethod
-    async def delete(cls, db: Session, _id: Union[str, UUID], user: User = None):
-        return await cls.DAL(db=db, current_user=user).delete_workflow(workflow_id=_id)
+    async def delete(cls, db: Session, _id: Union[str, UUID], user: User = None, versions: Optional[Set[int]] = None):
+        await cls.DAL(db=db, current_user=user).delete_workflow(workflow_id=_id, versions=versions)
+        await PermissionService.cache.invalidate_workflow(_id)
 
 
 class NodeService:
     DAL = NodeDAL
 
     @staticmethod
-    def _get_dict(node: Optional[Node], config: Type[BaseNodeConfiguration] = None) -> Dict[str, Any]:
-        config = config or node.config
-        return {**config.__dict__, **node.__dict__}
+    def _get_dict(node: Node) -> Dict[str, Any]:
+        config = node.config
+        return {
+            "id": node.id,
+            "node_type": node.node_type,
+            "workflow_id": node.workflow_id,
+            "text": getattr(config, "text", None),
+            "status": getattr(config, "status", None),
+            "condition": getattr(config, "condition", None),
+        }
 
     @staticmethod
     def _get_node_data(workflow_id: UUID):
@@ -58,22 +153,30 @@ class NodeService:
 
     @classmethod
     async def create(cls, db: Session, workflow_id: UUID, data: Dict[str, Any], user: User = None):
-        await WorkflowDAL(db, user).get_workflow(workflow_id, on_update=True, select_fields=[Workflow.id])
+        await PermissionService.check_permission(db, workflow_id, user, PermissionType.edit)
 
         node = cls._get_node_data(workflow_id)
         config = cls._get_node_configuration_data(data)
-        node, config = await cls.DAL(db=db, current_user=user).create_node(node_data=node, configuration_data=config)
-        return cls._get_dict(node, config)
+        return await cls.DAL(db=db, current_user=user).create_node(node_data=node, configuration_data=config)
 
     @classmethod
     async def retrieve(cls, db: Session, workflow_id: Union[str, UUID], node_id: Union[str, UUID], user: User = None):
-        node = await cls.DAL(db=db, current_user=user).get_node(workflow_id=workflow_id, node_id=node_id)
-        return cls._get_dict(node)
+        await PermissionService.check_permission(db, workflow_id, user)
+        return await cls.DAL(db=db, current_user=user).get_node_row(workflow_id=workflow_id, node_id=node_id)
 
     @classmethod
-    async def list(cls, db: Session, workflow_id: Union[str, UUID], user: User = None):
-        nodes = await cls.DAL(db=db, current_user=user).list_nodes(workflow_id=workflow_id)
-        return [node.__dict__ for node in nodes]
+    async def list(
+        cls,
+        db: Session,
+        workflow_id: Union[str, UUID],
+        user: User = None,
+        search: Optional[str] = None,
+        order_by: Optional[str] = None,
+    ):
+        await PermissionService.check_permission(db, workflow_id, user)
+        return await cls.DAL(db=db, current_user=user).list_nodes(
+            workflow_id=workflow_id, search=search, order_by=order_by
+        )
 
     @classmethod
     async def update(
@@ -83,15 +186,25 @@ class NodeService:
         node_id: Union[str, UUID],
         data: Dict[str, Any],
         user: User = None,
+        versions: Optional[Set[int]] = None,
     ):
-        config = await cls.DAL(db=db, current_user=user).update_node(
-            workflow_id=workflow_id, node_id=node_id, update_data=data
+        return await cls.DAL(db=db, current_user=user).update_node(
+            workflow_id=workflow_id, node_id=node_id, update_data=data, versions=versions
         )
-        return cls._get_dict(config.node, config)
 
     @classmethod
-    async def delete(cls, db: Session, workflow_id: Union[str, UUID], node_id: Union[str, UUID], user: User = None):
-        return await cls.DAL(db=db, current_user=user).delete_node(workflow_id=workflow_id, node_id=node_id)
+    async def delete(
+        cls,
+        db: Session,
+        workflow_id: Union[str, UUID],
+        node_id: Union[str, UUID],
+        user: User = None,
+        versions: Optional[Set[int]] = None,
+    ):
+        await PermissionService.check_permission(db, workflow_id, user, PermissionType.edit)
+        return await cls.DAL(db=db, current_user=user).delete_node(
+            workflow_id=workflow_id, node_id=node_id, versions=versions
+        )
 
 
 class StartNodeService(NodeService):
@@ -108,3 +221,131 @@ class ConditionNodeService(NodeService):
 
 class EndNodeService(NodeService):
     DAL = EndNodeDAL
+
+
+class EdgeService:
+    DAL = EdgeDAL
+
+    @staticmethod
+    def _get_edges_data(data: List[Dict[str, Any]]):
+        for edge in data:
+            if edge["source_node_id"] == edge["target_node_id"]:
+                raise HTTPException(status_code=400, detail="Edge can't connect node to itself")
+        if len({(edge["source_node_id"], edge["target_node_id"]) for edge in data}) != len(data):
+            raise HTTPException(status_code=400, detail="Edge already exists")
+        return data
+
+    @classmethod
+    async def list(cls, db: Session, workflow_id: UUID, user: User = None):
+        await PermissionService.check_permission(db, workflow_id, user)
+        return await cls.DAL(db=db, current_user=user).list_edges(workflow_id=workflow_id)
+
+    @classmethod
+    async def create(cls, db: Session, workflow_id: UUID, data: Dict[str, Any], user: User = None):
+        edges = await cls.create_batch(db=db, workflow_id=workflow_id, data=[data], user=user)
+        return edges[0]
+
+    @classmethod
+    async def create_batch(cls, db: Session, workflow_id: UUID, data: List[Dict[str, Any]], user: User = None):
+        await PermissionService.check_permission(db, workflow_id, user, PermissionType.edit)
+        edges = cls._get_edges_data(data)
+        return await cls.DAL(db=db, current_user=user).create_edges(workflow_id=workflow_id, edges_data=edges)
+
+    @classmethod
+    async def delete(cls, db: Session, workflow_id: UUID, edge_id: UUID, user: User = None):
+        deleted_ids = await cls.delete_batch(db=db, workflow_id=workflow_id, edge_ids=[edge_id], user=user)
+        if not deleted_ids:
+            raise HTTPException(status_code=404, detail="Edge not found")
+
+    @classmethod
+    async def delete_batch(cls, db: Session, workflow_id: UUID, edge_ids: List[UUID], user: User = None):
+        await PermissionService.check_permission(db, workflow_id, user, PermissionType.edit)
+        return await cls.DAL(db=db, current_user=user).delete_edges(workflow_id=workflow_id, edge_ids=edge_ids)
+
+
+class GraphService:
+    DAL = GraphDAL
+    cache = TTLCache(max_size=GRAPH_CACHE_MAX_SIZE)
+
+    @staticmethod
+    def _get_nodes_data(data: Dict[str, Any]):
+        node_ids, nodes = {}, []
+        for node in data["nodes"]:
+            ref = node.pop("ref")
+            if ref in node_ids:
+                raise HTTPException(status_code=400, detail=f"Duplicate node ref: {ref}")
+            node_ids[ref] = uuid4()
+            nodes.append({"id": node_ids[ref], "node_type": NodeType(node.pop("node_type")), "configuration": node})
+        return node_ids, nodes
+
+    @staticmethod
+    def _get_edges_data(data: Dict[str, Any], node_ids: Dict[str, UUID]):
+        edges, connected_refs = [], set()
+        for edge in data["edges"]:
+            refs = (edge["source"], edge["target"])
+            unknown_refs = sorted(set(refs) - node_ids.keys())
+            if unknown_refs:
+                raise HTTPException(status_code=400, detail=f"Unknown node ref: {', '.join(unknown_refs)}")
+            if refs in connected_refs:
+                raise HTTPException(status_code=400, detail=f"Duplicate edge: {' -> '.join(refs)}")
+            connected_refs.add(refs)
+            edges.append(
+                {
+                    "id": uuid4(),
+                    "source_node_id": node_ids[edge["source"]],
+                    "target_node_id": node_ids[edge["target"]],
+                    "status": EdgeWeight[edge["status"]],
+                }
+            )
+        return edges
+
+    @classmethod
+    async def import_graph(cls, db: Session, workflow_id: UUID, data: Dict[str, Any], user: User = None):
+        await PermissionService.check_permission(db, workflow_id, user, PermissionType.edit)
+
+        node_ids, nodes = cls._get_nodes_data(data)
+        edges = cls._get_edges_data(data, node_ids)
+        await cls.DAL(db=db, current_user=user).import_graph(workflow_id=workflow_id, nodes=nodes, edges=edges)
+        return {"nodes": node_ids, "edges": [edge["id"] for edge in edges]}
+
+    @classmethod
+    async def retrieve_full(cls, db: Session, workflow_id: UUID, user: User = None) -> Dict[str, Any]:
+        """Returns workflow with nodes, their configurations and edges in three queries whatever the graph size."""
+        await PermissionService.check_permission(db, workflow_id, user)
+        workflow = await WorkflowDAL(db=db, current_user=user).get_workflow(workflow_id=workflow_id)
+        nodes = await cls.DAL(db=db, current_user=user).list_nodes_with_configs(workflow_id=workflow_id)
+        edges = await EdgeDAL(db=db, current_user=user).list_edges(workflow_id=workflow_id)
+        return {
+            "workflow": workflow,
+            "nodes": [NodeService._get_dict(node) for node in nodes],
+            "edges": edges,
+        }
+
+    @classmethod
+    async def get_compiled_graph(cls, db: Session, workflow_id: UUID, user: User = None) -> CompiledGraph:
+        """
+        Returns compiled graph of the current workflow version. A cache hit costs one primary key lookup of the
+        version, any graph mutation bumps it, so stale graphs are never returned and just age out of the cache.
+        Callers check permissions.
+        """
+        dal = cls.DAL(db=db, current_user=user)
+        version = await dal.get_version(workflow_id=workflow_id)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Workflow not found")
+
+        key = (UUID(str(workflow_id)), version)
+        graph = cls.cache.get(key)
+        if graph is None:
+            nodes, edges = await dal.load_graph(workflow_id=workflow_id)
+            graph = CompiledGraph(nodes, edges, version=version)
+            cls.cache.set(key, graph)
+        return graph
+
+    @classmethod
+    async def validate(
+        cls, db: Session, workflow_id: UUID, node_ids: Optional[List[UUID]] = None, user: User = None
+    ) -> Dict[str, Any]:
+        await PermissionService.check_permission(db, workflow_id, user)
+        graph = await cls.get_compiled_graph(db=db, workflow_id=workflow_id, user=user)
+        issues = validate_graph(graph, node_ids=node_ids)
+        return {"valid": not issues, "version": graph.version, "issues": [issue._asdict() for issue in issues]}
@@ -1,25 +1,60 @@
 from typing import Optional
 
-from fastapi import Depends, Header
+from fastapi import Depends, Header, HTTPException
 from fastapi.security import HTTPBearer, OAuth2
 from fastapi.security.utils import get_authorization_scheme_param
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.dals.users import UserDAL
 from app.services.auth import JWTService
-from core.db import get_session
+from app.services.users import Principal, UserService
+from core.db import get_read_sessionmaker, get_session
 from settings import JWT_SECRET_KEY
 
 
-async def authenticate(db: Session, authorization: str = Depends(OAuth2()), token: str = Depends(HTTPBearer())):
+async def authenticate(
+    db: Session, authorization: str = Depends(OAuth2()), token: str = Depends(HTTPBearer())
+) -> Principal:
     """Extracts token from authorization header and raises error if invalid."""
     _, token = get_authorization_scheme_param(authorization)
     user_data = JWTService.decode_token(token=token, key=JWT_SECRET_KEY)
-    return await UserDAL(db=db).get_user(user_id=user_data["user_id"])
+    return await UserService.get_principal(
+        db=db, user_id=user_data["user_id"], jti=user_data["jti"], expires_at=user_data["exp"]
+    )
 
 
-async def get_current_user(db: Session = Depends(get_session), authorization: Optional[str] = Header(default="")):
-    """Returns user from db if token in header given."""
+def get_token_user_id(authorization: str) -> Optional[str]:
+    """Returns user id of a valid token, invalid ones are rejected later by `authenticate`."""
+    _, token = get_authorization_scheme_param(authorization)
+    try:
+        return JWTService.decode_token(token=token, key=JWT_SECRET_KEY)["user_id"]
+    except HTTPException:
+        return None
+
+
+async def get_read_session(authorization: Optional[str] = Header(default="")) -> AsyncSession:
+    """Session of a read replica for read-only routes, users who have just written read from primary."""
+    user_id = get_token_user_id(authorization) if authorization else None
+    async with get_read_sessionmaker(user_id)() as session:
+        yield session
+
+
+async def get_current_user(
+    db: Session = Depends(get_session), authorization: Optional[str] = Header(default="")
+) -> Optional[Principal]:
+    """Returns user of token in header, db is queried only when token is not cached yet."""
+    if authorization:
+        principal = await authenticate(db=db, authorization=authorization)
+        # commits of this session pin the user's reads to primary, see `core.db.PrimarySession`
+        db.info["user_id"] = principal.id
+        return principal
+    return None
+
+
+async def get_current_reader(
+    db: Session = Depends(get_read_session), authorization: Optional[str] = Header(default="")
+) -> Optional[Principal]:
+    """Same as `get_current_user` for read-only routes, user is looked up through the read session."""
     if authorization:
         return await authenticate(db=db, authorization=authorization)
     return None
@@ -0,0 +1,162 @@
+import ast
+import operator
+from functools import lru_cache
+from typing import Any, Callable, FrozenSet, Mapping
+
+from settings import CONDITION_CACHE_SIZE, CONDITION_VARIABLES
+
+CONDITION_MAX_LENGTH = 1000
+
+Evaluator = Callable[[Mapping[str, Any]], Any]
+
+
+class ConditionError(ValueError):
+    pass
+
+
+def _multiply(left: Any, right: Any) -> Any:
+    # sequence repetition would let a short condition allocate unbounded memory
+    if not isinstance(left, (int, float)) or not isinstance(right, (int, float)):
+        raise TypeError("only numbers can be multiplied")
+    return left * right
+
+
+def _contains(left: Any, right: Any) -> bool:
+    return left in right
+
+
+def _not_contains(left: Any, right: Any) -> bool:
+    return left not in right
+
+
+COMPARISON_OPERATORS = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.In: _contains,
+    ast.NotIn: _not_contains,
+}
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: _multiply,
+    ast.Div: operator.truediv,
+    ast.Mod: operator.mod,
+}
+UNARY_OPERATORS = {ast.Not: operator.not_, ast.USub: operator.neg, ast.UAdd: operator.pos}
+CONSTANT_TYPES = (bool, int, float, str, type(None))
+
+
+def _compile_comparison(node: ast.Compare, variables: FrozenSet[str]) -> Evaluator:
+    left = _compile(node.left, variables)
+    operations = [
+        (_get_operator(COMPARISON_OPERATORS, op), _compile(value, variables))
+        for op, value in zip(node.ops, node.comparators)
+    ]
+
+    def compare(context):
+        left_value = left(context)
+        for compare_values, right in operations:
+            right_value = right(context)
+            if not compare_values(left_value, right_value):
+                return False
+            left_value = right_value
+        return True
+
+    return compare
+
+
+def _compile_bool_operation(node: ast.BoolOp, variables: FrozenSet[str]) -> Evaluator:
+    """Short-circuits like Python, the result is the operand that decided it, not a bool."""
+    values = [_compile(value, variables) for value in node.values]
+    stop_on = not isinstance(node.op, ast.And)
+
+    def evaluate(context):
+        for value in values:
+            result = value(context)
+            if bool(result) is stop_on:
+                return result
+        return result
+
+    return evaluate
+
+
+def _get_operator(operators: dict, op: ast.AST) -> Callable:
+    if type(op) not in operators:
+        raise ConditionError(f"Unsupported operator: {type(op).__name__}")
+    return operators[type(op)]
+
+
+def _compile(node: ast.AST, variables: FrozenSet[str]) -> Evaluator:
+    """Turns an allowed AST node into a closure over `context`, anything else is rejected."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, CONSTANT_TYPES):
+        value = node.value
+        return lambda context: value
+
+    if isinstance(node, ast.Name):
+        if node.id not in variables:
+            raise ConditionError(f"Unknown variable: {node.id}")
+        name = node.id
+        return lambda context: context.get(name)
+
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        items = [_compile(item, variables) for item in node.elts]
+        return lambda context: tuple(item(context) for item in items)
+
+    if isinstance(node, ast.BoolOp):
+        return _compile_bool_operation(node, variables)
+
+    if isinstance(node, ast.UnaryOp):
+        unary, operand = _get_operator(UNARY_OPERATORS, node.op), _compile(node.operand, variables)
+        return lambda context: unary(operand(context))
+
+    if isinstance(node, ast.BinOp):
+        binary = _get_operator(BINARY_OPERATORS, node.op)
+        left, right = _compile(node.left, variables), _compile(node.right, variables)
+        return lambda context: binary(left(context), right(context))
+
+    if isinstance(node, ast.Compare):
+        return _compile_comparison(node, variables)
+
+    raise ConditionError(f"Unsupported expression: {type(node).__name__}")
+
+
+@lru_cache(maxsize=CONDITION_CACHE_SIZE)
+def compile_condition(
+    condition: str, variables: FrozenSet[str] = CONDITION_VARIABLES
+) -> Callable[[Mapping[str, Any]], bool]:
+    """
+    Compiles condition to a function of run context. Conditions are Python-like expressions of context
+    variables, literals, arithmetic, comparisons and `and`/`or`/`not`; only names from `variables` are
+    allowed and calls, attributes and subscripts are rejected, so nothing outside the context can be
+    reached. Compiled conditions are memoized by text and allowed variables.
+    """
+    if len(condition) > CONDITION_MAX_LENGTH:
+        raise ConditionError(f"Condition is longer than {CONDITION_MAX_LENGTH} characters")
+    try:
+        tree = ast.parse(condition.strip(), mode="eval")
+        evaluate = _compile(tree.body, variables)
+    except SyntaxError as error:
+        raise ConditionError(f"Invalid condition syntax: {error.msg}") from error
+    except RecursionError as error:
+        raise ConditionError("Condition is nested too deeply") from error
+    return lambda context: bool(evaluate(context))
+
+
+def validate_condition(condition: str, variables: FrozenSet[str] = CONDITION_VARIABLES) -> str:
+    compile_condition(condition, variables)
+    return condition
+
+
+def evaluate_condition(
+    condition: str, context: Mapping[str, Any], variables: FrozenSet[str] = CONDITION_VARIABLES
+) -> bool:
+    try:
+        return compile_condition(condition, variables)(context)
+    except ConditionError:
+        raise
+    except (ArithmeticError, TypeError, ValueError) as error:
+        raise ConditionError(f"Condition `{condition}` failed: {error}") from error
@@ -0,0 +1,38 @@
+from typing import List, Optional, Set
+from uuid import UUID
+
+
+def get_etag(workflow_id: UUID, version: int) -> str:
+    """Strong ETag of workflow revision, `version` is bumped by every change of workflow or its graph."""
+    return f'"{workflow_id}.{version}"'
+
+
+def parse_etags(header: str) -> List[str]:
+    return [etag.strip() for etag in header.split(",") if etag.strip()]
+
+
+def is_not_modified(if_none_match: Optional[str], etag: str) -> bool:
+    """`If-None-Match` uses weak comparison, so `W/` prefixes are ignored."""
+    if not if_none_match:
+        return False
+    etags = [etag.removeprefix("W/") for etag in parse_etags(if_none_match)]
+    return "*" in etags or etag in etags
+
+
+def get_expected_versions(if_match: Optional[str], workflow_id: UUID) -> Optional[Set[int]]:
+    """
+    Returns workflow versions `If-Match` allows a write on, `None` when any version is fine.
+    Weak ETags, ETags of other workflows or in a foreign format never match, so they may leave the set empty.
+    Guarded writes then fail with 412 only after the workflow was found with write permission.
+    """
+    if not if_match or "*" in parse_etags(if_match):
+        return None
+
+    versions = set()
+    for etag in parse_etags(if_match):
+        if etag.startswith("W/"):
+            continue
+        etag_workflow_id, _, version = etag.strip('"').rpartition(".")
+        if etag_workflow_id == str(workflow_id) and version.isdigit():
+            versions.add(int(version))
+    return versions
@@ -0,0 +1,63 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from fastapi import HTTPException
+
+
+class BoundedExecutor:
+    """
+    Runs blocking calls in a thread pool with a limited queue, so they don't block the event loop.
+    Calls over `max_workers + max_queue_size` in flight are rejected with 503 instead of piling up.
+    """
+
+    def __init__(self, max_workers: int, max_queue_size: int, name: str) -> None:
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self.max_pending = max_workers + max_queue_size
+        self.pending = 0
+        self.calls = 0
+        self.rejected = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.run_time = 0.0
+        self.max_run_time = 0.0
+
+    async def run(self, func: Callable, *args: Any) -> Any:
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="Server is busy, try again later", headers={"Retry-After": "1"})
+
+        def timed_call():
+            started_at = time.perf_counter()
+            return started_at, func(*args), time.perf_counter()
+
+        self.pending += 1
+        submitted_at = time.perf_counter()
+        try:
+            started_at, result, finished_at = await asyncio.get_running_loop().run_in_executor(
+                self.executor, timed_call
+            )
+        finally:
+            self.pending -= 1
+
+        self._record(wait_time=started_at - submitted_at, run_time=finished_at - started_at)
+        return result
+
+    def _record(self, wait_time: float, run_time: float) -> None:
+        self.calls += 1
+        self.wait_time += wait_time
+        self.run_time += run_time
+        self.max_wait_time = max(self.max_wait_time, wait_time)
+        self.max_run_time = max(self.max_run_time, run_time)
+
+    def get_stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "calls": self.calls,
+            "rejected": self.rejected,
+            "avg_wait_time": self.wait_time / self.calls if self.calls else 0.0,
+            "max_wait_time": self.max_wait_time,
+            "avg_run_time": self.run_time / self.calls if self.calls else 0.0,
+            "max_run_time": self.max_run_time,
+        }
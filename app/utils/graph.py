@@ -0,0 +1,222 @@
+from array import array
+from functools import cached_property
+from typing import Any, Iterable, List, NamedTuple, Optional, Set, Tuple
+from uuid import UUID
+
+from app.models.workflows import EdgeWeight, NodeStatus, NodeType
+
+
+class MessageConfig(NamedTuple):
+    text: str
+    status: Optional[NodeStatus]
+
+
+class ConditionConfig(NamedTuple):
+    condition: str
+
+
+class CompiledGraph:
+    """
+    Immutable workflow graph prepared for traversal. Nodes are numbered `0..n-1` and described by parallel lists
+    of ids, types and typed config tuples, outgoing edges of node `i` are `targets[offsets[i]:offsets[i + 1]]`
+    with matching `weights` (CSR layout), so walking it touches neither the database nor ORM objects.
+    """
+
+    def __init__(self, nodes: Iterable[Any], edges: Iterable[Tuple[UUID, UUID, EdgeWeight]], version: int = 0):
+        self.version = version
+        self.node_ids: List[UUID] = []
+        self.node_types: List[NodeType] = []
+        self.configs: List[Any] = []
+        for node in nodes:
+            self.node_ids.append(node.id)
+            self.node_types.append(node.node_type)
+            self.configs.append(self._get_config(node))
+        self.index = {node_id: i for i, node_id in enumerate(self.node_ids)}
+        self.start_nodes = [i for i, node_type in enumerate(self.node_types) if node_type == NodeType.start]
+
+        edges = sorted(
+            (self.index[source], self.index[target], status.value)
+            for source, target, status in edges
+            if source in self.index and target in self.index
+        )
+        self.offsets = array("l", [0] * (len(self.node_ids) + 1))
+        for source, _, _ in edges:
+            self.offsets[source + 1] += 1
+        for i in range(len(self.node_ids)):
+            self.offsets[i + 1] += self.offsets[i]
+        self.targets = array("l", (target for _, target, _ in edges))
+        self.weights = array("b", (weight for _, _, weight in edges))
+
+    @staticmethod
+    def _get_config(node: Any) -> Any:
+        if node.node_type == NodeType.message:
+            return MessageConfig(node.text, node.status)
+        if node.node_type == NodeType.condition:
+            return ConditionConfig(node.condition)
+        return None
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    @cached_property
+    def reversed_adjacency(self) -> Tuple[array, array]:
+        """Incoming edges in the same CSR layout, built once per compiled version on first use."""
+        offsets = array("l", [0] * (len(self) + 1))
+        for target in self.targets:
+            offsets[target + 1] += 1
+        for i in range(len(self)):
+            offsets[i + 1] += offsets[i]
+
+        sources, position = array("l", [0] * len(self.targets)), array("l", offsets)
+        for i in range(len(self)):
+            for j in range(self.offsets[i], self.offsets[i + 1]):
+                target = self.targets[j]
+                sources[position[target]] = i
+                position[target] += 1
+        return offsets, sources
+
+    def get_successors(self, i: int, status: Optional[EdgeWeight] = None) -> List[int]:
+        """Returns indexes of nodes `i` has edges to, only through edges with given status if it's passed."""
+        start, end = self.offsets[i], self.offsets[i + 1]
+        if status is None:
+            return list(self.targets[start:end])
+        return [self.targets[j] for j in range(start, end) if self.weights[j] == status.value]
+
+
+class GraphIssue(NamedTuple):
+    code: str
+    message: str
+    node_ids: List[UUID]
+
+
+def _check_node(graph: CompiledGraph, i: int) -> List[GraphIssue]:
+    """Checks outgoing edges of a single node, the same way the run engine chooses them."""
+    node_ids, node_type = [graph.node_ids[i]], graph.node_types[i]
+    weights = graph.weights[graph.offsets[i] : graph.offsets[i + 1]]
+
+    if node_type == NodeType.end:
+        return [GraphIssue("end_node_edges", "End node has outgoing edges", node_ids)] if weights else []
+    if node_type == NodeType.condition:
+        return [
+            GraphIssue("condition_edges", f"Condition node must have exactly one {status.name} edge", node_ids)
+            for status in (EdgeWeight.yes, EdgeWeight.no)
+            if weights.count(status.value) != 1
+        ]
+    if len(weights) != 1:
+        return [GraphIssue("outgoing_edges", "Node must have exactly one outgoing edge", node_ids)]
+    return []
+
+
+def _get_reachable(size: int, roots: Iterable[int], offsets: array, targets: array) -> bytearray:
+    reachable, stack = bytearray(size), list(roots)
+    for i in stack:
+        reachable[i] = 1
+    while stack:
+        i = stack.pop()
+        for j in range(offsets[i], offsets[i + 1]):
+            target = targets[j]
+            if not reachable[target]:
+                reachable[target] = 1
+                stack.append(target)
+    return reachable
+
+
+def _walk(
+    roots: Iterable[int], offsets: array, targets: array, within: Optional[Set[int]] = None, limit: Optional[int] = None
+) -> Optional[Set[int]]:
+    """Collects nodes reachable from `roots`, staying inside `within`. Gives up with `None` past `limit` nodes."""
+    visited = set(roots)
+    stack = list(visited)
+    while stack:
+        i = stack.pop()
+        for j in range(offsets[i], offsets[i + 1]):
+            target = targets[j]
+            if target not in visited and (within is None or target in within):
+                visited.add(target)
+                stack.append(target)
+                if limit is not None and len(visited) > limit:
+                    return None
+    return visited
+
+
+def _has_edge_outside(i: int, offsets: array, targets: array, region: Set[int]) -> bool:
+    return any(targets[j] not in region for j in range(offsets[i], offsets[i + 1]))
+
+
+def _validate_reachability(graph: CompiledGraph) -> List[GraphIssue]:
+    from_start = _get_reachable(len(graph), graph.start_nodes, graph.offsets, graph.targets)
+    end_nodes = [i for i, node_type in enumerate(graph.node_types) if node_type == NodeType.end]
+    to_end = _get_reachable(len(graph), end_nodes, *graph.reversed_adjacency)
+
+    issues = []
+    unreachable = [graph.node_ids[i] for i in range(len(graph)) if not from_start[i]]
+    if unreachable:
+        issues.append(GraphIssue("unreachable", "Nodes can't be reached from the start node", unreachable))
+    no_exit = [graph.node_ids[i] for i in range(len(graph)) if from_start[i] and not to_end[i]]
+    if no_exit:
+        issues.append(GraphIssue("no_exit", "Nodes can't reach an end node", no_exit))
+    return issues
+
+
+def _validate_region_reachability(graph: CompiledGraph, touched: List[int]) -> List[GraphIssue]:
+    """
+    Re-checks reachability only around touched nodes. A change of their edges can strand nodes downstream
+    of them and cut the exit of nodes upstream of them, nodes outside those regions keep the state they had
+    before the change. So regions are entered from outside nodes as from the start node or an end node,
+    and the walks never leave the regions. Regions over half of the graph fall back to full traversals,
+    so the incremental check never costs much more than the full one.
+    """
+    source_offsets, sources = graph.reversed_adjacency
+    limit = len(graph) // 2
+    downstream = _walk(touched, graph.offsets, graph.targets, limit=limit)
+    upstream = _walk(touched, source_offsets, sources, limit=limit) if downstream is not None else None
+    if upstream is None:
+        return _validate_reachability(graph)
+
+    entries = [
+        i
+        for i in downstream
+        if graph.node_types[i] == NodeType.start or _has_edge_outside(i, source_offsets, sources, downstream)
+    ]
+    from_start = _walk(entries, graph.offsets, graph.targets, within=downstream)
+    exits = [
+        i
+        for i in upstream
+        if graph.node_types[i] == NodeType.end or _has_edge_outside(i, graph.offsets, graph.targets, upstream)
+    ]
+    to_end = _walk(exits, source_offsets, sources, within=upstream)
+
+    issues = []
+    unreachable = [graph.node_ids[i] for i in sorted(downstream - from_start)]
+    if unreachable:
+        issues.append(GraphIssue("unreachable", "Nodes can't be reached from the start node", unreachable))
+    no_exit = [graph.node_ids[i] for i in sorted(upstream - to_end) if i not in downstream or i in from_start]
+    if no_exit:
+        issues.append(GraphIssue("no_exit", "Nodes can't reach an end node", no_exit))
+    return issues
+
+
+def validate_graph(graph: CompiledGraph, node_ids: Optional[Iterable[UUID]] = None) -> List[GraphIssue]:
+    """
+    Finds structural problems in linear time: start node count, per-node edge rules, nodes unreachable
+    from the start node and nodes that can't reach any end node (dead ends and cycles without exit).
+    Passing `node_ids` of nodes touched by a mutation re-checks only their edges and reachability of nodes
+    downstream and upstream of them, the rest of the graph is taken as it was before the mutation.
+    """
+    issues = []
+    if len(graph.start_nodes) != 1:
+        start_node_ids = [graph.node_ids[i] for i in graph.start_nodes]
+        issues.append(GraphIssue("start_node", "Workflow must have exactly one start node", start_node_ids))
+
+    if node_ids is not None:
+        nodes = sorted({graph.index[node_id] for node_id in node_ids if node_id in graph.index})
+    else:
+        nodes = range(len(graph))
+    for i in nodes:
+        issues.extend(_check_node(graph, i))
+
+    if len(graph.start_nodes) != 1:
+        return issues
+    if node_ids is not None:
+        return issues + (_validate_region_reachability(graph, nodes) if nodes else [])
+    return issues + _validate_reachability(graph)
@@ -0,0 +1,42 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import ColumnElement
+
+
+def get_ordering(order_by: str, fields: Dict[str, ColumnElement]) -> Tuple[ColumnElement, bool]:
+    """Resolves `order_by` against allowed fields, leading `-` means descending order."""
+    column = fields.get(order_by.removeprefix("-"))
+    if column is None:
+        raise HTTPException(status_code=400, detail=f"Invalid order_by, allowed fields: {', '.join(fields)}")
+    return column, order_by.startswith("-")
+
+
+def encode_cursor(order_by: str, value: Any, _id: UUID) -> str:
+    """Encodes keyset position as an opaque url-safe string."""
+    return base64.urlsafe_b64encode(json.dumps([order_by, value, _id], default=str).encode()).decode()
+
+
+def decode_cursor(cursor: str, order_by: str, column: ColumnElement) -> Tuple[Any, UUID]:
+    """Decodes keyset position, cursor is valid only for the ordering it was issued for."""
+    try:
+        cursor_order_by, value, _id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if cursor_order_by != order_by:
+            raise ValueError("Cursor was issued for another ordering")
+        if column.type.python_type is datetime:
+            value = datetime.fromisoformat(value)
+        return value, UUID(_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def get_next_cursor(items: list, limit: int, order_by: str, column: ColumnElement) -> Optional[str]:
+    """Returns cursor after the last item of page if `limit + 1` items were fetched."""
+    if len(items) <= limit:
+        return None
+    last = items[limit - 1]
+    return encode_cursor(order_by, getattr(last, column.key), last.id)
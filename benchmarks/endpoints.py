@@ -0,0 +1,349 @@
+"""
+Seeds synthetic tenants into the configured database and drives the app with concurrent clients, then reports
+latency percentiles, throughput and SQL statements per request of every route and saves them as JSON.
+Statement counts come from `GET /metrics/` snapshots taken before and after the measured phase.
+
+    docker compose -f benchmarks/docker-compose.yml up -d
+    DB_HOST=127.0.0.1 DB_PORT=5433 DB_USER=postgres DB_PASSWORD=postgres DB_DB=workflow_benchmark \\
+        python -m benchmarks.endpoints --reset [--users 10] [--workflows 20] [--nodes 10] [--shared 2] \\
+        [--concurrency 20] [--requests 5000] [--output result.json] [--baseline previous.json]
+
+Requests go through `httpx.ASGITransport`, so the app runs in this process and no server is needed.
+`--reset` drops and recreates the schema, run it only against a benchmark database.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+
+import httpx
+
+from alembic import command
+from alembic.config import Config
+from benchmarks.seed import PASSWORD, SeedSize, Tenant, seed
+from core.db import async_session
+from core.main import app
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+# statements per request are averages, cache misses make them vary a bit between runs
+QUERY_TOLERANCE = 0.5
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def request(self, client: httpx.AsyncClient, route: str, url: str, token: str, **kwargs) -> httpx.Response:
+        """Sends request to `url`, `route` is `METHOD /path/template/` the app reports metrics under."""
+        method = route.split(" ", 1)[0]
+        started_at = time.perf_counter()
+        response = await client.request(method, url, headers={"Authorization": f"Bearer {token}"}, **kwargs)
+        self.latencies[route].append(time.perf_counter() - started_at)
+        if response.is_error:
+            self.errors[route] += 1
+        return response
+
+
+def pick_workflow(tenant: Tenant, rng: random.Random, own: bool = False):
+    """Picks own workflow or, for reads, sometimes one shared with the tenant."""
+    if not own and tenant.shared_workflow_ids and rng.random() < 0.3:
+        workflow_id = rng.choice(tenant.shared_workflow_ids)
+        return workflow_id, None
+    workflow = rng.choice(tenant.workflows)
+    return workflow.id, workflow
+
+
+async def list_workflows(client, recorder, tenant, rng):
+    await recorder.request(client, "GET /workflows/", "/workflows/?limit=20", tenant.token)
+
+
+async def retrieve_workflow(client, recorder, tenant, rng):
+    workflow_id, _ = pick_workflow(tenant, rng)
+    await recorder.request(client, "GET /workflows/{workflow_id}/", f"/workflows/{workflow_id}/", tenant.token)
+
+
+async def retrieve_full_workflow(client, recorder, tenant, rng):
+    workflow_id, _ = pick_workflow(tenant, rng)
+    await recorder.request(
+        client, "GET /workflows/{workflow_id}/full/", f"/workflows/{workflow_id}/full/", tenant.token
+    )
+
+
+async def validate_workflow(client, recorder, tenant, rng):
+    workflow_id, _ = pick_workflow(tenant, rng)
+    await recorder.request(
+        client, "GET /workflows/{workflow_id}/validate/", f"/workflows/{workflow_id}/validate/", tenant.token
+    )
+
+
+async def update_workflow(client, recorder, tenant, rng):
+    workflow_id, _ = pick_workflow(tenant, rng, own=True)
+    await recorder.request(
+        client,
+        "PATCH /workflows/{workflow_id}/",
+        f"/workflows/{workflow_id}/",
+        tenant.token,
+        json={"name": f"Workflow {rng.random()}", "description": "Updated benchmark workflow"},
+    )
+
+
+async def list_nodes(client, recorder, tenant, rng):
+    workflow_id, _ = pick_workflow(tenant, rng)
+    await recorder.request(
+        client, "GET /workflows/{workflow_id}/nodes/", f"/workflows/{workflow_id}/nodes/", tenant.token
+    )
+
+
+async def retrieve_node(client, recorder, tenant, rng):
+    _, workflow = pick_workflow(tenant, rng, own=True)
+    await recorder.request(
+        client,
+        "GET /workflows/{workflow_id}/nodes/{node_id}/",
+        f"/workflows/{workflow.id}/nodes/{rng.choice(workflow.node_ids)}/",
+        tenant.token,
+    )
+
+
+async def create_and_delete_node(client, recorder, tenant, rng):
+    """Node is deleted right away, so the seeded graphs stay the same between iterations."""
+    workflow_id, _ = pick_workflow(tenant, rng, own=True)
+    response = await recorder.request(
+        client,
+        "POST /workflows/{workflow_id}/nodes/message/",
+        f"/workflows/{workflow_id}/nodes/message/",
+        tenant.token,
+        json={"text": "Benchmark", "status": "pending"},
+    )
+    if response.is_success:
+        await recorder.request(
+            client,
+            "DELETE /workflows/{workflow_id}/nodes/{node_id}/",
+            f"/workflows/{workflow_id}/nodes/{response.json()['id']}/",
+            tenant.token,
+        )
+
+
+async def list_edges(client, recorder, tenant, rng):
+    workflow_id, _ = pick_workflow(tenant, rng)
+    await recorder.request(
+        client, "GET /workflows/{workflow_id}/edges/", f"/workflows/{workflow_id}/edges/", tenant.token
+    )
+
+
+async def run_workflow(client, recorder, tenant, rng):
+    workflow_id, _ = pick_workflow(tenant, rng, own=True)
+    response = await recorder.request(
+        client,
+        "POST /workflows/{workflow_id}/runs/",
+        f"/workflows/{workflow_id}/runs/",
+        tenant.token,
+        json={"steps": 1},
+    )
+    if response.is_success:
+        url = f"/workflows/{workflow_id}/runs/{response.json()['id']}/"
+        await recorder.request(client, "GET /workflows/{workflow_id}/runs/{run_id}/", url, tenant.token)
+        await recorder.request(
+            client, "POST /workflows/{workflow_id}/runs/{run_id}/step/", f"{url}step/", tenant.token, json={}
+        )
+
+
+# relative frequency of scenarios, reads dominate like they do for an editor UI
+SCENARIOS = {
+    list_workflows: 3,
+    retrieve_workflow: 3,
+    retrieve_full_workflow: 2,
+    list_nodes: 2,
+    retrieve_node: 2,
+    list_edges: 1,
+    validate_workflow: 1,
+    update_workflow: 1,
+    create_and_delete_node: 1,
+    run_workflow: 1,
+}
+
+
+async def login(client: httpx.AsyncClient, tenants) -> None:
+    for tenant in tenants:
+        response = await client.post("/auth/login/", json={"email": tenant.email, "password": PASSWORD})
+        response.raise_for_status()
+        tenant.token = response.json()["access"]
+
+
+async def get_route_metrics(client: httpx.AsyncClient, token: str) -> dict:
+    response = await client.get("/metrics/", headers={"Authorization": f"Bearer {token}"})
+    response.raise_for_status()
+    return response.json()["routes"]
+
+
+async def run_load(client, tenants, total_requests: int, concurrency: int, seed_value: int) -> Recorder:
+    """Every worker replays its own seeded sequence of scenarios until `total_requests` scenarios are started."""
+    recorder, scenarios, weights = Recorder(), list(SCENARIOS), list(SCENARIOS.values())
+    remaining = total_requests
+
+    async def worker(number):
+        nonlocal remaining
+        rng = random.Random(seed_value * 1000 + number)
+        while remaining > 0:
+            remaining -= 1
+            scenario = rng.choices(scenarios, weights)[0]
+            await scenario(client, recorder, rng.choice(tenants), rng)
+
+    await asyncio.gather(*(worker(number) for number in range(concurrency)))
+    return recorder
+
+
+def get_percentiles(values) -> dict:
+    values = sorted(values)
+    if len(values) > 1:
+        cuts = statistics.quantiles(values, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = values[0]
+    to_ms = 1000
+    return {
+        "mean": statistics.fmean(values) * to_ms,
+        "p50": p50 * to_ms,
+        "p95": p95 * to_ms,
+        "p99": p99 * to_ms,
+        "max": values[-1] * to_ms,
+    }
+
+
+def get_metrics_delta(before: dict, after: dict, route: str, name: str) -> tuple:
+    """Returns count and sum a histogram of the route gained between snapshots."""
+    stats_after = after.get(route, {}).get(name, {"count": 0, "sum": 0})
+    stats_before = before.get(route, {}).get(name, {"count": 0, "sum": 0})
+    return stats_after["count"] - stats_before["count"], stats_after["sum"] - stats_before["sum"]
+
+
+def get_report(recorder: Recorder, elapsed: float, metrics_before: dict, metrics_after: dict) -> dict:
+    routes = {}
+    for route, latencies in sorted(recorder.latencies.items()):
+        count, statements = get_metrics_delta(metrics_before, metrics_after, route, "statements")
+        _, db_time = get_metrics_delta(metrics_before, metrics_after, route, "db_time")
+        routes[route] = {
+            "requests": len(latencies),
+            "errors": recorder.errors[route],
+            "throughput": len(latencies) / elapsed,
+            "latency_ms": get_percentiles(latencies),
+            "queries_per_request": statements / count if count else None,
+            "db_time_ms_per_request": db_time / count * 1000 if count else None,
+        }
+
+    total = sum(route["requests"] for route in routes.values())
+    return {
+        "elapsed": elapsed,
+        "requests": total,
+        "errors": sum(route["errors"] for route in routes.values()),
+        "throughput": total / elapsed,
+        "latency_ms": get_percentiles([latency for latencies in recorder.latencies.values() for latency in latencies]),
+        "routes": routes,
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"{'route':<52}{'reqs':>7}{'err':>5}{'rps':>8}{'p50':>8}{'p95':>8}{'p99':>8}{'queries':>9}")
+    for route, stats in report["routes"].items():
+        latency, queries = stats["latency_ms"], stats["queries_per_request"]
+        print(
+            f"{route:<52}{stats['requests']:>7}{stats['errors']:>5}{stats['throughput']:>8.1f}"
+            f"{latency['p50']:>8.2f}{latency['p95']:>8.2f}{latency['p99']:>8.2f}"
+            f"{queries if queries is None else round(queries, 2):>9}"
+        )
+    latency = report["latency_ms"]
+    print(
+        f"{'total':<52}{report['requests']:>7}{report['errors']:>5}{report['throughput']:>8.1f}"
+        f"{latency['p50']:>8.2f}{latency['p95']:>8.2f}{latency['p99']:>8.2f}"
+    )
+
+
+def compare(report: dict, baseline: dict, max_regression: float) -> list:
+    """Returns routes whose p95 grew by more than `max_regression` or which run more statements than in baseline."""
+    regressions = []
+    for route, stats in report["routes"].items():
+        previous = baseline["report"]["routes"].get(route)
+        if not previous:
+            continue
+        p95, previous_p95 = stats["latency_ms"]["p95"], previous["latency_ms"]["p95"]
+        if p95 > previous_p95 * (1 + max_regression):
+            regressions.append(f"{route}: p95 {previous_p95:.2f}ms -> {p95:.2f}ms")
+        queries, previous_queries = stats["queries_per_request"], previous["queries_per_request"]
+        if queries is not None and previous_queries is not None and queries > previous_queries + QUERY_TOLERANCE:
+            regressions.append(f"{route}: queries per request {previous_queries:.2f} -> {queries:.2f}")
+    return regressions
+
+
+def reset_database() -> None:
+    alembic_config = Config("alembic.ini")
+    command.downgrade(alembic_config, "base")
+    command.upgrade(alembic_config, "head")
+
+
+async def main(args) -> dict:
+    size = SeedSize(users=args.users, workflows=args.workflows, nodes=args.nodes, shared=args.shared)
+    async with async_session() as db:
+        tenants = await seed(db, size, seed=args.seed)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        await login(client, tenants)
+        if args.warmup:
+            await run_load(client, tenants, args.warmup, args.concurrency, args.seed + 1)
+
+        metrics_before = await get_route_metrics(client, tenants[0].token)
+        started_at = time.perf_counter()
+        recorder = await run_load(client, tenants, args.requests, args.concurrency, args.seed)
+        elapsed = time.perf_counter() - started_at
+        metrics_after = await get_route_metrics(client, tenants[0].token)
+
+    return get_report(recorder, elapsed, metrics_before, metrics_after)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10, help="tenants, each a user with own workflows")
+    parser.add_argument("--workflows", type=int, default=20, help="workflows per user")
+    parser.add_argument("--nodes", type=int, default=10, help="nodes per workflow, chained by nodes - 1 edges")
+    parser.add_argument("--shared", type=int, default=2, help="users every workflow is shared with for viewing")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=5000, help="scenarios to run, some send several requests")
+    parser.add_argument("--warmup", type=int, default=200, help="scenarios to run before measuring")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--reset", action="store_true", help="drop and migrate the database before seeding")
+    parser.add_argument("--output", help="path of JSON result, by default a timestamped file in benchmarks/results")
+    parser.add_argument("--baseline", help="JSON result of an earlier run to compare with")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="allowed relative p95 growth")
+    args = parser.parse_args()
+
+    if args.reset:
+        reset_database()
+    report = asyncio.run(main(args))
+    print_report(report)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"endpoints-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as file:
+        result = {
+            "created_at": datetime.now().isoformat(),
+            "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+            "python": platform.python_version(),
+            "report": report,
+        }
+        json.dump(result, file, indent=2)
+    print(f"Saved to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(report, json.load(file), args.max_regression)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        sys.exit(1 if regressions else 0)
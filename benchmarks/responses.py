@@ -0,0 +1,99 @@
+"""
+Measures CPU time FastAPI spends turning service results into response bytes, for the response path
+routes used before (`__dict__` copies validated into serializers, stdlib json) and the current one
+(ORM objects and rows validated once against `response_model`, orjson).
+
+    python -m benchmarks.responses [--items 100] [--repeat 2000]
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from collections import namedtuple
+from datetime import datetime
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.models.workflows import Node, NodeType, Workflow
+from app.serializers.workflows import (
+    NodeBaseSerializer,
+    NodeListSerializer,
+    WorkflowListSerializer,
+    WorkflowSerializer,
+)
+
+NodeRow = namedtuple("NodeRow", "id node_type workflow_id text status condition")
+
+
+def get_workflows(count):
+    now, user_id = datetime.now(), uuid.uuid4()
+    return [
+        Workflow(
+            id=uuid.uuid4(),
+            name=f"Workflow {i}",
+            description="Benchmark workflow",
+            created_at=now,
+            updated_at=now,
+            created_by=user_id,
+        )
+        for i in range(count)
+    ]
+
+
+def get_nodes(count):
+    workflow_id = uuid.uuid4()
+    return [Node(id=uuid.uuid4(), node_type=NodeType.message, workflow_id=workflow_id) for _ in range(count)]
+
+
+def get_cases(items):
+    workflows, nodes = get_workflows(items), get_nodes(items)
+    node_rows = [NodeRow(node.id, node.node_type, node.workflow_id, "Hello", None, None) for node in nodes]
+    return {
+        "retrieve workflow": (
+            WorkflowSerializer,
+            lambda: WorkflowSerializer(**workflows[0].__dict__),
+            lambda: workflows[0],
+        ),
+        f"list {items} workflows": (
+            WorkflowListSerializer,
+            lambda: WorkflowListSerializer(workflows=[WorkflowSerializer.model_validate(item) for item in workflows]),
+            lambda: {"workflows": workflows, "next_cursor": None},
+        ),
+        f"list {items} nodes": (
+            NodeListSerializer,
+            lambda: {"nodes": [NodeBaseSerializer(**node.__dict__) for node in nodes]},
+            lambda: {"nodes": node_rows},
+        ),
+    }
+
+
+async def render(field, get_content, response_class):
+    content = await serialize_response(field=field, response_content=get_content(), exclude_none=True)
+    return response_class(content).body
+
+
+async def measure(field, get_content, response_class, repeat):
+    started_at = time.process_time()
+    for _ in range(repeat):
+        await render(field, get_content, response_class)
+    return (time.process_time() - started_at) / repeat * 1_000_000
+
+
+async def main(items, repeat):
+    print(f"{'case':<24}{'before, us':>14}{'after, us':>14}{'speedup':>10}")
+    for name, (serializer, get_old_content, get_new_content) in get_cases(items).items():
+        field = create_response_field(name="Response", type_=serializer, mode="serialization")
+        before = await measure(field, get_old_content, JSONResponse, repeat)
+        after = await measure(field, get_new_content, ORJSONResponse, repeat)
+        print(f"{name:<24}{before:>14.1f}{after:>14.1f}{before / after:>9.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.items, args.repeat))
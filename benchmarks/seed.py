@@ -0,0 +1,144 @@
+"""
+Seeds synthetic tenants for benchmarks. Every tenant is a user owning `workflows` workflows, each a chain
+of `start -> message * (nodes - 2) -> end` nodes, shared with view permission to `shared` other tenants.
+"""
+
+import random
+from dataclasses import dataclass, field
+from typing import List
+from uuid import UUID, uuid4
+
+from sqlalchemy.orm import Session
+
+from app.dals.workflows import insert_many
+from app.models.users import Permission, PermissionType, User
+from app.models.workflows import (
+    BaseNodeConfiguration,
+    Edge,
+    EdgeWeight,
+    EndNodeConfiguration,
+    MessageNodeConfiguration,
+    Node,
+    NodeType,
+    StartNodeConfiguration,
+    Workflow,
+)
+from app.services.users import UserService
+
+BATCH_SIZE = 5000
+PASSWORD = "benchmark"
+
+
+@dataclass
+class SeededWorkflow:
+    id: UUID
+    node_ids: List[UUID]
+
+
+@dataclass
+class Tenant:
+    user_id: UUID
+    email: str
+    workflows: List[SeededWorkflow] = field(default_factory=list)
+    shared_workflow_ids: List[UUID] = field(default_factory=list)
+    token: str = None
+
+
+@dataclass
+class SeedSize:
+    users: int = 10
+    workflows: int = 20
+    nodes: int = 10
+    shared: int = 2
+
+
+class Rows:
+    """Collects rows per table and inserts them in batches, parents first."""
+
+    tables = [
+        User.__table__,
+        Workflow.__table__,
+        Permission.__table__,
+        Node.__table__,
+        BaseNodeConfiguration.__table__,
+        StartNodeConfiguration.__table__,
+        MessageNodeConfiguration.__table__,
+        EndNodeConfiguration.__table__,
+        Edge.__table__,
+    ]
+
+    def __init__(self) -> None:
+        self.rows = {table: [] for table in self.tables}
+
+    def add(self, table, **row) -> None:
+        self.rows[table].append(row)
+
+    async def insert(self, db: Session) -> None:
+        for table, rows in self.rows.items():
+            for offset in range(0, len(rows), BATCH_SIZE):
+                await insert_many(db, table, rows[offset : offset + BATCH_SIZE])
+        await db.commit()
+
+
+def add_workflow(rows: Rows, owner_id: UUID, name: str, nodes: int) -> SeededWorkflow:
+    workflow = SeededWorkflow(id=uuid4(), node_ids=[uuid4() for _ in range(max(nodes, 2))])
+    rows.add(Workflow.__table__, id=workflow.id, name=name, description="Benchmark workflow", created_by=owner_id)
+
+    last = len(workflow.node_ids) - 1
+    for position, node_id in enumerate(workflow.node_ids):
+        node_type = NodeType.start if position == 0 else NodeType.end if position == last else NodeType.message
+        configuration_id = uuid4()
+        rows.add(Node.__table__, id=node_id, node_type=node_type, workflow_id=workflow.id, created_by=owner_id)
+        rows.add(
+            BaseNodeConfiguration.__table__,
+            id=configuration_id,
+            node_id=node_id,
+            node_type=node_type,
+            created_by=owner_id,
+        )
+        if node_type == NodeType.message:
+            rows.add(MessageNodeConfiguration.__table__, id=configuration_id, text=f"Message {position}", status=None)
+        else:
+            table = StartNodeConfiguration if node_type == NodeType.start else EndNodeConfiguration
+            rows.add(table.__table__, id=configuration_id)
+
+    for source_id, target_id in zip(workflow.node_ids, workflow.node_ids[1:]):
+        rows.add(
+            Edge.__table__,
+            source_node_id=source_id,
+            target_node_id=target_id,
+            status=EdgeWeight.zero,
+            created_by=owner_id,
+        )
+    return workflow
+
+
+async def seed(db: Session, size: SeedSize, seed: int = 0) -> List[Tenant]:
+    """Inserts tenants with one batched INSERT per table and returns what was created."""
+    rng, rows = random.Random(seed), Rows()
+    run_id = uuid4().hex[:8]
+    password = UserService.pwd_context.hash(PASSWORD)
+
+    tenants = [Tenant(user_id=uuid4(), email=f"tenant-{run_id}-{i}@example.com") for i in range(size.users)]
+    for tenant in tenants:
+        rows.add(User.__table__, id=tenant.user_id, email=tenant.email, password=password)
+        for i in range(size.workflows):
+            tenant.workflows.append(
+                add_workflow(rows, tenant.user_id, f"Tenant {tenant.email} workflow {i}", size.nodes)
+            )
+
+    for tenant in tenants:
+        others = [other for other in tenants if other is not tenant]
+        for other in rng.sample(others, min(size.shared, len(others))):
+            for workflow in tenant.workflows:
+                rows.add(
+                    Permission.__table__,
+                    user_id=other.user_id,
+                    workflow_id=workflow.id,
+                    permission=PermissionType.view,
+                    created_by=tenant.user_id,
+                )
+                other.shared_workflow_ids.append(workflow.id)
+
+    await rows.insert(db)
+    return tenants
@@ -1,16 +1,207 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+import logging
+import time
+from contextvars import ContextVar
+from itertools import cycle
+from typing import Optional, Union
+from uuid import UUID, uuid4
 
-from settings import DB_URL
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+
+from app.utils.cache import TTLCache
+from settings import (
+    DB_PGBOUNCER,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_PREPARED_STATEMENT_CACHE_SIZE,
+    DB_PRIMARY_PINS_MAX_SIZE,
+    DB_READ_YOUR_WRITES_WINDOW,
+    DB_REPLICA_URLS,
+    DB_SLOW_QUERY_THRESHOLD,
+    DB_URL,
+    MAX_CONNECTIONS_OVERFLOW,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """Database work done on behalf of a single request."""
+
+    def __init__(self) -> None:
+        self.statements = 0
+        self.db_time = 0.0
+        self.pool_wait_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement: Optional[str] = None
+
+    def record_statement(self, statement: str, duration: float) -> None:
+        self.statements += 1
+        self.db_time += duration
+        if duration > self.slowest_time:
+            self.slowest_time = duration
+            self.slowest_statement = statement
+
+
+# set per request by the metrics middleware, engine and pool hooks add to it while it's set
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+class PoolStats:
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def record(self, wait_time: float, timed_out: bool = False) -> None:
+        self.checkouts += not timed_out
+        self.timeouts += timed_out
+        self.wait_time += wait_time
+        self.max_wait_time = max(self.max_wait_time, wait_time)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that measures how long checkouts wait for a connection, including opening new ones."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except TimeoutError:
+            self.stats.record(time.perf_counter() - started_at, timed_out=True)
+            raise
+        wait_time = time.perf_counter() - started_at
+        self.stats.record(wait_time)
+        query_stats = current_query_stats.get()
+        if query_stats is not None:
+            query_stats.pool_wait_time += wait_time
+        return connection
+
+    def get_stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "overflow": max(self.overflow(), 0),
+            "checkouts": self.stats.checkouts,
+            "timeouts": self.stats.timeouts,
+            "avg_wait_time": self.stats.wait_time / self.stats.checkouts if self.stats.checkouts else 0.0,
+            "max_wait_time": self.stats.max_wait_time,
+        }
+
+
+def create_engine(url: str) -> AsyncEngine:
+    """
+    Creates engine configured from settings. In PgBouncer (transaction pooling) mode server-side
+    prepared statements can't be reused between transactions, so statement caches are disabled,
+    statement names are made unique and pooling is left to PgBouncer.
+    """
+    if DB_PGBOUNCER:
+        return create_async_engine(
+            url,
+            poolclass=NullPool,
+            connect_args={
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            },
+        )
+
+    return create_async_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=MAX_CONNECTIONS_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args={"prepared_statement_cache_size": DB_PREPARED_STATEMENT_CACHE_SIZE},
+    )
 
-async_engine = create_async_engine(DB_URL, echo=False, future=True)
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Times every statement, adds it to the current request stats and logs statements slower than the threshold."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info["query_started_at"].pop()
+        query_stats = current_query_stats.get()
+        if query_stats is not None:
+            query_stats.record_statement(statement, duration)
+        if duration >= DB_SLOW_QUERY_THRESHOLD:
+            logger.warning("Slow query took %.3fs: %s", duration, statement)
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def handle_error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_started_at"):
+            connection.info["query_started_at"].pop()
+
+
+def get_pool_stats(engine: AsyncEngine) -> dict:
+    pool = engine.pool
+    return pool.get_stats() if isinstance(pool, InstrumentedQueuePool) else {}
+
+
+class PrimarySession(Session):
+    """Session of primary, a commit made for `info["user_id"]` pins that user to primary."""
+
+
+async_engine = create_engine(DB_URL)
+instrument_engine(async_engine)
 
 async_session = sessionmaker(
     bind=async_engine,
     class_=AsyncSession,
+    sync_session_class=PrimarySession,
     expire_on_commit=False,
 )
 
+replica_engines = [create_engine(url) for url in DB_REPLICA_URLS]
+for replica_engine in replica_engines:
+    instrument_engine(replica_engine)
+
+replica_sessions = (
+    cycle([sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False) for engine in replica_engines])
+    if replica_engines
+    else None
+)
+
+# users who committed recently, their reads stay on primary until replicas have caught up
+primary_pins = TTLCache(max_size=DB_PRIMARY_PINS_MAX_SIZE, ttl=DB_READ_YOUR_WRITES_WINDOW)
+
+
+def pin_to_primary(user_id: Union[UUID, str]) -> None:
+    if replica_sessions is not None:
+        primary_pins.set(UUID(str(user_id)), True)
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def pin_committing_user(session: Session) -> None:
+    user_id = session.info.get("user_id")
+    if user_id is not None:
+        pin_to_primary(user_id)
+
+
+def get_read_sessionmaker(user_id: Optional[Union[UUID, str]] = None) -> sessionmaker:
+    """Returns next replica, or primary when there are none or the user wrote within the read-your-writes window."""
+    if replica_sessions is None or (user_id is not None and primary_pins.get(UUID(str(user_id)))):
+        return async_session
+    return next(replica_sessions)
+
 
 async def get_session() -> AsyncSession:
     async with async_session() as session:
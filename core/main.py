@@ -1,15 +1,24 @@
 from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.routers.auth import auth_router
-from app.routers.workflows import nodes_router, workflows_router
+from app.routers.metrics import metrics_router
+from app.routers.permissions import permissions_router
+from app.routers.workflows import edges_router, nodes_router, runs_router, workflows_router
 from app.utils.auth import get_auth_header
+from core.metrics import QueryMetricsMiddleware
 
-app = FastAPI(title="Workflows API", openapi_url="/openapi/", docs_url="/docs/")
+# responses are validated once against `response_model` and rendered with orjson
+app = FastAPI(title="Workflows API", openapi_url="/openapi/", docs_url="/docs/", default_response_class=ORJSONResponse)
 
 app.include_router(auth_router)
 app.include_router(workflows_router, dependencies=[Depends(get_auth_header)])
 app.include_router(nodes_router, dependencies=[Depends(get_auth_header)])
+app.include_router(edges_router, dependencies=[Depends(get_auth_header)])
+app.include_router(runs_router, dependencies=[Depends(get_auth_header)])
+app.include_router(permissions_router, dependencies=[Depends(get_auth_header)])
+app.include_router(metrics_router, dependencies=[Depends(get_auth_header)])
 
 app.add_middleware(
     CORSMiddleware,
@@ -17,4 +26,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # browser clients read ETag to send it back in `If-Match`
+    expose_headers=["ETag"],
 )
+app.add_middleware(QueryMetricsMiddleware)
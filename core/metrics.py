@@ -0,0 +1,120 @@
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Sequence
+
+from core.db import QueryStats, current_query_stats
+from settings import DEBUG
+
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+
+class Histogram:
+    """Counts observations per upper bucket bound, the last bucket catches everything above."""
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def get_stats(self) -> dict:
+        bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+        return {"count": self.count, "sum": self.sum, "buckets": dict(zip(bounds, self.counts))}
+
+
+class RouteMetrics:
+    def __init__(self) -> None:
+        self.duration = Histogram(TIME_BUCKETS)
+        self.statements = Histogram(COUNT_BUCKETS)
+        self.db_time = Histogram(TIME_BUCKETS)
+        self.pool_wait_time = Histogram(TIME_BUCKETS)
+        self.slowest_time = 0.0
+        self.slowest_statement = None
+
+    def record(self, duration: float, query_stats: QueryStats) -> None:
+        self.duration.observe(duration)
+        self.statements.observe(query_stats.statements)
+        self.db_time.observe(query_stats.db_time)
+        self.pool_wait_time.observe(query_stats.pool_wait_time)
+        if query_stats.slowest_time > self.slowest_time:
+            self.slowest_time = query_stats.slowest_time
+            self.slowest_statement = query_stats.slowest_statement
+
+    def get_stats(self) -> dict:
+        return {
+            "duration": self.duration.get_stats(),
+            "statements": self.statements.get_stats(),
+            "db_time": self.db_time.get_stats(),
+            "pool_wait_time": self.pool_wait_time.get_stats(),
+            "slowest_time": self.slowest_time,
+            "slowest_statement": self.slowest_statement,
+        }
+
+
+class RequestMetrics:
+    """In-process aggregates per `METHOD /route/path/`, each worker keeps its own."""
+
+    def __init__(self) -> None:
+        self.routes: Dict[str, RouteMetrics] = defaultdict(RouteMetrics)
+
+    def record(self, route: str, duration: float, query_stats: QueryStats) -> None:
+        self.routes[route].record(duration, query_stats)
+
+    def get_stats(self) -> dict:
+        return {route: metrics.get_stats() for route, metrics in sorted(self.routes.items())}
+
+
+request_metrics = RequestMetrics()
+
+
+def get_route_name(scope) -> str:
+    """Uses the path template of the route the router matched, so metrics don't grow per id."""
+    route = scope.get("route")
+    return f"{scope['method']} {route.path if route else '<unmatched>'}"
+
+
+class QueryMetricsMiddleware:
+    """
+    Collects statements, database time and pool wait of every HTTP request into `request_metrics`.
+    In debug mode they are also returned as `X-DB-*` response headers. Streaming bodies are sent after
+    the headers, so their statements only reach the aggregates.
+    """
+
+    def __init__(self, app, debug: bool = DEBUG) -> None:
+        self.app = app
+        self.debug = debug
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        query_stats = QueryStats()
+        token = current_query_stats.set(query_stats)
+        started_at = time.perf_counter()
+
+        async def send_with_headers(message):
+            if self.debug and message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), *self.get_headers(query_stats)]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            current_query_stats.reset(token)
+            request_metrics.record(get_route_name(scope), time.perf_counter() - started_at, query_stats)
+
+    @staticmethod
+    def get_headers(query_stats: QueryStats):
+        return [
+            (b"x-db-statements", str(query_stats.statements).encode()),
+            (b"x-db-time-ms", f"{query_stats.db_time * 1000:.2f}".encode()),
+            (b"x-db-pool-wait-ms", f"{query_stats.pool_wait_time * 1000:.2f}".encode()),
+            (b"x-db-slowest-ms", f"{query_stats.slowest_time * 1000:.2f}".encode()),
+        ]
@@ -15,7 +15,45 @@ DB_DB = os.getenv("DB_DB")
 
 DB_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_DB}"
 
+# connection pool is per worker process, total connections are up to workers * (pool size + overflow)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
 MAX_CONNECTIONS_OVERFLOW = int(os.getenv("MAX_CONNECTIONS_OVERFLOW", 30))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "False") == "True"
+DB_PREPARED_STATEMENT_CACHE_SIZE = int(os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", 100))
+# disables client-side pooling and prepared statement caches for PgBouncer in transaction mode
+DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "False") == "True"
+# statements running at least this many seconds are logged as warnings
+DB_SLOW_QUERY_THRESHOLD = float(os.getenv("DB_SLOW_QUERY_THRESHOLD", 0.5))
+
+# read replicas as comma separated `host` or `host:port`, GET routes read from them in turn
+DB_REPLICA_HOSTS = [host.strip() for host in os.getenv("DB_REPLICA_HOSTS", "").split(",") if host.strip()]
+DB_REPLICA_URLS = [
+    f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{host if ':' in host else f'{host}:{DB_PORT}'}/{DB_DB}"
+    for host in DB_REPLICA_HOSTS
+]
+# seconds a user who committed a write keeps reading from primary, should cover replication lag
+DB_READ_YOUR_WRITES_WINDOW = float(os.getenv("DB_READ_YOUR_WRITES_WINDOW", 5))
+DB_PRIMARY_PINS_MAX_SIZE = int(os.getenv("DB_PRIMARY_PINS_MAX_SIZE", 10_000))
+
+# permission cache configuration, redis url makes cache shared between workers
+PERMISSION_CACHE_URL = os.getenv("PERMISSION_CACHE_URL")
+PERMISSION_CACHE_MAX_USERS = int(os.getenv("PERMISSION_CACHE_MAX_USERS", 10_000))
+PERMISSION_CACHE_MAX_WORKFLOWS = int(os.getenv("PERMISSION_CACHE_MAX_WORKFLOWS", 1_000))
+PERMISSION_CACHE_TTL = int(os.getenv("PERMISSION_CACHE_TTL", 60))
+
+# compiled workflow graphs kept in process, keyed by workflow version
+GRAPH_CACHE_MAX_SIZE = int(os.getenv("GRAPH_CACHE_MAX_SIZE", 1000))
+
+# compiled condition expressions are memoized by text
+CONDITION_CACHE_SIZE = int(os.getenv("CONDITION_CACHE_SIZE", 1024))
+# run context variables conditions may refer to, comma separated
+CONDITION_VARIABLES = os.getenv("CONDITION_VARIABLES", "opened,clicked,clicks,country,status,retries,score,total")
+CONDITION_VARIABLES = frozenset(name.strip() for name in CONDITION_VARIABLES.split(",") if name.strip())
+
+# runs started without a step limit fail after this many steps
+WORKFLOW_RUN_MAX_STEPS = int(os.getenv("WORKFLOW_RUN_MAX_STEPS", 1000))
 
 # authorization configuration
 SECRET_KEY = os.getenv("SECRET_KEY")
@@ -24,3 +62,10 @@ REFRESH_TOKEN_EXPIRE_MINUTES = os.getenv("REFRESH_TOKEN_EXPIRE_MINUTES", 60 * 5)
 HASH_NAME_ALGORITHM = os.getenv("HASH_NAME_ALGORITHM", "HS256")
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "Cha2nGeMe-j23455&&")
 JWT_REFRESH_SECRET_KEY = os.getenv("JWT_REFRESH_SECRET_KEY", "changEMe23Too#")
+AUTH_CACHE_MAX_SIZE = int(os.getenv("AUTH_CACHE_MAX_SIZE", 10_000))
+# cached users are evicted in the worker that deleted them, others drop them after this many seconds
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", 30))
+
+# bcrypt runs in a bounded thread pool, requests over workers + queue size get 503
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", 32))
@@ -0,0 +1,8 @@
+import os
+
+from dotenv import load_dotenv
+
+# runs before conftest imports settings: every xdist worker gets its own database, created on first use
+load_dotenv()
+if os.getenv("PYTEST_XDIST_WORKER"):
+    os.environ["DB_DB"] = f"{os.environ['DB_DB']}_{os.environ['PYTEST_XDIST_WORKER']}"
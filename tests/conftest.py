@@ -1,28 +1,59 @@
+import os
 from typing import Generator
 
+import psycopg2
 import pytest
 from fastapi.testclient import TestClient
+from psycopg2 import sql
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
 
 from alembic import command
 from alembic.config import Config
+from app.services.users import UserService
+from app.utils.auth import get_read_session
+from core import db as core_db
+from core.db import async_engine, get_session
 from core.main import app
+from settings import DB_DB, DB_HOST, DB_PASSWORD, DB_PORT, DB_USER
+from tests import utils as test_utils
 
 test_user_data = {"email": "test@test.com", "password": "test"}
 
+# users are registered per test now, minimal bcrypt cost keeps that cheap, hashes still verify the same way
+UserService.pwd_context.update(bcrypt__rounds=4)
+
+
+def pytest_addoption(parser):
+    parser.addoption("--reset-db", action="store_true", help="Migrate test database from scratch.")
+
+
+def create_database():
+    """Creates test database unless it exists, connecting to the `postgres` maintenance database."""
+    connection = psycopg2.connect(dbname="postgres", user=DB_USER, password=DB_PASSWORD, host=DB_HOST, port=DB_PORT)
+    connection.autocommit = True
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_database WHERE datname = %s", (DB_DB,))
+        if not cursor.fetchone():
+            cursor.execute(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(DB_DB)))
+    connection.close()
+
 
 @pytest.fixture(scope="session", autouse=True)
-def setup_db():
+def setup_db(request):
     """
-    Run Alembic migrations before tests start.
+    Migrates test database once. Tests don't leave data behind, so the schema is kept between runs
+    and `upgrade head` is a no-op unless there are new migrations. `--reset-db` migrates it from scratch.
     """
+    if os.getenv("PYTEST_XDIST_WORKER"):
+        create_database()
+
     alembic_config = Config("alembic.ini")
+    if request.config.getoption("--reset-db"):
+        command.downgrade(alembic_config, "base")
     command.upgrade(alembic_config, "head")
     print("DB migrations completed.")
 
-    yield
-    command.downgrade(alembic_config, "base")
-    print("Rollback DB migrations completed.")
-
 
 @pytest.fixture(scope="session")
 def client() -> Generator[TestClient, None, None]:
@@ -53,3 +84,31 @@ async def token(client, create_user):
         return response.json()["access"]
     else:
         print(f"Failed to get token. Error: {response.json()}")
+
+
+@pytest.fixture(scope="function", autouse=True)
+def db_connection(client, monkeypatch):
+    """
+    Runs test inside a transaction that is rolled back afterwards. Sessions the app opens join it with a
+    SAVEPOINT, so their commits only release it. Session fixtures run before and commit for real.
+    """
+    connection = client.portal.call(async_engine.connect)
+    transaction = client.portal.call(connection.begin)
+    test_session = sessionmaker(
+        bind=connection, class_=AsyncSession, expire_on_commit=False, join_transaction_mode="create_savepoint"
+    )
+
+    async def get_test_session() -> AsyncSession:
+        async with test_session() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_test_session
+    app.dependency_overrides[get_read_session] = get_test_session
+    monkeypatch.setattr(core_db, "async_session", test_session)
+    monkeypatch.setattr(test_utils, "async_session", test_session)
+    yield connection
+
+    app.dependency_overrides.pop(get_session)
+    app.dependency_overrides.pop(get_read_session)
+    client.portal.call(transaction.rollback)
+    client.portal.call(connection.close)
@@ -0,0 +1,126 @@
+import uuid
+
+import pytest
+
+from tests.utils import get_auth_headers, register_and_login
+from tests.workflows.utils import create_base_workflow, faker
+
+
+def import_nodes(client, token, workflow_id, refs):
+    graph_data = {"nodes": [{"ref": ref, "node_type": "end"} for ref in refs]}
+    response = client.post(f"/workflows/{workflow_id}/graph/", json=graph_data, headers=get_auth_headers(token))
+    return response.json()["nodes"]
+
+
+@pytest.fixture(scope="function")
+def base_workflow(client, token):
+    return create_base_workflow(client, token)
+
+
+@pytest.fixture(scope="function")
+def base_nodes(client, token, base_workflow):
+    return import_nodes(client, token, base_workflow["id"], ["a", "b", "c"])
+
+
+def test_create_edge(client, token, base_workflow, base_nodes):
+    edge_data = {"source_node_id": base_nodes["a"], "target_node_id": base_nodes["b"], "status": "yes"}
+    response = client.post(f"/workflows/{base_workflow['id']}/edges/", json=edge_data, headers=get_auth_headers(token))
+    assert response.status_code == 201
+
+    data = response.json()
+    assert {key: data[key] for key in edge_data} == edge_data
+
+    response = client.get(f"/workflows/{base_workflow['id']}/edges/", headers=get_auth_headers(token))
+    assert response.status_code == 200
+    assert response.json()["edges"] == [data]
+
+
+def test_create_edge_twice(client, token, base_workflow, base_nodes):
+    edge_data = {"source_node_id": base_nodes["a"], "target_node_id": base_nodes["b"]}
+    client.post(f"/workflows/{base_workflow['id']}/edges/", json=edge_data, headers=get_auth_headers(token))
+
+    response = client.post(f"/workflows/{base_workflow['id']}/edges/", json=edge_data, headers=get_auth_headers(token))
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Edge already exists"}
+
+
+def test_create_edge_to_itself(client, token, base_workflow, base_nodes):
+    edge_data = {"source_node_id": base_nodes["a"], "target_node_id": base_nodes["a"]}
+    response = client.post(f"/workflows/{base_workflow['id']}/edges/", json=edge_data, headers=get_auth_headers(token))
+    assert response.status_code == 400
+
+
+def test_create_edge_to_node_of_other_workflow(client, token, base_workflow, base_nodes):
+    other_workflow = create_base_workflow(client, token)
+    other_nodes = import_nodes(client, token, other_workflow["id"], ["x"])
+
+    edge_data = {"source_node_id": base_nodes["a"], "target_node_id": other_nodes["x"]}
+    response = client.post(f"/workflows/{base_workflow['id']}/edges/", json=edge_data, headers=get_auth_headers(token))
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Node not found"}
+
+
+def test_create_edges_batch(client, token, base_workflow, base_nodes):
+    edges_data = {
+        "edges": [
+            {"source_node_id": base_nodes["a"], "target_node_id": base_nodes["b"], "status": "no"},
+            {"source_node_id": base_nodes["b"], "target_node_id": base_nodes["c"]},
+        ]
+    }
+    response = client.post(
+        f"/workflows/{base_workflow['id']}/edges/batch/", json=edges_data, headers=get_auth_headers(token)
+    )
+    assert response.status_code == 201
+    assert [edge["status"] for edge in response.json()["edges"]] == ["no", "zero"]
+
+
+def test_create_edges_batch_is_atomic(client, token, base_workflow, base_nodes):
+    edges_data = {
+        "edges": [
+            {"source_node_id": base_nodes["a"], "target_node_id": base_nodes["b"]},
+            {"source_node_id": base_nodes["b"], "target_node_id": str(uuid.uuid4())},
+        ]
+    }
+    response = client.post(
+        f"/workflows/{base_workflow['id']}/edges/batch/", json=edges_data, headers=get_auth_headers(token)
+    )
+    assert response.status_code == 404
+
+    response = client.get(f"/workflows/{base_workflow['id']}/edges/", headers=get_auth_headers(token))
+    assert response.json()["edges"] == []
+
+
+def test_delete_edges(client, token, base_workflow, base_nodes):
+    edges_data = {
+        "edges": [
+            {"source_node_id": base_nodes["a"], "target_node_id": base_nodes["b"]},
+            {"source_node_id": base_nodes["b"], "target_node_id": base_nodes["c"]},
+            {"source_node_id": base_nodes["a"], "target_node_id": base_nodes["c"]},
+        ]
+    }
+    edges = client.post(
+        f"/workflows/{base_workflow['id']}/edges/batch/", json=edges_data, headers=get_auth_headers(token)
+    ).json()["edges"]
+
+    response = client.delete(
+        f"/workflows/{base_workflow['id']}/edges/{edges[0]['id']}/", headers=get_auth_headers(token)
+    )
+    assert response.status_code == 204
+
+    ids = [edge["id"] for edge in edges[1:]] + [str(uuid.uuid4())]
+    response = client.post(
+        f"/workflows/{base_workflow['id']}/edges/batch/delete/", json={"ids": ids}, headers=get_auth_headers(token)
+    )
+    assert response.status_code == 200
+    assert set(response.json()["deleted"]) == set(ids[:2])
+
+    response = client.delete(
+        f"/workflows/{base_workflow['id']}/edges/{edges[0]['id']}/", headers=get_auth_headers(token)
+    )
+    assert response.status_code == 404
+
+
+def test_edges_without_permission(client, base_workflow, base_nodes):
+    _, other_token = register_and_login(client, {"email": faker.email(), "password": faker.password()})
+    response = client.get(f"/workflows/{base_workflow['id']}/edges/", headers=get_auth_headers(other_token))
+    assert response.status_code == 404
@@ -0,0 +1,59 @@
+import pytest
+
+from core.metrics import Histogram, QueryMetricsMiddleware
+from tests.utils import get_auth_headers
+from tests.workflows.utils import create_base_workflow
+
+
+@pytest.fixture(scope="function")
+def debug_metrics(client, monkeypatch):
+    """Turns on `X-DB-*` headers of the middleware instance the app is already running."""
+    middleware = client.app.middleware_stack
+    while not isinstance(middleware, QueryMetricsMiddleware):
+        middleware = middleware.app
+    monkeypatch.setattr(middleware, "debug", True)
+
+
+def test_histogram_buckets():
+    histogram = Histogram((1, 5))
+    for value in (0, 1, 2, 5, 6):
+        histogram.observe(value)
+
+    assert histogram.get_stats() == {"count": 5, "sum": 14.0, "buckets": {"1": 2, "5": 2, "+Inf": 1}}
+
+
+def test_debug_headers(client, token, debug_metrics):
+    workflow = create_base_workflow(client, token)
+
+    response = client.get(f"/workflows/{workflow['id']}/", headers=get_auth_headers(token))
+    assert response.status_code == 200
+    assert int(response.headers["x-db-statements"]) >= 1
+    assert float(response.headers["x-db-time-ms"]) > 0
+    assert "x-db-pool-wait-ms" in response.headers
+    assert "x-db-slowest-ms" in response.headers
+
+
+def test_no_debug_headers(client, token):
+    response = client.get("/workflows/", headers=get_auth_headers(token))
+    assert response.status_code == 200
+    assert "x-db-statements" not in response.headers
+
+
+def test_metrics(client, token):
+    workflow = create_base_workflow(client, token)
+    client.get(f"/workflows/{workflow['id']}/", headers=get_auth_headers(token))
+
+    response = client.get("/metrics/", headers=get_auth_headers(token))
+    assert response.status_code == 200
+    data = response.json()
+
+    route = data["routes"]["GET /workflows/{workflow_id}/"]
+    assert route["duration"]["count"] >= 1
+    assert route["statements"]["count"] == route["duration"]["count"]
+    assert route["slowest_statement"]
+    assert not any(str(workflow["id"]) in name for name in data["routes"])
+    assert {"permission_cache", "principal_cache", "graph_cache", "password_hash_executor"} <= data.keys()
+
+
+def test_metrics_requires_auth(client):
+    assert client.get("/metrics/").status_code in (401, 403)
@@ -0,0 +1,68 @@
+import pytest
+
+from tests.nodes.utils import create_node, get_message_node_data
+from tests.utils import get_auth_headers
+from tests.workflows.utils import create_base_workflow
+
+
+@pytest.fixture(scope="function")
+def base_workflow(client, token):
+    return create_base_workflow(client, token)
+
+
+@pytest.fixture(scope="function")
+def base_nodes(client, token, base_workflow):
+    return [
+        create_node(client, token, base_workflow["id"], "start"),
+        create_node(client, token, base_workflow["id"], "message", {"text": "Hello 100% user", "status": "sent"}),
+        create_node(client, token, base_workflow["id"], "message", get_message_node_data()),
+        create_node(client, token, base_workflow["id"], "end"),
+    ]
+
+
+def test_list_nodes(client, token, base_workflow, base_nodes):
+    response = client.get(f"/workflows/{base_workflow['id']}/nodes/", headers=get_auth_headers(token))
+    assert response.status_code == 200
+    assert [node["id"] for node in response.json()["nodes"]] == [node["id"] for node in base_nodes]
+
+
+def test_list_nodes_search(client, token, base_workflow, base_nodes):
+    response = client.get(
+        f"/workflows/{base_workflow['id']}/nodes/", params={"search": "100% USER"}, headers=get_auth_headers(token)
+    )
+    assert response.status_code == 200
+    assert [node["id"] for node in response.json()["nodes"]] == [base_nodes[1]["id"]]
+
+
+def test_list_nodes_search_conditions_within_workflow(client, token, base_workflow, base_nodes):
+    condition = create_node(client, token, base_workflow["id"], "condition", {"condition": "opened == 1"})
+    other_workflow = create_base_workflow(client, token)
+    create_node(client, token, other_workflow["id"], "message", {"text": "user opened", "status": "sent"})
+
+    response = client.get(
+        f"/workflows/{base_workflow['id']}/nodes/", params={"search": "opened"}, headers=get_auth_headers(token)
+    )
+    assert [node["id"] for node in response.json()["nodes"]] == [condition["id"]]
+
+
+def test_list_nodes_order_by(client, token, base_workflow, base_nodes):
+    response = client.get(
+        f"/workflows/{base_workflow['id']}/nodes/", params={"order_by": "-created_at"}, headers=get_auth_headers(token)
+    )
+    assert response.status_code == 200
+    assert [node["id"] for node in response.json()["nodes"]] == [node["id"] for node in reversed(base_nodes)]
+
+
+def test_list_nodes_order_by_not_allowed(client, token, base_workflow):
+    response = client.get(
+        f"/workflows/{base_workflow['id']}/nodes/", params={"order_by": "text"}, headers=get_auth_headers(token)
+    )
+    assert response.status_code == 400
+
+
+def test_list_nodes_configuration_fields(client, token, base_workflow, base_nodes):
+    response = client.get(f"/workflows/{base_workflow['id']}/nodes/", headers=get_auth_headers(token))
+    nodes = response.json()["nodes"]
+    assert nodes[0] == {"id": base_nodes[0]["id"], "node_type": "start", "workflow_id": base_workflow["id"]}
+    assert nodes[1]["text"] == "Hello 100% user"
+    assert nodes[1]["status"] == "sent"
@@ -0,0 +1,93 @@
+import uuid
+
+import pytest
+
+from app.models.users import PermissionType
+from tests.nodes.utils import create_node, get_message_node_data
+from tests.utils import count_queries, get_auth_headers, grant_permission, register_and_login
+from tests.workflows.utils import create_base_workflow, faker, get_workflow_data
+
+
+@pytest.fixture(scope="function")
+def base_workflow(client, token):
+    return create_base_workflow(client, token)
+
+
+@pytest.fixture(scope="function")
+def message_node(client, token, base_workflow):
+    return create_node(client, token, base_workflow["id"], "message", get_message_node_data())
+
+
+def update_node(client, token, node, data):
+    return client.patch(
+        f"/workflows/{node['workflow_id']}/nodes/{node['id']}/", json={**node, **data}, headers=get_auth_headers(token)
+    )
+
+
+def test_create_node(client, token, base_workflow, message_node):
+    node_data = get_message_node_data()
+    with count_queries() as statements:
+        node = create_node(client, token, base_workflow["id"], "message", node_data)
+
+    assert node == {"id": node["id"], "node_type": "message", "workflow_id": base_workflow["id"], **node_data}
+    assert [statement.split()[0] for statement in statements] == ["INSERT", "INSERT", "INSERT", "UPDATE"]
+
+    response = client.get(f"/workflows/{base_workflow['id']}/nodes/{node['id']}/", headers=get_auth_headers(token))
+    assert response.json() == node
+
+
+def test_update_node(client, token, message_node):
+    with count_queries() as statements:
+        response = update_node(client, token, message_node, {"text": "Updated", "status": "sent"})
+
+    assert response.status_code == 200
+    assert response.json() == {**message_node, "text": "Updated", "status": "sent"}
+    assert [statement.split()[0] for statement in statements] == ["UPDATE", "UPDATE"]
+
+
+def test_update_node_keeps_unset_fields(client, token, message_node):
+    response = update_node(client, token, message_node, {"status": "opened"})
+    assert response.status_code == 200
+    assert response.json() == {**message_node, "status": "opened"}
+
+
+@pytest.mark.parametrize("node_type", ["start", "end"])
+def test_update_node_without_configuration_fields(client, token, base_workflow, node_type):
+    node = create_node(client, token, base_workflow["id"], node_type)
+
+    response = update_node(client, token, node, {"text": None, "status": None})
+    assert response.status_code == 200
+    assert response.json() == node
+
+
+def test_update_node_requires_edit_permission(client, token, message_node):
+    user, other_token = register_and_login(client, {"email": faker.email(), "password": faker.password()})
+    grant_permission(client, user["id"], message_node["workflow_id"], PermissionType.view)
+    client.get(f"/workflows/{message_node['workflow_id']}/", headers=get_auth_headers(other_token))
+
+    with count_queries() as statements:
+        response = update_node(client, other_token, message_node, {"text": "Updated"})
+    assert response.status_code == 404
+    assert [statement.split()[0] for statement in statements] == ["UPDATE"]
+
+    grant_permission(client, user["id"], message_node["workflow_id"], PermissionType.edit)
+    assert update_node(client, other_token, message_node, {"text": "Updated"}).status_code == 200
+
+
+def test_update_node_of_other_type(client, token, message_node):
+    response = update_node(client, token, message_node, {"node_type": "condition", "condition": "opened"})
+    assert response.status_code == 404
+
+
+def test_update_node_not_found(client, token, message_node):
+    response = update_node(client, token, {**message_node, "id": str(uuid.uuid4())}, {"text": "Updated"})
+    assert response.status_code == 404
+
+
+def test_update_workflow_single_statement(client, token, base_workflow):
+    with count_queries() as statements:
+        response = client.patch(
+            f"/workflows/{base_workflow['id']}/", json=get_workflow_data(), headers=get_auth_headers(token)
+        )
+    assert response.status_code == 200
+    assert [statement.split()[0] for statement in statements] == ["UPDATE"]
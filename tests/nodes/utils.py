@@ -0,0 +1,13 @@
+from tests.utils import get_auth_headers
+from tests.workflows.utils import faker
+
+
+def get_message_node_data():
+    return {"text": faker.sentence(), "status": "pending"}
+
+
+def create_node(client, token, workflow_id, node_type, data=None):
+    response = client.post(
+        f"/workflows/{workflow_id}/nodes/{node_type}/", json=data or {}, headers=get_auth_headers(token)
+    )
+    return response.json()
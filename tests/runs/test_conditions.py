@@ -0,0 +1,75 @@
+import pytest
+
+from app.utils.conditions import ConditionError, compile_condition, evaluate_condition
+from tests.utils import get_auth_headers
+from tests.workflows.utils import create_base_workflow
+
+
+@pytest.mark.parametrize(
+    "condition, context, expected",
+    [
+        ("opened", {"opened": True}, True),
+        ("opened", {}, False),
+        ("not opened", {}, True),
+        ("clicks >= 3 and country in ['UA', 'PL']", {"clicks": 3, "country": "UA"}, True),
+        ("clicks >= 3 and country in ['UA', 'PL']", {"clicks": 3, "country": "US"}, False),
+        ("0 < score * 2 - 1 <= 9", {"score": 5}, True),
+        ("status == 'sent' or retries % 2 == 1", {"status": "opened", "retries": 3}, True),
+        ("(clicks or 5) > 3", {}, True),
+        ("(clicks and 5) > 3", {"clicks": 1}, True),
+        ("(clicks and 5) == 0", {"clicks": 0}, True),
+        ("clicks > 0 and clicks / total > 0.5", {"clicks": 0, "total": 0}, False),
+    ],
+)
+def test_evaluate_condition(condition, context, expected):
+    assert evaluate_condition(condition, context) is expected
+
+
+@pytest.mark.parametrize(
+    "condition",
+    [
+        "__import__('os').system('true')",
+        "opened.__class__",
+        "items[0]",
+        "(lambda: 1)()",
+        "[x for x in items]",
+        "_private",
+        "unknown > 1",
+        "opened and os",
+        "2 ** 10",
+        "opened ==",
+    ],
+)
+def test_unsafe_condition_is_rejected(condition):
+    with pytest.raises(ConditionError):
+        compile_condition(condition)
+
+
+def test_condition_variables_allowlist():
+    variables = frozenset({"step"})
+    assert evaluate_condition("step > 1", {"step": 2}, variables) is True
+    with pytest.raises(ConditionError, match="Unknown variable: opened"):
+        compile_condition("step > 1 or opened", variables)
+    with pytest.raises(ConditionError):
+        compile_condition("step > 1")
+
+
+def test_condition_is_compiled_once():
+    assert compile_condition("clicks > 1") is compile_condition("clicks > 1")
+
+
+def test_condition_runtime_error():
+    with pytest.raises(ConditionError):
+        evaluate_condition("'spam' * count", {"count": 10**9})
+    with pytest.raises(ConditionError):
+        evaluate_condition("clicks > 1", {"clicks": None})
+
+
+def test_create_node_with_invalid_condition(client, token):
+    workflow = create_base_workflow(client, token)
+    response = client.post(
+        f"/workflows/{workflow['id']}/nodes/condition/",
+        json={"condition": "__import__('os')"},
+        headers=get_auth_headers(token),
+    )
+    assert response.status_code == 422
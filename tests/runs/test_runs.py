@@ -0,0 +1,136 @@
+import pytest
+
+from app.models.users import PermissionType
+from tests.utils import count_queries, get_auth_headers, grant_permission, register_and_login
+from tests.workflows.utils import create_base_workflow, faker, get_graph_data, import_graph
+
+
+@pytest.fixture(scope="function")
+def base_workflow(client, token):
+    return create_base_workflow(client, token)
+
+
+@pytest.fixture(scope="function")
+def base_graph(client, token, base_workflow):
+    return import_graph(client, token, base_workflow["id"])
+
+
+def create_run(client, token, workflow_id, run_data=None):
+    return client.post(f"/workflows/{workflow_id}/runs/", json=run_data or {}, headers=get_auth_headers(token))
+
+
+def test_run_to_end(client, token, base_workflow, base_graph):
+    response = create_run(client, token, base_workflow["id"], {"context": {"opened": True}})
+    assert response.status_code == 201
+
+    data = response.json()
+    assert data["status"] == "finished"
+    assert data["current_node_id"] == base_graph["end"]
+    assert data["history"] == [base_graph["start"], base_graph["check"], base_graph["end"]]
+
+    response = client.get(f"/workflows/{base_workflow['id']}/runs/{data['id']}/", headers=get_auth_headers(token))
+    assert response.status_code == 200
+    assert response.json() == data
+
+
+def test_run_follows_no_edge(client, token, base_workflow, base_graph):
+    data = create_run(client, token, base_workflow["id"]).json()
+    assert data["status"] == "finished"
+    assert data["history"] == [base_graph[ref] for ref in ("start", "check", "remind", "end")]
+
+
+def test_step_run(client, token, base_workflow, base_graph):
+    run = create_run(client, token, base_workflow["id"], {"steps": 1}).json()
+    assert run["status"] == "running"
+    assert run["current_node_id"] == base_graph["check"]
+
+    url = f"/workflows/{base_workflow['id']}/runs/{run['id']}/step/"
+    response = client.post(url, json={"context": {"opened": True}}, headers=get_auth_headers(token))
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "finished"
+    assert data["context"] == {"opened": True}
+    assert data["history"] == [base_graph["start"], base_graph["check"], base_graph["end"]]
+
+    response = client.post(url, json={}, headers=get_auth_headers(token))
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Run is finished"}
+
+
+def test_run_fails_on_missing_edge(client, token, base_workflow):
+    graph_data = get_graph_data()
+    graph_data["edges"] = [edge for edge in graph_data["edges"] if edge.get("status") != "no"]
+    graph = import_graph(client, token, base_workflow["id"], graph_data)
+
+    data = create_run(client, token, base_workflow["id"]).json()
+    assert data["status"] == "failed"
+    assert data["current_node_id"] == graph["check"]
+    assert data["error"] == f"Node {graph['check']} has no no edge"
+
+
+def test_run_cycle_hits_step_limit(client, token, base_workflow):
+    graph_data = {
+        "nodes": [
+            {"ref": "start", "node_type": "start"},
+            {"ref": "check", "node_type": "condition", "condition": "opened"},
+            {"ref": "remind", "node_type": "message", "text": "Reminder", "status": "pending"},
+            {"ref": "end", "node_type": "end"},
+        ],
+        "edges": [
+            {"source": "start", "target": "check"},
+            {"source": "check", "target": "remind", "status": "no"},
+            {"source": "check", "target": "end", "status": "yes"},
+            {"source": "remind", "target": "check"},
+        ],
+    }
+    import_graph(client, token, base_workflow["id"], graph_data)
+
+    data = create_run(client, token, base_workflow["id"]).json()
+    assert data["status"] == "failed"
+    assert data["error"] == "Step limit exceeded"
+
+
+def test_run_without_start_node(client, token, base_workflow):
+    response = create_run(client, token, base_workflow["id"])
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Workflow must have exactly one start node"}
+
+
+def test_run_is_written_without_reloading(client, token, base_workflow, base_graph):
+    with count_queries() as statements:
+        run = create_run(client, token, base_workflow["id"], {"steps": 1}).json()
+    with count_queries() as step_statements:
+        response = client.post(
+            f"/workflows/{base_workflow['id']}/runs/{run['id']}/step/", json={}, headers=get_auth_headers(token)
+        )
+    assert response.status_code == 200
+    assert response.json()["updated_at"] != run["updated_at"]
+
+    for queries, write in ((statements, "INSERT INTO workflow_runs"), (step_statements, "UPDATE workflow_runs")):
+        (written,) = [statement for statement in queries if statement.startswith(write)]
+        assert "RETURNING" in written
+        # the written row comes back with the statement, it isn't selected again
+        assert not [statement for statement in queries[queries.index(written) + 1 :] if "workflow_runs" in statement]
+
+
+def test_run_requires_edit_permission(client, token, base_workflow, base_graph):
+    user, other_token = register_and_login(client, {"email": faker.email(), "password": faker.password()})
+    grant_permission(client, user["id"], base_workflow["id"], PermissionType.view)
+
+    response = create_run(client, other_token, base_workflow["id"])
+    assert response.status_code == 404
+
+    run = create_run(client, token, base_workflow["id"]).json()
+    response = client.get(f"/workflows/{base_workflow['id']}/runs/{run['id']}/", headers=get_auth_headers(other_token))
+    assert response.status_code == 200
+
+
+def test_run_fails_on_condition_error(client, token, base_workflow):
+    graph_data = get_graph_data()
+    graph_data["nodes"][1]["condition"] = "clicks > 1"
+    graph = import_graph(client, token, base_workflow["id"], graph_data)
+
+    data = create_run(client, token, base_workflow["id"], {"context": {"clicks": "many"}}).json()
+    assert data["status"] == "failed"
+    assert data["current_node_id"] == graph["check"]
+    assert data["error"].startswith(f"Node {graph['check']}: Condition `clicks > 1` failed")
@@ -0,0 +1,59 @@
+import pytest
+
+from app.services.users import UserService
+from tests.utils import get_auth_headers, register_and_login, run_with_session
+from tests.workflows.utils import faker
+
+
+@pytest.fixture(scope="function")
+def other_user(client):
+    return register_and_login(client, {"email": faker.email(), "password": faker.password()})
+
+
+def call_user_service(client, method, **kwargs):
+    return run_with_session(client, lambda db: getattr(UserService, method)(db=db, **kwargs))
+
+
+def test_authenticated_user_is_cached(client, other_user):
+    _, token = other_user
+    cache = UserService.principal_cache
+
+    response = client.get("/workflows/", headers=get_auth_headers(token))
+    assert response.status_code == 200
+
+    hits = cache.hits
+    response = client.get("/workflows/", headers=get_auth_headers(token))
+    assert response.status_code == 200
+    assert cache.hits == hits + 1
+
+
+def test_deleted_user_is_evicted(client, other_user):
+    user, token = other_user
+    assert client.get("/workflows/", headers=get_auth_headers(token)).status_code == 200
+
+    call_user_service(client, "delete_user", user_id=user["id"])
+
+    response = client.get("/workflows/", headers=get_auth_headers(token))
+    assert response.status_code == 404
+
+
+def test_changed_password_is_evicted(client, other_user):
+    user, token = other_user
+    assert client.get("/workflows/", headers=get_auth_headers(token)).status_code == 200
+
+    misses = UserService.principal_cache.misses
+    call_user_service(client, "change_password", user_id=user["id"], password=faker.password())
+
+    assert client.get("/workflows/", headers=get_auth_headers(token)).status_code == 200
+    assert UserService.principal_cache.misses == misses + 1
+
+
+def test_cached_user_expires_after_ttl(client, other_user, monkeypatch):
+    _, token = other_user
+    monkeypatch.setattr("app.services.users.AUTH_CACHE_TTL", 0)
+    UserService.principal_cache.clear()
+
+    misses = UserService.principal_cache.misses
+    for _ in range(2):
+        assert client.get("/workflows/", headers=get_auth_headers(token)).status_code == 200
+    assert UserService.principal_cache.misses == misses + 2
@@ -0,0 +1,49 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.users import UserService
+from app.utils.executors import BoundedExecutor
+from tests.workflows.utils import faker
+
+
+async def test_password_executor_rejects_when_full():
+    executor = BoundedExecutor(max_workers=1, max_queue_size=1, name="test")
+    release = threading.Event()
+
+    running = asyncio.ensure_future(executor.run(release.wait))
+    queued = asyncio.ensure_future(executor.run(release.wait))
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as error:
+        await executor.run(release.wait)
+    assert error.value.status_code == 503
+
+    release.set()
+    assert await asyncio.gather(running, queued) == [True, True]
+
+    stats = executor.get_stats()
+    assert stats["calls"] == 2
+    assert stats["rejected"] == 1
+    assert stats["pending"] == 0
+
+
+def test_login_hashes_in_executor(client, monkeypatch):
+    user_data = {"email": faker.email(), "password": faker.password()}
+    assert client.post("/auth/register/", json=user_data).status_code < 300
+
+    threads, verify = [], UserService.pwd_context.verify
+
+    def record_thread(*args, **kwargs):
+        threads.append(threading.current_thread().name)
+        return verify(*args, **kwargs)
+
+    monkeypatch.setattr(UserService.pwd_context, "verify", record_thread)
+    calls = UserService.password_executor.get_stats()["calls"]
+
+    assert client.post("/auth/login/", json=user_data).status_code == 200
+    assert UserService.password_executor.get_stats()["calls"] == calls + 1
+    assert len(threads) == 1
+    assert threads[0].startswith("password-hash")
@@ -1,3 +1,62 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app.models.workflows import Workflow
+from app.services.permissions import PermissionService
+from app.services.users import Principal
+from core.db import async_engine, async_session
+
+
 def compare_results(expected_data, actual_data):
     for key, value in expected_data.items():
         assert actual_data[key] == value
+
+
+def get_auth_headers(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def register_and_login(client, user_data):
+    user = client.post("/auth/register/", json=user_data).json()
+    token = client.post("/auth/login/", json=user_data).json()["access"]
+    return user, token
+
+
+def run_with_session(client, func):
+    """Runs `func(db)` inside the app event loop, so app caches and connection pool are shared."""
+
+    async def call():
+        async with async_session() as db:
+            return await func(db)
+
+    return client.portal.call(call)
+
+
+def grant_permission(client, user_id, workflow_id, permission):
+    """Grants permission on behalf of workflow creator, as the permissions API does."""
+
+    async def grant(db):
+        workflow = await db.get(Workflow, workflow_id)
+        creator = Principal(id=workflow.created_by, email="")
+        return await PermissionService.create(
+            db=db, user_id=user_id, workflow_id=workflow_id, permission=permission, user=creator
+        )
+
+    return run_with_session(client, grant)
+
+
+@contextmanager
+def count_queries():
+    """Collects SQL statements the app executes inside the block, savepoints of test transactions are skipped."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        if "SAVEPOINT" not in statement:
+            statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
@@ -0,0 +1,80 @@
+import pytest
+
+from app.models.users import PermissionType
+from tests.utils import count_queries, get_auth_headers, grant_permission, register_and_login
+from tests.workflows.test_full import get_full_workflow, get_large_graph_data
+from tests.workflows.utils import create_base_workflow, faker, import_graph
+
+
+@pytest.fixture(scope="function")
+def base_workflow(client, token):
+    return create_base_workflow(client, token)
+
+
+@pytest.fixture(scope="function")
+def other_user(client):
+    return register_and_login(client, {"email": faker.email(), "password": faker.password()})
+
+
+def clone_workflow(client, token, workflow_id, data=None):
+    return client.post(f"/workflows/{workflow_id}/clone/", json=data, headers=get_auth_headers(token))
+
+
+def get_graph_shape(data):
+    """Nodes without ids, in creation order, and edges as pairs of node positions."""
+    positions = {node["id"]: position for position, node in enumerate(data["nodes"])}
+    nodes = [{key: value for key, value in node.items() if key not in ("id", "workflow_id")} for node in data["nodes"]]
+    edges = sorted(
+        (positions[edge["source_node_id"]], positions[edge["target_node_id"]], edge["status"]) for edge in data["edges"]
+    )
+    return nodes, edges
+
+
+def test_clone_workflow(client, token, base_workflow):
+    import_graph(client, token, base_workflow["id"])
+
+    response = clone_workflow(client, token, base_workflow["id"])
+    assert response.status_code == 201
+    clone = response.json()
+    assert clone["id"] != base_workflow["id"]
+    assert clone["name"] == f"{base_workflow['name']} (copy)"
+    assert clone["description"] == base_workflow["description"]
+    assert response.headers["ETag"]
+
+    source, cloned = (get_full_workflow(client, token, _id) for _id in (base_workflow["id"], clone["id"]))
+    assert get_graph_shape(cloned) == get_graph_shape(source)
+    assert {node["workflow_id"] for node in cloned["nodes"]} == {clone["id"]}
+    assert not {node["id"] for node in cloned["nodes"]} & {node["id"] for node in source["nodes"]}
+
+
+def test_clone_workflow_with_name(client, token, base_workflow):
+    response = clone_workflow(client, token, base_workflow["id"], {"name": "Copy", "description": "Cloned"})
+    assert response.status_code == 201
+    assert response.json()["name"] == "Copy"
+    assert response.json()["description"] == "Cloned"
+    assert get_full_workflow(client, token, response.json()["id"])["nodes"] == []
+
+
+def test_clone_workflow_single_statement(client, token, base_workflow):
+    import_graph(client, token, base_workflow["id"], get_large_graph_data(50))
+
+    with count_queries() as statements:
+        assert clone_workflow(client, token, base_workflow["id"]).status_code == 201
+    assert len([statement for statement in statements if "INSERT" in statement]) == 1
+
+
+def test_clone_workflow_without_permission(client, base_workflow, other_user):
+    _, token = other_user
+    assert clone_workflow(client, token, base_workflow["id"]).status_code == 404
+
+
+def test_clone_workflow_with_view_permission(client, token, base_workflow, other_user):
+    import_graph(client, token, base_workflow["id"])
+    user, other_token = other_user
+    grant_permission(client, user["id"], base_workflow["id"], PermissionType.view)
+
+    response = clone_workflow(client, other_token, base_workflow["id"])
+    assert response.status_code == 201
+
+    workflows = client.get("/workflows/", headers=get_auth_headers(other_token)).json()["workflows"]
+    assert response.json()["id"] in {workflow["id"] for workflow in workflows}
@@ -1,8 +1,12 @@
 import uuid
 
 import pytest
+from sqlalchemy import func, select
 
-from tests.workflows.utils import create_base_workflow, faker
+from app.models.users import PermissionType
+from app.models.workflows import Edge, Node, WorkflowRun
+from tests.utils import count_queries, get_auth_headers, grant_permission, register_and_login, run_with_session
+from tests.workflows.utils import create_base_workflow, faker, import_graph
 
 
 @pytest.fixture(scope="function")
@@ -42,3 +46,36 @@ def test_delete_workflow_not_found(client, token):
     response = client.delete(f"/workflows/{uuid.uuid4()}", headers={"Authorization": f"Bearer {token}"})
     assert response.status_code == 404
     assert response.json() == {"detail": "Workflow not found"}
+
+
+def count_rows(client, model, *filters):
+    return run_with_session(client, lambda db: db.scalar(select(func.count()).select_from(model).filter(*filters)))
+
+
+def test_delete_workflow_with_graph(client, token, base_workflow):
+    workflow_id = base_workflow["id"]
+    graph = import_graph(client, token, workflow_id)
+    user, _ = register_and_login(client, {"email": faker.email(), "password": faker.password()})
+    grant_permission(client, user["id"], workflow_id, PermissionType.view)
+    client.post(f"/workflows/{workflow_id}/runs/", json={}, headers=get_auth_headers(token))
+
+    with count_queries() as statements:
+        response = client.delete(f"/workflows/{workflow_id}/", headers=get_auth_headers(token))
+    assert response.status_code == 204
+    assert [statement.split()[0] for statement in statements] == ["DELETE"]
+
+    assert count_rows(client, Node, Node.workflow_id == workflow_id) == 0
+    assert count_rows(client, Edge, Edge.source_node_id.in_(graph.values())) == 0
+    assert count_rows(client, WorkflowRun, WorkflowRun.workflow_id == workflow_id) == 0
+
+
+def test_delete_node_with_edges(client, token, base_workflow):
+    graph = import_graph(client, token, base_workflow["id"])
+
+    response = client.delete(
+        f"/workflows/{base_workflow['id']}/nodes/{graph['check']}/", headers=get_auth_headers(token)
+    )
+    assert response.status_code == 200
+
+    assert count_rows(client, Node, Node.workflow_id == base_workflow["id"]) == 3
+    assert count_rows(client, Edge, Edge.source_node_id.in_(graph.values())) == 1
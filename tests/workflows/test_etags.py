@@ -0,0 +1,158 @@
+from uuid import uuid4
+
+import pytest
+
+from app.models.users import PermissionType
+from tests.nodes.utils import create_node
+from tests.utils import count_queries, get_auth_headers, grant_permission, register_and_login
+from tests.workflows.utils import create_base_workflow, faker
+
+
+@pytest.fixture(scope="function")
+def base_workflow(client, token):
+    return create_base_workflow(client, token)
+
+
+@pytest.fixture(scope="function")
+def base_node(client, token, base_workflow):
+    return create_node(client, token, base_workflow["id"], "message", {"text": "Hello", "status": "sent"})
+
+
+def get(client, token, url, etag=None):
+    headers = {**get_auth_headers(token), **({"If-None-Match": etag} if etag else {})}
+    return client.get(url, headers=headers)
+
+
+@pytest.mark.parametrize("path", ["", "full/", "nodes/", "nodes/{node_id}/"])
+def test_not_modified(client, token, base_workflow, base_node, path):
+    url = f"/workflows/{base_workflow['id']}/{path.format(node_id=base_node['id'])}"
+    response = get(client, token, url)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    response = get(client, token, url, etag)
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+    assert get(client, token, url, f'W/{etag}, "other"').status_code == 304
+    assert get(client, token, url, "*").status_code == 304
+
+
+def test_not_modified_costs_one_lookup(client, token, base_workflow, base_node):
+    url = f"/workflows/{base_workflow['id']}/nodes/"
+    etag = get(client, token, url).headers["ETag"]
+
+    with count_queries() as statements:
+        assert get(client, token, url, etag).status_code == 304
+    assert len(statements) == 1
+
+
+@pytest.mark.parametrize("path", ["", "full/", "nodes/"])
+def test_etag_changes_with_graph(client, token, base_workflow, base_node, path):
+    url = f"/workflows/{base_workflow['id']}/{path}"
+    etag = get(client, token, url).headers["ETag"]
+
+    create_node(client, token, base_workflow["id"], "end")
+
+    response = get(client, token, url, etag)
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_not_modified_requires_permission(client, token, base_workflow):
+    url = f"/workflows/{base_workflow['id']}/"
+    etag = get(client, token, url).headers["ETag"]
+    _, other_token = register_and_login(client, {"email": faker.email(), "password": faker.password()})
+
+    assert get(client, other_token, url, etag).status_code == 404
+    assert get(client, other_token, f"{url}nodes/", etag).status_code == 404
+
+
+def test_update_workflow_if_match(client, token, base_workflow):
+    url = f"/workflows/{base_workflow['id']}/"
+    etag = get(client, token, url).headers["ETag"]
+    data = {"name": "Renamed"}
+
+    response = client.patch(url, json=data, headers={**get_auth_headers(token), "If-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+    response = client.patch(url, json=data, headers={**get_auth_headers(token), "If-Match": etag})
+    assert response.status_code == 412
+    response = client.patch(url, json=data, headers={**get_auth_headers(token), "If-Match": '"unknown"'})
+    assert response.status_code == 412
+
+
+def test_update_workflow_if_match_without_permission(client, token, base_workflow):
+    url = f"/workflows/{base_workflow['id']}/"
+    etag = get(client, token, url).headers["ETag"]
+    user, other_token = register_and_login(client, {"email": faker.email(), "password": faker.password()})
+    grant_permission(client, user["id"], base_workflow["id"], PermissionType.view)
+
+    response = client.patch(url, json={"name": "Renamed"}, headers={**get_auth_headers(other_token), "If-Match": etag})
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize("if_match", ['"unknown"', 'W/"weak"', "garbage"])
+def test_if_match_without_access_is_not_found(client, token, base_workflow, base_node, if_match):
+    _, other_token = register_and_login(client, {"email": faker.email(), "password": faker.password()})
+    headers = {**get_auth_headers(other_token), "If-Match": if_match}
+    workflow_url = f"/workflows/{base_workflow['id']}/"
+    node_url = f"{workflow_url}nodes/{base_node['id']}/"
+
+    assert client.patch(workflow_url, json={"name": "Renamed"}, headers=headers).status_code == 404
+    assert client.delete(workflow_url, headers=headers).status_code == 404
+    assert client.patch(node_url, json={**base_node, "text": "Stale"}, headers=headers).status_code == 404
+    assert client.delete(node_url, headers=headers).status_code == 404
+    assert client.delete(f"/workflows/{uuid4()}/", headers=headers).status_code == 404
+
+
+def test_delete_workflow_if_match(client, token, base_workflow, base_node):
+    url = f"/workflows/{base_workflow['id']}/"
+    etag = get(client, token, url).headers["ETag"]
+    create_node(client, token, base_workflow["id"], "end")
+
+    response = client.delete(url, headers={**get_auth_headers(token), "If-Match": etag})
+    assert response.status_code == 412
+
+    etag = get(client, token, url).headers["ETag"]
+    response = client.delete(url, headers={**get_auth_headers(token), "If-Match": etag})
+    assert response.status_code == 204
+
+
+def test_node_if_match(client, token, base_workflow, base_node):
+    url = f"/workflows/{base_workflow['id']}/nodes/{base_node['id']}/"
+    etag = get(client, token, url).headers["ETag"]
+    create_node(client, token, base_workflow["id"], "end")
+
+    response = client.patch(
+        url, json={**base_node, "text": "Stale"}, headers={**get_auth_headers(token), "If-Match": etag}
+    )
+    assert response.status_code == 412
+    assert get(client, token, url).json()["text"] == "Hello"
+
+    response = client.delete(url, headers={**get_auth_headers(token), "If-Match": etag})
+    assert response.status_code == 412
+
+    etag = get(client, token, url).headers["ETag"]
+    response = client.patch(
+        url, json={**base_node, "text": "Fresh"}, headers={**get_auth_headers(token), "If-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.json()["text"] == "Fresh"
+
+
+def test_start_node_if_match(client, token, base_workflow):
+    start_node = create_node(client, token, base_workflow["id"], "start")
+    url = f"/workflows/{base_workflow['id']}/nodes/{start_node['id']}/"
+    etag = get(client, token, url).headers["ETag"]
+    create_node(client, token, base_workflow["id"], "end")
+
+    response = client.patch(url, json=start_node, headers={**get_auth_headers(token), "If-Match": etag})
+    assert response.status_code == 412
+
+    etag = get(client, token, url).headers["ETag"]
+    response = client.patch(url, json=start_node, headers={**get_auth_headers(token), "If-Match": etag})
+    assert response.status_code == 200
+    assert get(client, token, url).headers["ETag"] != etag
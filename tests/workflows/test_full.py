@@ -0,0 +1,64 @@
+import pytest
+
+from tests.utils import count_queries, get_auth_headers
+from tests.workflows.utils import create_base_workflow, get_graph_data, import_graph
+
+
+@pytest.fixture(scope="function")
+def base_workflow(client, token):
+    return create_base_workflow(client, token)
+
+
+def get_large_graph_data(size):
+    graph_data = {"nodes": [{"ref": "start", "node_type": "start"}], "edges": []}
+    previous = "start"
+    for i in range(size):
+        if i % 2:
+            node = {"ref": str(i), "node_type": "message", "text": f"Message {i}", "status": "pending"}
+        else:
+            node = {"ref": str(i), "node_type": "condition", "condition": f"clicks > {i}"}
+        graph_data["nodes"].append(node)
+        graph_data["edges"].append({"source": previous, "target": str(i)})
+        previous = str(i)
+    return graph_data
+
+
+def get_full_workflow(client, token, workflow_id):
+    response = client.get(f"/workflows/{workflow_id}/full/", headers=get_auth_headers(token))
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_retrieve_full_workflow(client, token, base_workflow):
+    graph = import_graph(client, token, base_workflow["id"])
+
+    data = get_full_workflow(client, token, base_workflow["id"])
+    assert data["workflow"]["id"] == base_workflow["id"]
+    assert len(data["edges"]) == 4
+
+    nodes = {node["id"]: node for node in data["nodes"]}
+    assert set(nodes) == set(graph.values())
+    workflow_id = base_workflow["id"]
+    assert nodes[graph["check"]] == {
+        "id": graph["check"],
+        "node_type": "condition",
+        "workflow_id": workflow_id,
+        "condition": "opened",
+    }
+    assert nodes[graph["remind"]]["status"] == "pending"
+    assert nodes[graph["start"]] == {"id": graph["start"], "node_type": "start", "workflow_id": workflow_id}
+
+
+def test_retrieve_full_workflow_query_count(client, token, base_workflow):
+    small_workflow = create_base_workflow(client, token)
+    import_graph(client, token, small_workflow["id"], get_graph_data())
+    import_graph(client, token, base_workflow["id"], get_large_graph_data(50))
+
+    query_counts = []
+    for workflow in (small_workflow, base_workflow):
+        get_full_workflow(client, token, workflow["id"])
+        with count_queries() as statements:
+            get_full_workflow(client, token, workflow["id"])
+        query_counts.append(len(statements))
+
+    assert query_counts == [3, 3]
@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy import func, select
+
+from app.models.workflows import Edge
+from tests.utils import get_auth_headers, register_and_login, run_with_session
+from tests.workflows.utils import create_base_workflow, faker, get_graph_data
+
+
+@pytest.fixture(scope="function")
+def base_workflow(client, token):
+    return create_base_workflow(client, token)
+
+
+def count_edges(client, node_ids):
+    query = select(func.count()).select_from(Edge).filter(Edge.source_node_id.in_(node_ids))
+    return run_with_session(client, lambda db: db.scalar(query))
+
+
+def test_import_graph(client, token, base_workflow):
+    response = client.post(
+        f"/workflows/{base_workflow['id']}/graph/", json=get_graph_data(), headers=get_auth_headers(token)
+    )
+    assert response.status_code == 201
+
+    data = response.json()
+    assert set(data["nodes"]) == {"start", "check", "remind", "end"}
+    assert len(data["edges"]) == 4
+    assert count_edges(client, list(data["nodes"].values())) == 4
+
+    response = client.get(f"/workflows/{base_workflow['id']}/nodes/", headers=get_auth_headers(token))
+    nodes = {node["id"]: node for node in response.json()["nodes"]}
+    assert set(nodes) == set(data["nodes"].values())
+    assert nodes[data["nodes"]["check"]]["node_type"] == "condition"
+
+
+def test_import_graph_unknown_ref(client, token, base_workflow):
+    graph_data = get_graph_data()
+    graph_data["edges"].append({"source": "end", "target": "missing"})
+
+    response = client.post(f"/workflows/{base_workflow['id']}/graph/", json=graph_data, headers=get_auth_headers(token))
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Unknown node ref: missing"}
+
+
+def test_import_graph_duplicate_ref(client, token, base_workflow):
+    graph_data = get_graph_data()
+    graph_data["nodes"].append({"ref": "end", "node_type": "end"})
+
+    response = client.post(f"/workflows/{base_workflow['id']}/graph/", json=graph_data, headers=get_auth_headers(token))
+    assert response.status_code == 400
+
+    response = client.get(f"/workflows/{base_workflow['id']}/nodes/", headers=get_auth_headers(token))
+    assert response.json()["nodes"] == []
+
+
+def test_import_graph_invalid_node_type(client, token, base_workflow):
+    graph_data = {"nodes": [{"ref": "a", "node_type": "unknown"}]}
+    response = client.post(f"/workflows/{base_workflow['id']}/graph/", json=graph_data, headers=get_auth_headers(token))
+    assert response.status_code == 422
+
+
+def test_import_graph_without_permission(client, base_workflow):
+    _, other_token = register_and_login(client, {"email": faker.email(), "password": faker.password()})
+    response = client.post(
+        f"/workflows/{base_workflow['id']}/graph/", json=get_graph_data(), headers=get_auth_headers(other_token)
+    )
+    assert response.status_code == 404
@@ -0,0 +1,54 @@
+from uuid import UUID
+
+import pytest
+
+from app.models.workflows import EdgeWeight, NodeType
+from app.services.workflows import GraphService
+from app.utils.graph import ConditionConfig
+from tests.utils import get_auth_headers, run_with_session
+from tests.workflows.utils import create_base_workflow, import_graph
+
+
+@pytest.fixture(scope="function")
+def base_workflow(client, token):
+    return create_base_workflow(client, token)
+
+
+@pytest.fixture(scope="function")
+def base_graph(client, token, base_workflow):
+    return import_graph(client, token, base_workflow["id"])
+
+
+def get_compiled_graph(client, workflow_id):
+    return run_with_session(client, lambda db: GraphService.get_compiled_graph(db=db, workflow_id=workflow_id))
+
+
+def test_compiled_graph(client, base_workflow, base_graph):
+    graph = get_compiled_graph(client, base_workflow["id"])
+    assert len(graph) == 4
+
+    index = {ref: graph.index[UUID(node_id)] for ref, node_id in base_graph.items()}
+    assert graph.start_nodes == [index["start"]]
+    assert graph.node_types[index["check"]] == NodeType.condition
+    assert graph.configs[index["check"]] == ConditionConfig("opened")
+    assert graph.get_successors(index["start"]) == [index["check"]]
+    assert graph.get_successors(index["check"], EdgeWeight.yes) == [index["end"]]
+    assert graph.get_successors(index["check"], EdgeWeight.no) == [index["remind"]]
+    assert graph.get_successors(index["end"]) == []
+
+
+def test_compiled_graph_is_cached_by_version(client, token, base_workflow, base_graph):
+    graph = get_compiled_graph(client, base_workflow["id"])
+    assert get_compiled_graph(client, base_workflow["id"]) is graph
+
+    response = client.post(
+        f"/workflows/{base_workflow['id']}/edges/",
+        json={"source_node_id": base_graph["remind"], "target_node_id": base_graph["check"]},
+        headers=get_auth_headers(token),
+    )
+    assert response.status_code == 201
+
+    updated_graph = get_compiled_graph(client, base_workflow["id"])
+    assert updated_graph.version > graph.version
+    remind = updated_graph.index[UUID(base_graph["remind"])]
+    assert len(updated_graph.get_successors(remind)) == 2
@@ -0,0 +1,45 @@
+import uuid
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+
+from app.dals.workflows import EdgeDAL, NodeDAL
+from app.models.users import Permission
+from app.models.workflows import BaseNodeConfiguration, Edge, Workflow
+from tests.utils import run_with_session
+
+
+def explain(client, query):
+    """Returns query plan with sequential scans disabled, so tiny test tables don't hide missing indexes."""
+    sql = query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+
+    async def call(db):
+        await db.execute(text("SET LOCAL enable_seqscan = off"))
+        plan = await db.execute(text(f"EXPLAIN {sql}"))
+        return "\n".join(row[0] for row in plan)
+
+    return run_with_session(client, call)
+
+
+@pytest.mark.parametrize(
+    "query, index",
+    [
+        (NodeDAL.get_columns_query(uuid.uuid4()), "ix_nodes_workflow_id"),
+        (
+            select(Edge).filter(Edge.source_node_id.in_(EdgeDAL.get_workflow_nodes_query(uuid.uuid4()))),
+            "ix_nodes_workflow_id",
+        ),
+        (select(Edge.id).filter(Edge.target_node_id == uuid.uuid4()), "ix_edges_target_node_id"),
+        (
+            select(BaseNodeConfiguration.id).filter(BaseNodeConfiguration.node_id == uuid.uuid4()),
+            "ix_node_configurations_node_id",
+        ),
+        (select(Permission.id).filter(Permission.workflow_id == uuid.uuid4()), "ix_permissions_workflow_id"),
+        (select(Workflow.id).filter(Workflow.created_by == uuid.uuid4()), "ix_workflows_created_by"),
+    ],
+)
+def test_query_uses_index(client, query, index):
+    plan = explain(client, query)
+    assert index in plan
+    assert "Seq Scan" not in plan
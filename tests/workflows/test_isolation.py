@@ -0,0 +1,17 @@
+from sqlalchemy import select
+
+from app.models.workflows import Workflow
+from core.db import async_engine
+from tests.workflows.utils import create_base_workflow
+
+
+def test_committed_workflow_is_visible_only_inside_test_transaction(client, token, db_connection):
+    workflow = create_base_workflow(client, token)
+    query = select(Workflow.id).filter(Workflow.id == workflow["id"])
+
+    async def select_outside():
+        async with async_engine.connect() as connection:
+            return (await connection.execute(query)).first()
+
+    assert client.portal.call(db_connection.execute, query).first() is not None
+    assert client.portal.call(select_outside) is None
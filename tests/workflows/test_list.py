@@ -0,0 +1,117 @@
+import json
+
+import pytest
+
+from tests.utils import get_auth_headers
+from tests.workflows.utils import create_base_workflow, faker
+
+
+@pytest.fixture(scope="function")
+def base_workflows(client, token):
+    prefix = faker.pystr(min_chars=8, max_chars=8).lower()
+    return [create_base_workflow(client, token, {"name": f"{prefix}{suffix}"}) for suffix in "cab"]
+
+
+def get_base_workflows_order(workflows, base_workflows):
+    base_ids = {workflow["id"] for workflow in base_workflows}
+    return [workflow["name"] for workflow in workflows if workflow["id"] in base_ids]
+
+
+def get_all_pages(client, token, limit, **params):
+    workflows, cursor = [], None
+    while True:
+        params = {**params, "limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/workflows/", params=params, headers=get_auth_headers(token))
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["workflows"]) <= limit
+        workflows.extend(data["workflows"])
+        cursor = data["next_cursor"]
+        if not cursor:
+            return workflows
+
+
+def test_list_workflows_wo_auth(client):
+    response = client.get("/workflows/")
+    assert response.status_code == 403
+
+
+def test_list_workflows_paginated(client, token, base_workflows):
+    workflows = get_all_pages(client, token, limit=2)
+    ids = [workflow["id"] for workflow in workflows]
+
+    assert len(ids) == len(set(ids))
+    assert {workflow["id"] for workflow in base_workflows} <= set(ids)
+    assert [workflow["created_at"] for workflow in workflows] == sorted(
+        workflow["created_at"] for workflow in workflows
+    )
+
+
+def test_list_workflows_invalid_cursor(client, token):
+    response = client.get("/workflows/", params={"cursor": "invalid"}, headers=get_auth_headers(token))
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("limit", [0, 1001])
+def test_list_workflows_invalid_limit(client, token, limit):
+    response = client.get("/workflows/", params={"limit": limit}, headers=get_auth_headers(token))
+    assert response.status_code == 422
+
+
+def test_list_workflows_stream(client, token, base_workflows):
+    response = client.get("/workflows/", params={"stream": True}, headers=get_auth_headers(token))
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+
+    workflows = [json.loads(line) for line in response.text.splitlines()]
+    assert {workflow["id"] for workflow in base_workflows} <= {workflow["id"] for workflow in workflows}
+    assert workflows == get_all_pages(client, token, limit=1000)
+
+
+def test_list_workflows_search(client, token):
+    word = faker.pystr(min_chars=12, max_chars=12).lower()
+    by_name = create_base_workflow(client, token, {"name": f"{word} workflow"})
+    by_description = create_base_workflow(client, token, {"description": f"Sends {word} messages"})
+    create_base_workflow(client, token)
+
+    response = client.get("/workflows/", params={"search": word}, headers=get_auth_headers(token))
+    assert response.status_code == 200
+    assert {workflow["id"] for workflow in response.json()["workflows"]} == {by_name["id"], by_description["id"]}
+
+
+@pytest.mark.parametrize("order_by", ["name", "-name", "-created_at", "updated_at"])
+def test_list_workflows_order_by(client, token, base_workflows, order_by):
+    response = client.get("/workflows/", params={"order_by": order_by}, headers=get_auth_headers(token))
+    assert response.status_code == 200
+
+    workflows = response.json()["workflows"]
+    field = order_by.removeprefix("-")
+    if field == "name":
+        names = get_base_workflows_order(get_all_pages(client, token, limit=1000, order_by=order_by), base_workflows)
+        assert names == sorted(names, reverse=order_by.startswith("-"))
+    else:
+        values = [workflow[field] for workflow in workflows]
+        assert values == sorted(values, reverse=order_by.startswith("-"))
+
+
+def test_list_workflows_order_by_paginated(client, token, base_workflows):
+    workflows = get_all_pages(client, token, limit=2, order_by="-name")
+    assert get_base_workflows_order(workflows, base_workflows) == sorted(
+        (workflow["name"] for workflow in base_workflows), reverse=True
+    )
+    assert len({workflow["id"] for workflow in workflows}) == len(workflows)
+
+
+def test_list_workflows_order_by_not_allowed(client, token):
+    response = client.get("/workflows/", params={"order_by": "description"}, headers=get_auth_headers(token))
+    assert response.status_code == 400
+
+
+def test_list_workflows_cursor_of_other_ordering(client, token, base_workflows):
+    response = client.get("/workflows/", params={"limit": 1}, headers=get_auth_headers(token))
+    cursor = response.json()["next_cursor"]
+
+    response = client.get(
+        "/workflows/", params={"limit": 1, "cursor": cursor, "order_by": "name"}, headers=get_auth_headers(token)
+    )
+    assert response.status_code == 400
@@ -0,0 +1,194 @@
+from uuid import uuid4
+
+import pytest
+
+from app.models.users import PermissionType
+from app.services.permissions import InMemoryPermissionCacheBackend, PermissionService
+from tests.utils import get_auth_headers, grant_permission, register_and_login
+from tests.workflows.utils import create_base_workflow, faker, get_workflow_data
+
+
+@pytest.fixture(scope="function")
+def other_user(client):
+    return register_and_login(client, {"email": faker.email(), "password": faker.password()})
+
+
+@pytest.fixture(scope="function")
+def base_workflow(client, token):
+    return create_base_workflow(client, token)
+
+
+def test_retrieve_workflow_without_permission(client, base_workflow, other_user):
+    _, other_token = other_user
+    response = client.get(f"/workflows/{base_workflow['id']}/", headers=get_auth_headers(other_token))
+    assert response.status_code == 404
+
+
+def test_list_workflows_without_permission(client, base_workflow, other_user):
+    _, other_token = other_user
+    response = client.get("/workflows/", headers=get_auth_headers(other_token))
+    assert response.status_code == 200
+    assert base_workflow["id"] not in {workflow["id"] for workflow in response.json()["workflows"]}
+
+
+def test_retrieve_workflow_with_view_permission(client, base_workflow, other_user):
+    user, other_token = other_user
+    grant_permission(client, user["id"], base_workflow["id"], PermissionType.view)
+
+    response = client.get(f"/workflows/{base_workflow['id']}/", headers=get_auth_headers(other_token))
+    assert response.status_code == 200
+    assert response.json()["id"] == base_workflow["id"]
+
+    response = client.get("/workflows/", headers=get_auth_headers(other_token))
+    assert base_workflow["id"] in {workflow["id"] for workflow in response.json()["workflows"]}
+
+
+def test_update_workflow_with_view_permission(client, base_workflow, other_user):
+    user, other_token = other_user
+    grant_permission(client, user["id"], base_workflow["id"], PermissionType.view)
+
+    response = client.patch(
+        f"/workflows/{base_workflow['id']}/", json=get_workflow_data(), headers=get_auth_headers(other_token)
+    )
+    assert response.status_code == 404
+
+
+def test_update_workflow_with_edit_permission(client, base_workflow, other_user):
+    user, other_token = other_user
+    grant_permission(client, user["id"], base_workflow["id"], PermissionType.edit)
+
+    response = client.patch(
+        f"/workflows/{base_workflow['id']}/", json=get_workflow_data(), headers=get_auth_headers(other_token)
+    )
+    assert response.status_code == 200
+
+
+def test_delete_workflow_with_edit_permission(client, base_workflow, other_user):
+    user, other_token = other_user
+    grant_permission(client, user["id"], base_workflow["id"], PermissionType.edit)
+
+    response = client.delete(f"/workflows/{base_workflow['id']}/", headers=get_auth_headers(other_token))
+    assert response.status_code == 404
+
+
+def test_list_nodes_permission_cache_invalidation(client, base_workflow, other_user):
+    user, other_token = other_user
+    cache = PermissionService.cache
+
+    response = client.get(f"/workflows/{base_workflow['id']}/nodes/", headers=get_auth_headers(other_token))
+    assert response.status_code == 404
+
+    hits = cache.hits
+    response = client.get(f"/workflows/{base_workflow['id']}/nodes/", headers=get_auth_headers(other_token))
+    assert response.status_code == 404
+    assert cache.hits == hits + 1
+
+    grant_permission(client, user["id"], base_workflow["id"], PermissionType.view)
+    response = client.get(f"/workflows/{base_workflow['id']}/nodes/", headers=get_auth_headers(other_token))
+    assert response.status_code == 200
+
+    response = client.post(
+        f"/workflows/{base_workflow['id']}/nodes/start/", json={}, headers=get_auth_headers(other_token)
+    )
+    assert response.status_code == 404
+
+
+def get_permissions_url(workflow_id, permission_id=None):
+    url = f"/workflows/{workflow_id}/permissions/"
+    return f"{url}{permission_id}/" if permission_id else url
+
+
+def test_grant_permission(client, token, base_workflow, other_user):
+    user, other_token = other_user
+    url = f"/workflows/{base_workflow['id']}/"
+    assert client.get(url, headers=get_auth_headers(other_token)).status_code == 404
+
+    response = client.post(
+        get_permissions_url(base_workflow["id"]),
+        json={"user_id": user["id"], "permission": "view"},
+        headers=get_auth_headers(token),
+    )
+    assert response.status_code == 201
+    permission = response.json()
+    assert permission["user_id"] == user["id"]
+    assert permission["workflow_id"] == base_workflow["id"]
+    assert client.get(url, headers=get_auth_headers(other_token)).status_code == 200
+
+    response = client.get(get_permissions_url(base_workflow["id"]), headers=get_auth_headers(token))
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["permissions"]] == [permission["id"]]
+
+    response = client.post(
+        get_permissions_url(base_workflow["id"]),
+        json={"user_id": user["id"], "permission": "view"},
+        headers=get_auth_headers(token),
+    )
+    assert response.status_code == 400
+
+
+def test_update_and_revoke_permission(client, token, base_workflow, other_user):
+    user, other_token = other_user
+    permission = grant_permission(client, user["id"], base_workflow["id"], PermissionType.view)
+    url = f"/workflows/{base_workflow['id']}/"
+    assert client.patch(url, json=get_workflow_data(), headers=get_auth_headers(other_token)).status_code == 404
+
+    response = client.patch(
+        get_permissions_url(base_workflow["id"], permission.id),
+        json={"permission": "edit"},
+        headers=get_auth_headers(token),
+    )
+    assert response.status_code == 200
+    assert response.json()["permission"] == "edit"
+    assert client.patch(url, json=get_workflow_data(), headers=get_auth_headers(other_token)).status_code == 200
+
+    response = client.delete(get_permissions_url(base_workflow["id"], permission.id), headers=get_auth_headers(token))
+    assert response.status_code == 204
+    assert client.get(url, headers=get_auth_headers(other_token)).status_code == 404
+    assert client.get(f"{url}full/", headers=get_auth_headers(other_token)).status_code == 404
+
+
+def test_manage_permissions_of_other_workflow(client, token, base_workflow, other_user):
+    user, other_token = other_user
+    grant_permission(client, user["id"], base_workflow["id"], PermissionType.edit)
+
+    response = client.get(get_permissions_url(base_workflow["id"]), headers=get_auth_headers(other_token))
+    assert response.status_code == 404
+    response = client.post(
+        get_permissions_url(base_workflow["id"]),
+        json={"user_id": user["id"], "permission": "delete"},
+        headers=get_auth_headers(other_token),
+    )
+    assert response.status_code == 404
+
+    other_workflow = create_base_workflow(client, other_token)
+    permission = grant_permission(client, user["id"], base_workflow["id"], PermissionType.view)
+    response = client.delete(
+        get_permissions_url(other_workflow["id"], permission.id), headers=get_auth_headers(other_token)
+    )
+    assert response.status_code == 404
+
+
+def test_grant_permission_to_unknown_user(client, token, base_workflow):
+    response = client.post(
+        get_permissions_url(base_workflow["id"]),
+        json={"user_id": str(uuid4()), "permission": "view"},
+        headers=get_auth_headers(token),
+    )
+    assert response.status_code == 404
+
+
+async def test_in_memory_permission_cache_is_bounded():
+    backend = InMemoryPermissionCacheBackend(max_users=2, max_workflows=2, ttl=60)
+    users, workflows = [uuid4() for _ in range(3)], [uuid4() for _ in range(3)]
+    for user_id in users:
+        for workflow_id in workflows:
+            await backend.set(user_id, workflow_id, frozenset({PermissionType.view}))
+
+    assert len(backend.cache) == 2
+    assert await backend.get(users[0], workflows[2]) is None
+    assert await backend.get(users[2], workflows[0]) is None
+    assert await backend.get(users[2], workflows[2]) == frozenset({PermissionType.view})
+
+    await backend.invalidate_workflow(workflows[2])
+    assert await backend.get(users[2], workflows[2]) is None
+    assert await backend.get(users[2], workflows[1]) == frozenset({PermissionType.view})
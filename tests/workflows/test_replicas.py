@@ -0,0 +1,89 @@
+from itertools import cycle
+
+import pytest
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.utils.auth import get_read_session
+from app.utils.cache import TTLCache
+from core import db as core_db
+from core.db import PrimarySession, get_read_sessionmaker, get_session
+from core.main import app
+from tests.utils import get_auth_headers, run_with_session
+from tests.workflows.utils import create_base_workflow
+
+
+@pytest.fixture(scope="function")
+def replica(monkeypatch):
+    """Stands in for a replica, primary is `core.db.async_session`."""
+    replica_session = sessionmaker(class_=AsyncSession)
+    monkeypatch.setattr(core_db, "replica_sessions", cycle([replica_session]))
+    monkeypatch.setattr(core_db, "primary_pins", TTLCache(max_size=10, ttl=60))
+    return replica_session
+
+
+def get_dependencies(dependant):
+    for dependency in dependant.dependencies:
+        yield dependency.call
+        yield from get_dependencies(dependency)
+
+
+def test_get_routes_read_from_read_session():
+    routes = [route for route in app.routes if isinstance(route, APIRoute) and route.path.startswith("/workflows")]
+    for route in routes:
+        dependencies = set(get_dependencies(route.dependant))
+        if route.methods == {"GET"}:
+            assert get_read_session in dependencies and get_session not in dependencies, route.path
+        else:
+            assert get_read_session not in dependencies, route.path
+
+
+def test_reads_without_replicas_go_to_primary():
+    assert get_read_sessionmaker(None) is core_db.async_session
+
+
+def test_writer_is_pinned_to_primary(replica):
+    writer, reader = "5b2b9d52-0c3f-4e5c-9d2e-8a4f1f0d3c11", "0f6b5e6a-7d4c-4b1e-a1f3-2c9d8e7b6a50"
+    core_db.pin_to_primary(writer)
+
+    assert get_read_sessionmaker(writer) is core_db.async_session
+    assert get_read_sessionmaker(reader) is replica
+    assert get_read_sessionmaker(None) is replica
+
+
+def test_pin_expires(replica, monkeypatch):
+    monkeypatch.setattr(core_db, "primary_pins", TTLCache(max_size=10, ttl=0))
+    user_id = "5b2b9d52-0c3f-4e5c-9d2e-8a4f1f0d3c11"
+    core_db.pin_to_primary(user_id)
+
+    assert get_read_sessionmaker(user_id) is replica
+
+
+def test_commit_pins_user(client, token, replica, db_connection):
+    workflow = create_base_workflow(client, token)
+    primary_session = sessionmaker(
+        bind=db_connection,
+        class_=AsyncSession,
+        sync_session_class=PrimarySession,
+        join_transaction_mode="create_savepoint",
+    )
+
+    async def commit_as_owner(db):
+        async with primary_session() as session:
+            session.info["user_id"] = workflow["created_by"]
+            await session.commit()
+
+    assert get_read_sessionmaker(workflow["created_by"]) is replica
+    run_with_session(client, commit_as_owner)
+    assert get_read_sessionmaker(workflow["created_by"]) is core_db.async_session
+
+
+def test_read_routes_work_on_read_session(client, token):
+    workflow = create_base_workflow(client, token)
+    response = client.get(f"/workflows/{workflow['id']}/full/", headers=get_auth_headers(token))
+    assert response.status_code == 200
+
+    response = client.get("/workflows/", params={"stream": True}, headers=get_auth_headers(token))
+    assert response.status_code == 200
+    assert workflow["id"] in response.text
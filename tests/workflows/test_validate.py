@@ -0,0 +1,120 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.models.workflows import EdgeWeight, NodeType
+from app.utils import graph as graph_utils
+from app.utils.graph import CompiledGraph, validate_graph
+from tests.utils import get_auth_headers
+from tests.workflows.utils import create_base_workflow, get_graph_data, import_graph
+
+
+@pytest.fixture(scope="function")
+def base_workflow(client, token):
+    return create_base_workflow(client, token)
+
+
+def validate(client, token, workflow_id, node_ids=None):
+    response = client.get(
+        f"/workflows/{workflow_id}/validate/", params={"node_id": node_ids or []}, headers=get_auth_headers(token)
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def get_issues(data):
+    return {issue["code"]: set(issue["node_ids"]) for issue in data["issues"]}
+
+
+def test_validate_valid_graph(client, token, base_workflow):
+    import_graph(client, token, base_workflow["id"])
+    data = validate(client, token, base_workflow["id"])
+    assert data["valid"] is True
+    assert data["issues"] == []
+
+
+def test_validate_empty_graph(client, token, base_workflow):
+    data = validate(client, token, base_workflow["id"])
+    assert data["valid"] is False
+    assert get_issues(data) == {"start_node": set()}
+
+
+def test_validate_invalid_graph(client, token, base_workflow):
+    graph_data = get_graph_data()
+    graph_data["nodes"] += [
+        {"ref": "loop", "node_type": "message", "text": "Loop", "status": "pending"},
+        {"ref": "orphan", "node_type": "end"},
+    ]
+    graph_data["edges"] = [
+        {"source": "start", "target": "check"},
+        {"source": "check", "target": "remind", "status": "no"},
+        {"source": "check", "target": "end", "status": "no"},
+        {"source": "remind", "target": "loop"},
+        {"source": "loop", "target": "remind"},
+        {"source": "orphan", "target": "end"},
+    ]
+    graph = import_graph(client, token, base_workflow["id"], graph_data)
+
+    data = validate(client, token, base_workflow["id"])
+    assert data["valid"] is False
+    assert get_issues(data) == {
+        "condition_edges": {graph["check"]},
+        "end_node_edges": {graph["orphan"]},
+        "unreachable": {graph["orphan"]},
+        "no_exit": {graph["remind"], graph["loop"]},
+    }
+
+    data = validate(client, token, base_workflow["id"], [graph["orphan"], graph["remind"]])
+    assert get_issues(data) == {
+        "end_node_edges": {graph["orphan"]},
+        "unreachable": {graph["orphan"]},
+        "no_exit": {graph["remind"], graph["loop"]},
+    }
+
+
+def test_validate_touched_nodes_after_edge_delete(client, token, base_workflow):
+    graph = import_graph(client, token, base_workflow["id"])
+    edges = client.get(f"/workflows/{base_workflow['id']}/full/", headers=get_auth_headers(token)).json()["edges"]
+    edge = next(edge for edge in edges if edge["source_node_id"] == graph["start"])
+    client.delete(f"/workflows/{base_workflow['id']}/edges/{edge['id']}/", headers=get_auth_headers(token))
+
+    data = validate(client, token, base_workflow["id"], [graph["start"], graph["check"]])
+    assert data["valid"] is False
+    assert get_issues(data) == {
+        "outgoing_edges": {graph["start"]},
+        "unreachable": {graph["check"], graph["remind"], graph["end"]},
+        "no_exit": {graph["start"]},
+    }
+
+
+def test_validate_touched_nodes_walks_only_affected_region(monkeypatch):
+    def add_node(node_type):
+        nodes.append(SimpleNamespace(id=uuid4(), node_type=node_type, text="", status=None, condition="opened"))
+        return nodes[-1].id
+
+    nodes, edges = [], []
+    start, check = add_node(NodeType.start), add_node(NodeType.condition)
+    chain = [add_node(NodeType.message) for _ in range(10_000)] + [add_node(NodeType.end)]
+    remind, end = add_node(NodeType.message), add_node(NodeType.end)
+    edges += [(start, check, EdgeWeight.zero), (check, chain[0], EdgeWeight.yes), (check, remind, EdgeWeight.no)]
+    edges += [(source, target, EdgeWeight.zero) for source, target in zip(chain, chain[1:])]
+    edges.append((remind, end, EdgeWeight.zero))
+    graph = CompiledGraph(nodes, edges)
+
+    visited = []
+    walk = graph_utils._walk
+    monkeypatch.setattr(
+        graph_utils, "_walk", lambda *args, **kwargs: visited.append(walk(*args, **kwargs)) or visited[-1]
+    )
+
+    assert validate_graph(graph, node_ids=[remind, end]) == []
+    assert sum(len(region) for region in visited) < 20
+
+    graph = CompiledGraph(nodes, edges[:-1])
+    issues = validate_graph(graph, node_ids=[remind, end])
+    assert {issue.code: issue.node_ids for issue in issues} == {
+        "outgoing_edges": [remind],
+        "unreachable": [end],
+        "no_exit": [remind],
+    }
@@ -10,7 +10,33 @@ def get_workflow_data():
     }
 
 
-def create_base_workflow(client, token):
-    test_data = get_workflow_data()
+def create_base_workflow(client, token, data=None):
+    test_data = {**get_workflow_data(), **(data or {})}
     response = client.post("/workflows/", json=test_data, headers={"Authorization": f"Bearer {token}"})
     return response.json()
+
+
+def get_graph_data():
+    return {
+        "nodes": [
+            {"ref": "start", "node_type": "start"},
+            {"ref": "check", "node_type": "condition", "condition": "opened"},
+            {"ref": "remind", "node_type": "message", "text": faker.sentence(), "status": "pending"},
+            {"ref": "end", "node_type": "end"},
+        ],
+        "edges": [
+            {"source": "start", "target": "check"},
+            {"source": "check", "target": "remind", "status": "no"},
+            {"source": "check", "target": "end", "status": "yes"},
+            {"source": "remind", "target": "end"},
+        ],
+    }
+
+
+def import_graph(client, token, workflow_id, graph_data=None):
+    response = client.post(
+        f"/workflows/{workflow_id}/graph/",
+        json=graph_data or get_graph_data(),
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    return response.json()["nodes"]